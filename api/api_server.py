@@ -9,7 +9,8 @@ from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import asyncio
 import logging
-from mcp_client import FixedMCPClient
+import os
+from mcp_pool import MCPWorkerPool
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -51,19 +52,37 @@ class SimpleResponse(BaseModel):
     """간단한 문자열 응답 모델"""
     output_text: str
 
-# 전역 MCP 클라이언트
-mcp_client = None
-
-async def get_mcp_client() -> FixedMCPClient:
-    """MCP 클라이언트 인스턴스 반환"""
-    global mcp_client
-    if mcp_client is None:
-        mcp_client = FixedMCPClient(
-            "/Users/bangjeonghwan/IdeaProjects/mcp/pymcp/external/external_connect_server.py",
-            "/Users/bangjeonghwan/IdeaProjects/mcp/pymcp"
-        )
-        await mcp_client.start_server()
-    return mcp_client
+# MCP 워커 풀 설정
+MCP_SERVER_PATH = os.environ.get(
+    "MCP_SERVER_PATH", "/Users/bangjeonghwan/IdeaProjects/mcp/pymcp/external/external_connect_server.py"
+)
+MCP_WORKING_DIR = os.environ.get("MCP_WORKING_DIR", "/Users/bangjeonghwan/IdeaProjects/mcp/pymcp")
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "2"))
+MCP_MAX_IN_FLIGHT = int(os.environ.get("MCP_MAX_IN_FLIGHT", "32"))
+MCP_REQUEST_TIMEOUT = float(os.environ.get("MCP_REQUEST_TIMEOUT", "30"))
+
+# 전역 MCP 워커 풀 (앱 시작 시 미리 띄움)
+mcp_pool = None
+
+async def get_mcp_client() -> MCPWorkerPool:
+    """MCP 워커 풀 반환 (FixedMCPClient와 같은 call_tool/list_tools 제공)"""
+    if mcp_pool is None:
+        raise HTTPException(status_code=503, detail="MCP 워커 풀이 아직 준비되지 않았습니다.")
+    return mcp_pool
+
+@app.on_event("startup")
+async def startup_event():
+    """서버 시작 시 MCP 워커 풀 준비"""
+    global mcp_pool
+    pool = MCPWorkerPool(
+        MCP_SERVER_PATH,
+        MCP_WORKING_DIR,
+        size=MCP_POOL_SIZE,
+        max_in_flight=MCP_MAX_IN_FLIGHT,
+        request_timeout=MCP_REQUEST_TIMEOUT
+    )
+    await pool.start()
+    mcp_pool = pool
 
 # API 엔드포인트들
 @app.get("/")
@@ -88,13 +107,19 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def pool_metrics():
+    """MCP 워커 풀 및 워커별 지표 조회"""
+    client = await get_mcp_client()
+    return client.metrics()
+
 @app.get("/tools")
 async def list_tools():
     """사용 가능한 도구 목록 조회"""
     try:
         client = await get_mcp_client()
         tools = await client.list_tools()
-        return {"tools": tools}
+        return {"tools": tools, "schemas": client.registry.to_list()}
     except Exception as e:
         logger.error(f"도구 목록 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -106,7 +131,18 @@ async def call_tool(request: ToolRequest):
         logger.info(f"도구 호출: {request.tool_name}, 인수: {request.arguments}")
         
         client = await get_mcp_client()
-        result = await client.call_tool(request.tool_name, request.arguments)
+        
+        # 캐시된 스키마로 먼저 검증하여 잘못된 호출은 서버로 보내지 않음
+        # (오류를 error 필드로 돌려주기 위해 여기서 검증하고, 풀에서는 다시 검증하지 않음)
+        errors = client.validate(request.tool_name, request.arguments)
+        if errors:
+            return ToolResponse(
+                success=False,
+                result="",
+                error="; ".join(errors)
+            )
+        
+        result = await client.call_tool(request.tool_name, request.arguments, validated=True)
         
         return ToolResponse(
             success=True,
@@ -186,10 +222,10 @@ async def get_trending_videos(request: SimpleRequest):
 @app.on_event("shutdown")
 async def shutdown_event():
     """서버 종료 시 리소스 정리"""
-    global mcp_client
-    if mcp_client:
-        await mcp_client.stop_server()
-        mcp_client = None
+    global mcp_pool
+    if mcp_pool:
+        await mcp_pool.stop()
+        mcp_pool = None
     logger.info("API 서버가 종료되었습니다.")
 
 if __name__ == "__main__":
@@ -4,24 +4,50 @@
 """
 
 import asyncio
+import itertools
 import json
 import sys
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 import logging
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 서버 응답 한 줄의 최대 크기 (비디오 전체 설명 등 긴 응답 대비, 기본값 64KB)
+STREAM_LIMIT = 16 * 1024 * 1024
+
 class FixedMCPClient:
-    """수정된 MCP 서버와 통신하는 클라이언트"""
+    """수정된 MCP 서버와 통신하는 클라이언트
+
+    요청마다 증가하는 JSON-RPC id를 부여하고, 백그라운드 리더 태스크가
+    응답 id에 맞는 Future를 완료시키므로 여러 요청이 하나의 서버
+    프로세스를 동시에 안전하게 공유할 수 있습니다.
+    """
     
-    def __init__(self, server_path: str, working_dir: str):
+    def __init__(self, server_path: str, working_dir: str,
+                 max_in_flight: int = 16, request_timeout: float = 30.0,
+                 startup_timeout: float = 30.0):
         self.server_path = server_path
         self.working_dir = working_dir
+        self.max_in_flight = max_in_flight
+        self.request_timeout = request_timeout
+        self.startup_timeout = startup_timeout
         self.process = None
         self.initialized = False
         
+        # 요청 통계 (풀의 상태 점검과 워커별 지표에 사용)
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0, "total_latency_ms": 0.0}
+        self.consecutive_timeouts = 0
+        
+        self._next_id = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._reader_task = None
+        self._stderr_task = None
+        
     async def start_server(self):
         """MCP 서버 시작 및 초기화"""
         try:
@@ -30,17 +56,18 @@ class FixedMCPClient:
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                cwd=self.working_dir
+                cwd=self.working_dir,
+                limit=STREAM_LIMIT
             )
             logger.info("MCP 서버가 시작되었습니다.")
             
-            # 서버 초기화 대기
-            await asyncio.sleep(2)
+            self._reader_task = asyncio.create_task(self._read_loop())
+            self._stderr_task = asyncio.create_task(self._drain_stderr())
             
-            # MCP 초기화 요청
+            # 고정 대기 대신 initialize 핸드셰이크 응답으로 준비 완료를 판단
             await self._initialize_mcp()
             
-            return True
+            return self.initialized
         except Exception as e:
             logger.error(f"서버 시작 실패: {e}")
             return False
@@ -49,35 +76,25 @@ class FixedMCPClient:
         """MCP 프로토콜 초기화"""
         try:
             # 1. initialize 요청
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "clientInfo": {
-                        "name": "test-client",
-                        "version": "1.0.0"
-                    }
+            init_response = await self._request("initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {
+                    "tools": {}
+                },
+                "clientInfo": {
+                    "name": "test-client",
+                    "version": "1.0.0"
                 }
-            }
-            
-            await self._send_request(init_request)
-            init_response = await self._read_response()
+            }, timeout=self.startup_timeout)
             
             if "result" in init_response:
                 logger.info("MCP 초기화 성공")
                 
                 # 2. initialized 알림
-                initialized_notification = {
+                await self._send_request({
                     "jsonrpc": "2.0",
                     "method": "notifications/initialized"
-                }
-                
-                await self._send_request(initialized_notification)
+                })
                 self.initialized = True
                 logger.info("MCP 초기화 완료")
             else:
@@ -87,58 +104,137 @@ class FixedMCPClient:
             logger.error(f"MCP 초기화 중 오류: {e}")
     
     async def _send_request(self, request: dict):
-        """요청 전송"""
+        """요청 전송 (여러 요청이 한 줄씩 섞이지 않도록 직렬화)"""
         request_json = json.dumps(request) + "\n"
-        self.process.stdin.write(request_json.encode())
-        await self.process.stdin.drain()
+        async with self._write_lock:
+            self.process.stdin.write(request_json.encode())
+            await self.process.stdin.drain()
         logger.debug(f"요청 전송: {request_json.strip()}")
     
-    async def _read_response(self, timeout: float = 10.0):
-        """응답 읽기"""
+    async def _request(self, method: str, params: Optional[dict] = None,
+                       timeout: Optional[float] = None) -> dict:
+        """id를 부여한 요청을 보내고 같은 id의 응답을 기다림"""
+        async with self._in_flight:
+            request_id = next(self._next_id)
+            request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+            if params is not None:
+                request["params"] = params
+            
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            started = time.perf_counter()
+            self.stats["requests"] += 1
+            try:
+                await self._send_request(request)
+                response = await asyncio.wait_for(future, timeout=timeout or self.request_timeout)
+                self.consecutive_timeouts = 0
+                if "error" in response:
+                    self.stats["errors"] += 1
+                return response
+            except asyncio.TimeoutError:
+                logger.error(f"응답 타임아웃: {method} (id={request_id})")
+                self.stats["timeouts"] += 1
+                self.consecutive_timeouts += 1
+                return {"error": {"message": "Timeout"}}
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                self.stats["total_latency_ms"] += (time.perf_counter() - started) * 1000
+                self._pending.pop(request_id, None)
+    
+    async def _read_loop(self):
+        """서버 stdout을 읽어 응답 id에 해당하는 Future를 완료"""
         try:
-            response_line = await asyncio.wait_for(
-                self.process.stdout.readline(), 
-                timeout=timeout
-            )
-            if response_line:
-                response = json.loads(response_line.decode().strip())
+            while True:
+                response_line = await self.process.stdout.readline()
+                if not response_line:
+                    break
+                try:
+                    response = json.loads(response_line.decode().strip())
+                except json.JSONDecodeError as e:
+                    logger.error(f"JSON 파싱 오류: {e}")
+                    continue
+                
                 logger.debug(f"응답 수신: {response}")
-                return response
-            else:
-                return {"error": "No response"}
-        except asyncio.TimeoutError:
-            logger.error("응답 타임아웃")
-            return {"error": "Timeout"}
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON 파싱 오류: {e}")
-            return {"error": f"JSON decode error: {e}"}
+                future = self._pending.get(response.get("id"))
+                if future and not future.done():
+                    future.set_result(response)
+                elif "id" not in response:
+                    logger.debug(f"서버 알림 수신: {response.get('method')}")
+                else:
+                    logger.warning(f"대기 중인 요청이 없는 응답: id={response.get('id')}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"응답 읽기 중 오류: {e}")
+        finally:
+            self.initialized = False
+            self._fail_pending("MCP 서버 연결이 종료되었습니다.")
+    
+    async def _drain_stderr(self):
+        """stderr 파이프가 가득 차 서버가 멈추지 않도록 계속 비움"""
+        try:
+            while True:
+                line = await self.process.stderr.readline()
+                if not line:
+                    break
+                logger.debug(f"MCP 서버 stderr: {line.decode(errors='replace').rstrip()}")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+    
+    def _fail_pending(self, message: str):
+        """대기 중인 모든 요청을 오류 응답으로 완료"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result({"error": {"message": message}})
+        self._pending.clear()
+    
+    @property
+    def in_flight(self) -> int:
+        """응답을 기다리는 요청 수"""
+        return len(self._pending)
+    
+    @property
+    def is_alive(self) -> bool:
+        """서버 프로세스가 살아 있고 초기화가 끝났는지 여부"""
+        return (self.initialized and self.process is not None
+                and self.process.returncode is None)
+    
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """MCP ping 요청으로 서버 응답 여부 확인"""
+        if not self.is_alive:
+            return False
+        response = await self._request("ping", timeout=timeout)
+        return "result" in response
     
     async def stop_server(self):
         """MCP 서버 중지"""
         if self.process:
-            self.process.terminate()
+            if self.process.returncode is None:
+                self.process.terminate()
             await self.process.wait()
             logger.info("MCP 서버가 중지되었습니다.")
+        for task in (self._reader_task, self._stderr_task):
+            if task:
+                task.cancel()
+        self._fail_pending("MCP 서버가 중지되었습니다.")
+        self.initialized = False
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None) -> str:
         """MCP 도구 호출"""
         if not self.initialized:
             return "❌ MCP 서버가 초기화되지 않았습니다."
         
         try:
             # 도구 호출 요청
-            request = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
+            response = await self._request("tools/call", {
+                "name": tool_name,
+                "arguments": arguments
+            }, timeout=timeout)
             
             # 응답 처리
             if "result" in response:
@@ -155,34 +251,34 @@ class FixedMCPClient:
             logger.error(f"도구 호출 실패: {e}")
             return f"❌ 도구 호출 실패: {str(e)}"
     
-    async def list_tools(self) -> str:
-        """사용 가능한 도구 목록 조회"""
+    async def fetch_tool_catalog(self) -> Optional[List[Dict[str, Any]]]:
+        """tools/list 원본 결과 (도구 이름, 설명, inputSchema) 조회"""
         if not self.initialized:
-            return "❌ MCP 서버가 초기화되지 않았습니다."
+            return None
         
         try:
-            # 도구 목록 요청
-            request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/list"
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
+            response = await self._request("tools/list")
             if "result" in response and "tools" in response["result"]:
-                tools = response["result"]["tools"]
-                tool_list = []
-                for tool in tools:
-                    tool_list.append(f"- {tool['name']}: {tool.get('description', '설명 없음')}")
-                return "\n".join(tool_list)
-            else:
-                return "❌ 도구 목록을 가져올 수 없습니다."
-                
+                return response["result"]["tools"]
+            logger.error(f"도구 목록 응답 오류: {response}")
+            return None
         except Exception as e:
             logger.error(f"도구 목록 조회 실패: {e}")
-            return f"❌ 도구 목록 조회 실패: {str(e)}"
+            return None
+    
+    async def list_tools(self) -> str:
+        """사용 가능한 도구 목록 조회"""
+        if not self.initialized:
+            return "❌ MCP 서버가 초기화되지 않았습니다."
+        
+        tools = await self.fetch_tool_catalog()
+        if tools is None:
+            return "❌ 도구 목록을 가져올 수 없습니다."
+        
+        tool_list = []
+        for tool in tools:
+            tool_list.append(f"- {tool['name']}: {tool.get('description', '설명 없음')}")
+        return "\n".join(tool_list)
 
 # 테스트 함수
 async def test_fixed_mcp():
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+MCP 서버 워커 풀 - 미리 띄워 둔 여러 MCP 서버 프로세스에 요청 분배
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+from mcp_client import FixedMCPClient
+from tool_registry import ToolRegistry
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MCPWorker:
+    """풀에 속한 MCP 서버 프로세스 1개와 그 지표"""
+
+    def __init__(self, worker_id: int, server_path: str, working_dir: str,
+                 max_in_flight: int, request_timeout: float):
+        self.worker_id = worker_id
+        self.server_path = server_path
+        self.working_dir = working_dir
+        self.max_in_flight = max_in_flight
+        self.request_timeout = request_timeout
+        self.client: Optional[FixedMCPClient] = None
+        self.registry = ToolRegistry()
+        self.restart_lock = asyncio.Lock()
+        self.restarts = 0
+        self.started_at = None
+        self.startup_ms = None
+        self.last_error = None
+
+    async def start(self) -> bool:
+        """새 서버 프로세스를 띄우고 initialize 핸드셰이크까지 완료"""
+        self.client = FixedMCPClient(
+            self.server_path, self.working_dir,
+            max_in_flight=self.max_in_flight,
+            request_timeout=self.request_timeout
+        )
+        started = time.perf_counter()
+        ready = await self.client.start_server()
+        self.startup_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.started_at = datetime.now().isoformat()
+        if ready:
+            # 도구 카탈로그는 워커가 (재)시작될 때만 가져옴
+            tools = await self.client.fetch_tool_catalog()
+            if tools is not None:
+                self.registry = ToolRegistry(tools)
+            logger.info(f"MCP 워커 {self.worker_id} 준비 완료 ({self.startup_ms}ms, 도구 {len(self.registry)}개)")
+        else:
+            self.last_error = "initialize 핸드셰이크 실패"
+            logger.error(f"MCP 워커 {self.worker_id} 시작 실패")
+        return ready
+
+    async def stop(self):
+        """서버 프로세스 종료"""
+        if self.client:
+            await self.client.stop_server()
+
+    @property
+    def load(self) -> int:
+        """처리 중인 요청 수"""
+        return self.client.in_flight if self.client else 0
+
+    def is_healthy(self, max_consecutive_timeouts: int) -> bool:
+        """요청을 받을 수 있는 상태인지 여부"""
+        return (self.client is not None and self.client.is_alive
+                and self.client.consecutive_timeouts < max_consecutive_timeouts)
+
+    def metrics(self) -> Dict[str, Any]:
+        """워커별 지표"""
+        stats = self.client.stats if self.client else {}
+        requests = stats.get("requests", 0)
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.client.process.pid if self.client and self.client.process else None,
+            "alive": bool(self.client and self.client.is_alive),
+            "in_flight": self.load,
+            "requests": requests,
+            "errors": stats.get("errors", 0),
+            "timeouts": stats.get("timeouts", 0),
+            "avg_latency_ms": round(stats.get("total_latency_ms", 0.0) / requests, 1) if requests else 0.0,
+            "restarts": self.restarts,
+            "started_at": self.started_at,
+            "startup_ms": self.startup_ms,
+            "tools": len(self.registry),
+            "last_error": self.last_error
+        }
+
+class MCPWorkerPool:
+    """미리 띄워 둔 MCP 워커들에 최소 부하 기준으로 요청을 분배하는 풀
+
+    종료되었거나 연속 타임아웃이 난 워커는 자동으로 재시작합니다.
+    FixedMCPClient와 같은 call_tool/list_tools 인터페이스를 제공합니다.
+    """
+
+    def __init__(self, server_path: str, working_dir: str, size: int = 2,
+                 max_in_flight: int = 16, request_timeout: float = 30.0,
+                 health_check_interval: float = 10.0, max_consecutive_timeouts: int = 3):
+        self.health_check_interval = health_check_interval
+        self.max_consecutive_timeouts = max_consecutive_timeouts
+        self.workers: List[MCPWorker] = [
+            MCPWorker(i, server_path, working_dir, max_in_flight, request_timeout)
+            for i in range(size)
+        ]
+        self._monitor_task = None
+        # 호출 후 시작한 재시작 태스크 (이벤트 루프는 태스크를 약하게 참조하므로 끝날 때까지 보관)
+        self._background = set()
+
+    async def start(self):
+        """모든 워커를 동시에 띄우고 상태 점검 태스크 시작"""
+        results = await asyncio.gather(*(worker.start() for worker in self.workers))
+        logger.info(f"MCP 워커 풀 시작: {sum(results)}/{len(self.workers)}개 준비 완료")
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        """상태 점검을 멈추고 모든 워커 종료"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await asyncio.gather(*(worker.stop() for worker in self.workers), return_exceptions=True)
+        logger.info("MCP 워커 풀이 종료되었습니다.")
+
+    async def _restart(self, worker: MCPWorker):
+        """워커 재시작 (동시에 여러 번 재시작되지 않도록 잠금)"""
+        async with worker.restart_lock:
+            if worker.is_healthy(self.max_consecutive_timeouts):
+                return
+            logger.warning(f"MCP 워커 {worker.worker_id} 재시작")
+            await worker.stop()
+            worker.restarts += 1
+            await worker.start()
+
+    async def _monitor(self):
+        """주기적으로 워커 상태를 점검하고 문제가 있으면 재시작"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for worker in self.workers:
+                try:
+                    healthy = worker.is_healthy(self.max_consecutive_timeouts)
+                    if healthy and worker.load == 0:
+                        healthy = await worker.client.ping()
+                    if not healthy:
+                        worker.last_error = "상태 점검 실패"
+                        await self._restart(worker)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    worker.last_error = str(e)
+                    logger.error(f"MCP 워커 {worker.worker_id} 상태 점검 오류: {e}")
+
+    async def _acquire(self) -> Optional[MCPWorker]:
+        """처리 중인 요청이 가장 적은 정상 워커 선택"""
+        healthy = [w for w in self.workers if w.is_healthy(self.max_consecutive_timeouts)]
+        if not healthy:
+            # 정상 워커가 없으면 하나를 즉시 재시작해서 사용
+            await self._restart(self.workers[0])
+            healthy = [w for w in self.workers if w.is_healthy(self.max_consecutive_timeouts)]
+            if not healthy:
+                return None
+        return min(healthy, key=lambda w: w.load)
+
+    def _check_after_call(self, worker: MCPWorker):
+        """호출 후 워커가 비정상이 되었으면 백그라운드에서 재시작"""
+        if not worker.is_healthy(self.max_consecutive_timeouts):
+            task = asyncio.create_task(self._restart(worker))
+            self._background.add(task)
+            task.add_done_callback(lambda done: self._restart_done(worker, done))
+
+    def _restart_done(self, worker: MCPWorker, task: asyncio.Task):
+        """백그라운드 재시작 태스크 정리 (예외는 가져와서 기록)"""
+        self._background.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            worker.last_error = str(error)
+            logger.error(f"MCP 워커 {worker.worker_id} 재시작 실패: {error}")
+
+    @property
+    def registry(self) -> ToolRegistry:
+        """정상 워커가 가진 도구 카탈로그 (없으면 빈 레지스트리)"""
+        for worker in self.workers:
+            if worker.is_healthy(self.max_consecutive_timeouts) and len(worker.registry):
+                return worker.registry
+        return ToolRegistry()
+
+    def validate(self, tool_name: str, arguments: Dict[str, Any]) -> List[str]:
+        """서버 프로세스를 거치지 않고 도구 이름과 인수를 검증"""
+        registry = self.registry
+        if not len(registry):
+            # 카탈로그가 없으면 검증을 서버에 맡김
+            return []
+        return registry.validate(tool_name, arguments)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None, validated: bool = False) -> str:
+        """MCP 도구 호출 (인수가 스키마와 맞지 않으면 서버로 보내지 않음)
+
+        validated: 호출한 쪽이 이미 validate()로 검증했으면 True (같은 인수를 다시 검증하지 않음)
+        """
+        if not validated:
+            errors = self.validate(tool_name, arguments)
+            if errors:
+                return f"❌ 잘못된 도구 호출: {'; '.join(errors)}"
+
+        worker = await self._acquire()
+        if worker is None:
+            return "❌ 사용 가능한 MCP 워커가 없습니다."
+        try:
+            return await worker.client.call_tool(tool_name, arguments, timeout=timeout)
+        finally:
+            self._check_after_call(worker)
+
+    async def list_tools(self) -> str:
+        """사용 가능한 도구 목록 조회 (캐시된 카탈로그 사용)"""
+        registry = self.registry
+        if not len(registry):
+            return "❌ 도구 목록을 가져올 수 없습니다."
+        return registry.format_list()
+
+    def metrics(self) -> Dict[str, Any]:
+        """풀 전체 및 워커별 지표"""
+        workers = [worker.metrics() for worker in self.workers]
+        return {
+            "size": len(self.workers),
+            "healthy": sum(1 for w in self.workers if w.is_healthy(self.max_consecutive_timeouts)),
+            "in_flight": sum(w["in_flight"] for w in workers),
+            "workers": workers
+        }
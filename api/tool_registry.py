@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+MCP 도구 스키마 레지스트리 - tools/list 결과를 캐시하고 호출 인수를 로컬에서 검증
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+# JSON Schema 타입 -> 허용되는 파이썬 타입
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),)
+}
+
+@dataclass
+class ToolParameter:
+    """도구 인수 1개의 스키마"""
+    name: str
+    types: List[str]
+    required: bool
+    description: Optional[str] = None
+    default: Any = None
+
+    def accepts(self, value: Any) -> bool:
+        """값이 선언된 타입 중 하나와 맞는지 확인"""
+        if not self.types:
+            return True
+        for type_name in self.types:
+            python_types = JSON_TYPES.get(type_name)
+            if python_types is None:
+                return True
+            # bool은 int의 하위 클래스이므로 숫자 타입으로 인정하지 않음
+            if isinstance(value, bool) and type_name in ("integer", "number"):
+                continue
+            if isinstance(value, python_types):
+                return True
+        return False
+
+@dataclass
+class ToolSchema:
+    """MCP 도구 1개의 타입 스키마"""
+    name: str
+    description: str
+    parameters: Dict[str, ToolParameter] = field(default_factory=dict)
+    input_schema: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_mcp(cls, tool: Dict[str, Any]) -> "ToolSchema":
+        """tools/list 응답의 도구 항목으로부터 생성"""
+        input_schema = tool.get("inputSchema") or {}
+        required = set(input_schema.get("required", []))
+        parameters = {}
+        for name, spec in input_schema.get("properties", {}).items():
+            parameters[name] = ToolParameter(
+                name=name,
+                types=cls._types_of(spec),
+                required=name in required,
+                description=spec.get("description") or spec.get("title"),
+                default=spec.get("default")
+            )
+        return cls(
+            name=tool["name"],
+            description=tool.get("description") or "설명 없음",
+            parameters=parameters,
+            input_schema=input_schema
+        )
+
+    @staticmethod
+    def _types_of(spec: Dict[str, Any]) -> List[str]:
+        """'type' 또는 'anyOf'에 선언된 JSON 타입 목록"""
+        if "type" in spec:
+            return spec["type"] if isinstance(spec["type"], list) else [spec["type"]]
+        types = []
+        for option in spec.get("anyOf", []):
+            if "type" in option:
+                types.append(option["type"])
+        return types
+
+    def validate(self, arguments: Dict[str, Any]) -> List[str]:
+        """인수 검증. 문제가 없으면 빈 목록 반환"""
+        errors = []
+        for name, parameter in self.parameters.items():
+            if parameter.required and name not in arguments:
+                errors.append(f"필수 인수 누락: {name}")
+        for name, value in arguments.items():
+            parameter = self.parameters.get(name)
+            if parameter is None:
+                errors.append(f"알 수 없는 인수: {name}")
+            elif not parameter.accepts(value):
+                errors.append(f"인수 타입 오류: {name} (기대 타입: {', '.join(parameter.types)})")
+        return errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API 응답용 딕셔너리"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "parameters": [
+                {
+                    "name": p.name,
+                    "types": p.types,
+                    "required": p.required,
+                    "description": p.description,
+                    "default": p.default
+                }
+                for p in self.parameters.values()
+            ]
+        }
+
+class ToolRegistry:
+    """워커가 시작될 때 받은 도구 카탈로그 (요청마다 tools/list를 호출하지 않음)"""
+
+    def __init__(self, tools: Optional[List[Dict[str, Any]]] = None):
+        self.schemas: Dict[str, ToolSchema] = {}
+        if tools:
+            self.update(tools)
+
+    def update(self, tools: List[Dict[str, Any]]):
+        """tools/list 결과로 카탈로그 교체"""
+        self.schemas = {tool["name"]: ToolSchema.from_mcp(tool) for tool in tools}
+
+    def __contains__(self, tool_name: str) -> bool:
+        return tool_name in self.schemas
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def validate(self, tool_name: str, arguments: Dict[str, Any]) -> List[str]:
+        """도구 이름과 인수 검증. 문제가 없으면 빈 목록 반환"""
+        schema = self.schemas.get(tool_name)
+        if schema is None:
+            return [f"알 수 없는 도구: {tool_name}"]
+        return schema.validate(arguments)
+
+    def format_list(self) -> str:
+        """기존 /tools 응답과 같은 문자열 형식"""
+        return "\n".join(f"- {s.name}: {s.description}" for s in self.schemas.values())
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """API 응답용 스키마 목록"""
+        return [schema.to_dict() for schema in self.schemas.values()]
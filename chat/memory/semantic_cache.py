@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+시맨틱 응답 캐시 - 의미가 같은 질문에 대한 LLM 응답 재사용
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+import logging
+
+from memory.memory_manager import memory_manager
+
+logger = logging.getLogger(__name__)
+
+# 이보다 짧은 프롬프트(정규화 후 글자 수)는 정규화 키 완전 일치로만 적중
+# (임베딩 모델 all-MiniLM-L6-v2는 영어 전용이라 "PER이 뭐야"/"PBR이 뭐야" 같은 짧은 한국어 질문이
+# 임계값 이상으로 서로 가깝게 나옴)
+MIN_SEMANTIC_LENGTH = 20
+
+# 영문 약어/종목 코드/숫자 토큰 (PER, PBR, 005930, 2024 등). 유사도 적중은 이 토큰이 같은 항목끼리만 허용
+KEY_TERM_PATTERN = re.compile(r'[a-z0-9]+(?:\.[a-z0-9]+)*')
+
+class SemanticResponseCache:
+    """임베딩 유사도 기반 LLM 응답 캐시 (도구별 TTL, LRU 용량 제한)"""
+
+    def __init__(self, embedding_model=None, similarity_threshold: float = 0.92,
+                 max_entries: int = 2000, ttl_seconds: Optional[Dict[str, int]] = None,
+                 min_semantic_length: int = MIN_SEMANTIC_LENGTH):
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.min_semantic_length = min_semantic_length
+        self.max_entries = max_entries
+        # 캐시 대상 도구별 TTL (초)
+        self.ttl_seconds = ttl_seconds or {
+            'ask_openai': 60 * 60,
+            'explain_concept': 24 * 60 * 60
+        }
+
+        # 키: (도구 이름, 정규화된 프롬프트), 값: 캐시 항목. 순서가 곧 LRU 순서
+        self.entries = OrderedDict()
+        # 최근 계산한 임베딩 (조회 후 저장 시 재계산 방지)
+        self.embedding_memo = OrderedDict()
+        self.stats = {'hits': 0, 'semantic_hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+        self.lock = threading.Lock()
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """캐시 대상 도구인지 확인"""
+        return tool_name in self.ttl_seconds
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        return re.sub(r'\s+', ' ', prompt).strip().lower()
+
+    @staticmethod
+    def _key_terms(normalized: str) -> frozenset:
+        return frozenset(KEY_TERM_PATTERN.findall(normalized))
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        """정규화된 프롬프트의 임베딩 (단위 벡터)"""
+        if not self.embedding_model:
+            return None
+
+        with self.lock:
+            if normalized in self.embedding_memo:
+                self.embedding_memo.move_to_end(normalized)
+                return self.embedding_memo[normalized]
+
+        try:
+            embedding = self.embedding_model.encode(normalized, normalize_embeddings=True)
+        except Exception as e:
+            logger.error(f"Failed to embed prompt for semantic cache: {e}")
+            return None
+
+        embedding = np.asarray(embedding, dtype=np.float32)
+        with self.lock:
+            self.embedding_memo[normalized] = embedding
+            if len(self.embedding_memo) > 256:
+                self.embedding_memo.popitem(last=False)
+        return embedding
+
+    def _purge_expired(self, now: float):
+        expired = [key for key, entry in self.entries.items() if entry['expires_at'] <= now]
+        for key in expired:
+            del self.entries[key]
+        self.stats['expired'] += len(expired)
+
+    def lookup(self, tool_name: str, prompt: str) -> Optional[Dict]:
+        """캐시 조회. 적중 시 응답과 유사도 정보를, 미적중 시 None 반환"""
+        if not self.is_cacheable(tool_name):
+            return None
+
+        normalized = self._normalize(prompt)
+        now = time.time()
+
+        # 1단계: 정규화된 프롬프트 완전 일치 (임베딩 계산 없이)
+        with self.lock:
+            self._purge_expired(now)
+            entry = self.entries.get((tool_name, normalized))
+            if entry:
+                self.entries.move_to_end((tool_name, normalized))
+                self.stats['hits'] += 1
+                return self._hit(entry, 1.0, now)
+
+        # 2단계: 임베딩 코사인 유사도가 임계값 이상인 가장 가까운 항목
+        # (짧은 프롬프트는 건너뛰고, 영문 약어/숫자 토큰이 같은 항목만 후보)
+        embedding = self._embed(normalized) if len(normalized) >= self.min_semantic_length else None
+        if embedding is None:
+            with self.lock:
+                self.stats['misses'] += 1
+            return None
+
+        terms = self._key_terms(normalized)
+        with self.lock:
+            candidates = [(key, entry) for key, entry in self.entries.items()
+                          if key[0] == tool_name and entry['embedding'] is not None and entry['terms'] == terms]
+            if candidates:
+                matrix = np.stack([entry['embedding'] for _, entry in candidates])
+                similarities = matrix @ embedding
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                if similarity >= self.similarity_threshold:
+                    key, entry = candidates[best]
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    self.stats['semantic_hits'] += 1
+                    return self._hit(entry, similarity, now)
+            self.stats['misses'] += 1
+        return None
+
+    @staticmethod
+    def _hit(entry: Dict, similarity: float, now: float) -> Dict:
+        return {
+            'response': entry['response'],
+            'similarity': round(similarity, 4),
+            'matched_prompt': entry['prompt'],
+            'age_seconds': round(now - entry['created_at'], 1)
+        }
+
+    def store(self, tool_name: str, prompt: str, response: str):
+        """성공한 LLM 응답을 캐시에 저장"""
+        if not self.is_cacheable(tool_name) or not response:
+            return
+
+        normalized = self._normalize(prompt)
+        # 짧은 프롬프트는 완전 일치로만 조회하므로 임베딩을 계산하지 않음
+        embedding = self._embed(normalized) if len(normalized) >= self.min_semantic_length else None
+        now = time.time()
+
+        with self.lock:
+            key = (tool_name, normalized)
+            self.entries[key] = {
+                'prompt': prompt,
+                'response': response,
+                'embedding': embedding,
+                'terms': self._key_terms(normalized),
+                'created_at': now,
+                'expires_at': now + self.ttl_seconds[tool_name]
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """캐시 비우기"""
+        with self.lock:
+            self.entries.clear()
+            self.embedding_memo.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 적중률 및 용량 통계"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                'similarity_threshold': self.similarity_threshold,
+                'min_semantic_length': self.min_semantic_length,
+                'ttl_seconds': dict(self.ttl_seconds)
+            }
+
+# 전역 인스턴스 (메모리 관리자의 임베딩 모델 재사용)
+semantic_cache = SemanticResponseCache(memory_manager.vector_manager.embedding_model)
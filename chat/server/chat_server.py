@@ -12,17 +12,20 @@ import json
 import os
 import requests
 import re
+import time
+from collections import defaultdict, deque
 from datetime import datetime
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from memory.memory_manager import memory_manager
 from memory.context_resolver import context_resolver
+from memory.semantic_cache import semantic_cache
 from patterns.pattern_learner import pattern_learner
 from patterns.dynamic_pattern_manager import dynamic_pattern_manager
 from chat_server_analyze import user_analyzer
@@ -79,6 +82,84 @@ def get_youtube_api_key():
     """환경 변수에서 YouTube API 키를 가져옵니다."""
     return os.environ.get("YOUTUBE_API_KEY")
 
+# LLM 프롬프트 템플릿 (동기 호출과 스트리밍 호출이 공유)
+ASK_OPENAI_PROMPT = """다음 질문에 대해 친근하고 도움이 되는 답변을 제공해주세요. 
+답변은 한국어로 작성하고, ChatGPT처럼 자연스럽고 친근한 톤으로 답변해주세요.
+
+질문: {question}
+
+답변:"""
+
+EXPLAIN_CONCEPT_PROMPT = """'{concept}'에 대해 친근하고 이해하기 쉽게 설명해주세요.
+
+요구사항:
+- 중학생도 이해할 수 있는 쉬운 설명
+- 구체적인 예시 포함
+- 한국어로 작성
+- ChatGPT처럼 자연스럽고 친근한 톤
+
+설명:"""
+
+VIDEO_SUMMARY_PROMPT = """다음 YouTube 비디오 정보를 바탕으로 간결하고 유용한 요약을 제공해주세요:
+
+{video_info}
+
+요약 요구사항:
+1. 비디오의 핵심 내용을 3-4줄로 요약
+2. 주요 키워드나 주제 강조
+3. 시청자에게 유용한 정보 중심으로 정리
+4. 한국어로 작성
+
+요약:"""
+
+VIDEO_SUMMARY_HEADER = """안녕하세요! 요청하신 YouTube 비디오의 상세 정보를 확인하고 요약해드리겠습니다.
+
+📺 비디오 정보
+{video_info}
+
+📝 핵심 요약
+"""
+
+VIDEO_SUMMARY_FOOTER = """
+
+이 정보가 도움이 되셨나요? 추가로 궁금한 점이 있으시면 언제든 말씀해 주세요! 😊"""
+
+class LatencyTracker:
+    """도구별 응답 지연 시간(TTFT, 전체 응답 시간) 측정기"""
+    
+    def __init__(self, max_samples: int = 500):
+        self.ttft_ms = defaultdict(lambda: deque(maxlen=max_samples))
+        self.total_ms = defaultdict(lambda: deque(maxlen=max_samples))
+    
+    def record(self, tool_name: str, ttft_ms: float, total_ms: float):
+        """요청 1건의 측정값 기록"""
+        self.ttft_ms[tool_name].append(ttft_ms)
+        self.total_ms[tool_name].append(total_ms)
+    
+    @staticmethod
+    def _percentile(samples, q: float) -> float:
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return round(ordered[index], 1)
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """도구별 TTFT/전체 응답 시간 p50, p95 요약"""
+        result = {}
+        for tool_name, samples in self.ttft_ms.items():
+            if not samples:
+                continue
+            totals = self.total_ms[tool_name]
+            result[tool_name] = {
+                "count": len(samples),
+                "ttft_p50_ms": self._percentile(samples, 0.5),
+                "ttft_p95_ms": self._percentile(samples, 0.95),
+                "total_p50_ms": self._percentile(totals, 0.5),
+                "total_p95_ms": self._percentile(totals, 0.95)
+            }
+        return result
+
+latency_tracker = LatencyTracker()
+
 # External Connect Server 도구들
 class ExternalTools:
     """external_connect_server의 모든 도구를 구현한 클래스"""
@@ -98,16 +179,10 @@ class ExternalTools:
 OpenAI API 키가 설정되지 않아서 질문에 답변드릴 수 없습니다. API 키를 설정해주시면 도움을 드릴 수 있습니다! 😊"""
         
         try:
-            prompt = ChatPromptTemplate.from_template(
-                """다음 질문에 대해 친근하고 도움이 되는 답변을 제공해주세요. 
-답변은 한국어로 작성하고, ChatGPT처럼 자연스럽고 친근한 톤으로 답변해주세요.
-
-질문: {question}
-
-답변:"""
-            )
+            prompt = ChatPromptTemplate.from_template(ASK_OPENAI_PROMPT)
             chain = prompt | model
             result = chain.invoke({"question": question})
+            semantic_cache.store('ask_openai', question, result.content)
             return result.content
         except Exception as e:
             return f"""안녕하세요! 죄송하지만 답변 생성 중 오류가 발생했습니다.
@@ -126,19 +201,10 @@ OpenAI API 키가 설정되지 않아서 질문에 답변드릴 수 없습니다
 OpenAI API 키가 설정되지 않아서 '{concept}'에 대해 설명드릴 수 없습니다. API 키를 설정해주시면 도움을 드릴 수 있습니다! 😊"""
         
         try:
-            prompt = ChatPromptTemplate.from_template(
-                """'{concept}'에 대해 친근하고 이해하기 쉽게 설명해주세요.
-
-요구사항:
-- 중학생도 이해할 수 있는 쉬운 설명
-- 구체적인 예시 포함
-- 한국어로 작성
-- ChatGPT처럼 자연스럽고 친근한 톤
-
-설명:"""
-            )
+            prompt = ChatPromptTemplate.from_template(EXPLAIN_CONCEPT_PROMPT)
             chain = prompt | model
             result = chain.invoke({"concept": concept})
+            semantic_cache.store('explain_concept', concept, result.content)
             return result.content
         except Exception as e:
             return f"""안녕하세요! 죄송하지만 '{concept}'에 대한 설명 생성 중 오류가 발생했습니다.
@@ -275,37 +341,87 @@ https://www.youtube.com/watch?v={video_id}
             return f"{video_info}\n\n⚠️ 요약 기능을 사용할 수 없습니다. OpenAI API 키가 필요합니다."
         
         try:
-            prompt = ChatPromptTemplate.from_template(
-                """다음 YouTube 비디오 정보를 바탕으로 간결하고 유용한 요약을 제공해주세요:
-
-{video_info}
-
-요약 요구사항:
-1. 비디오의 핵심 내용을 3-4줄로 요약
-2. 주요 키워드나 주제 강조
-3. 시청자에게 유용한 정보 중심으로 정리
-4. 한국어로 작성
-
-요약:"""
-            )
+            prompt = ChatPromptTemplate.from_template(VIDEO_SUMMARY_PROMPT)
             chain = prompt | model
             result = chain.invoke({"video_info": video_info})
             
             summary = result.content
             
-            return f"""안녕하세요! 요청하신 YouTube 비디오의 상세 정보를 확인하고 요약해드리겠습니다.
-
-📺 비디오 정보
-{video_info}
-
-📝 핵심 요약
-{summary}
-
-이 정보가 도움이 되셨나요? 추가로 궁금한 점이 있으시면 언제든 말씀해 주세요! 😊"""
+            return VIDEO_SUMMARY_HEADER.format(video_info=video_info) + summary + VIDEO_SUMMARY_FOOTER
             
         except Exception as e:
             return f"{video_info}\n\n⚠️ 요약 생성 중 오류가 발생했습니다: {str(e)}"
     
+    @staticmethod
+    async def _astream_chain(prompt_template: str, inputs: Dict[str, Any]) -> AsyncIterator[str]:
+        """프롬프트 체인을 astream으로 실행하여 토큰 단위로 반환"""
+        model = get_model()
+        prompt = ChatPromptTemplate.from_template(prompt_template)
+        chain = prompt | model
+        async for chunk in chain.astream(inputs):
+            if chunk.content:
+                yield chunk.content
+    
+    @staticmethod
+    async def astream_ask_openai(question: str) -> AsyncIterator[str]:
+        """OpenAI에게 질문 (토큰 스트리밍)"""
+        if not get_model():
+            yield await asyncio.to_thread(ExternalTools.ask_openai, question)
+            return
+        
+        try:
+            tokens = []
+            async for token in ExternalTools._astream_chain(ASK_OPENAI_PROMPT, {"question": question}):
+                tokens.append(token)
+                yield token
+            await asyncio.to_thread(semantic_cache.store, 'ask_openai', question, "".join(tokens))
+        except Exception as e:
+            yield f"""
+
+⚠️ 답변 생성 중 오류가 발생했습니다: {str(e)}"""
+    
+    @staticmethod
+    async def astream_explain_concept(concept: str) -> AsyncIterator[str]:
+        """개념 설명 (토큰 스트리밍)"""
+        if not get_model():
+            yield await asyncio.to_thread(ExternalTools.explain_concept, concept)
+            return
+        
+        try:
+            tokens = []
+            async for token in ExternalTools._astream_chain(EXPLAIN_CONCEPT_PROMPT, {"concept": concept}):
+                tokens.append(token)
+                yield token
+            await asyncio.to_thread(semantic_cache.store, 'explain_concept', concept, "".join(tokens))
+        except Exception as e:
+            yield f"""
+
+⚠️ '{concept}'에 대한 설명 생성 중 오류가 발생했습니다: {str(e)}"""
+    
+    @staticmethod
+    async def astream_get_video_info_and_summarize(video_id: str) -> AsyncIterator[str]:
+        """YouTube 비디오 상세 정보를 확인하고 요약 (요약 부분 토큰 스트리밍)"""
+        # 1단계: 비디오 상세 정보 가져오기 (블로킹 HTTP 호출은 스레드에서 실행)
+        video_info = await asyncio.to_thread(ExternalTools.get_video_info, video_id)
+        
+        if "Error" in video_info or "not found" in video_info:
+            yield video_info
+            return
+        
+        if not get_model():
+            yield f"{video_info}\n\n⚠️ 요약 기능을 사용할 수 없습니다. OpenAI API 키가 필요합니다."
+            return
+        
+        # 2단계: 비디오 정보를 먼저 보내고 요약은 토큰 단위로 스트리밍
+        yield VIDEO_SUMMARY_HEADER.format(video_info=video_info)
+        try:
+            async for token in ExternalTools._astream_chain(VIDEO_SUMMARY_PROMPT, {"video_info": video_info}):
+                yield token
+        except Exception as e:
+            yield f"\n\n⚠️ 요약 생성 중 오류가 발생했습니다: {str(e)}"
+            return
+        yield VIDEO_SUMMARY_FOOTER
+    
     @staticmethod
     def get_video_full_content(video_id: str) -> str:
         """YouTube 비디오 전체 내용 조회"""
@@ -474,6 +590,19 @@ https://www.youtube.com/watch?v={video_id}
 
 다시 시도해보시거나 다른 검색어를 사용해보시는 것을 추천드립니다. 😊"""
 
+# 토큰 스트리밍을 지원하는 도구 (도구 이름 -> 비동기 제너레이터)
+STREAMING_TOOLS = {
+    'ask_openai': ExternalTools.astream_ask_openai,
+    'explain_concept': ExternalTools.astream_explain_concept,
+    'get_video_info_and_summarize': ExternalTools.astream_get_video_info_and_summarize
+}
+
+# 시맨틱 캐시를 적용하는 도구 (도구 이름 -> 캐시 키로 쓰는 인수)
+CACHED_TOOL_ARGS = {
+    'ask_openai': 'question',
+    'explain_concept': 'concept'
+}
+
 # 메시지 분석 및 도구 선택
 class MessageAnalyzer:
     """사용자 메시지를 분석하여 적절한 도구를 선택하는 클래스 (컨텍스트 인식 포함)"""
@@ -699,6 +828,7 @@ async def stream_chat_response(message: str, user_id: str, request: Request):
     """채팅 응답을 SSE로 스트리밍 (메모리 기능 포함)"""
     analyzer = MessageAnalyzer()
     tools = ExternalTools()
+    request_started = time.perf_counter()
     
     try:
         # 사용자 ID 우선순위: 1) 클라이언트 제공 ID, 2) IP + User-Agent 해시
@@ -787,13 +917,44 @@ async def stream_chat_response(message: str, user_id: str, request: Request):
         else:
             tool_args = args
         
-        result = tool_method(**tool_args)
+        # 의미가 같은 이전 질문의 답변이 캐시에 있으면 LLM 호출 생략
+        cache_hit = None
+        cache_status = None
+        if tool_name in CACHED_TOOL_ARGS:
+            # 임베딩 계산은 블로킹이므로 이벤트 루프 밖의 스레드에서 실행
+            cache_hit = await asyncio.to_thread(semantic_cache.lookup, tool_name, tool_args[CACHED_TOOL_ARGS[tool_name]])
+            cache_status = 'hit' if cache_hit else 'miss'
+            if cache_hit:
+                cache_content = f"캐시된 답변을 사용합니다 (유사도 {cache_hit['similarity']:.2f})"
+                yield f"data: {json.dumps({'type': 'cache_hit', 'content': cache_content, 'timestamp': datetime.now().isoformat(), 'tool_used': tool_name, 'cache': {k: v for k, v in cache_hit.items() if k != 'response'}})}\n\n"
+        
+        ttft_ms = None
+        if cache_hit:
+            result = cache_hit['response']
+        elif tool_name in STREAMING_TOOLS:
+            # 토큰이 생성되는 대로 delta 이벤트로 전달
+            chunks = []
+            async for token in STREAMING_TOOLS[tool_name](**tool_args):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - request_started) * 1000
+                chunks.append(token)
+                yield f"data: {json.dumps({'type': 'delta', 'content': token, 'timestamp': datetime.now().isoformat(), 'tool_used': tool_name})}\n\n"
+            result = "".join(chunks)
+        else:
+            # 동기 도구(LLM 호출, 응답 캐시 저장 포함)는 이벤트 루프를 막지 않도록 스레드에서 실행
+            result = await asyncio.to_thread(tool_method, **tool_args)
+        
+        total_ms = (time.perf_counter() - request_started) * 1000
+        if ttft_ms is None:
+            ttft_ms = total_ms
+        latency_tracker.record(f"{tool_name}:cached" if cache_hit else tool_name, ttft_ms, total_ms)
+        metrics = {'ttft_ms': round(ttft_ms, 1), 'total_ms': round(total_ms, 1), 'cache': cache_status}
         
         # 결과를 메모리에 저장
         memory_manager.add_message(actual_user_id, "assistant", result, tool_used=tool_name)
         
-        # 결과 스트리밍
-        yield f"data: {json.dumps({'type': 'result', 'content': result, 'timestamp': datetime.now().isoformat(), 'tool_used': tool_name})}\n\n"
+        # 최종 결과 전송 (delta를 처리하지 않는 클라이언트 호환용 전체 텍스트 포함)
+        yield f"data: {json.dumps({'type': 'result', 'content': result, 'timestamp': datetime.now().isoformat(), 'tool_used': tool_name, 'metrics': metrics})}\n\n"
         
         # 사용자 인사이트 정보 추가
         user_insights = memory_manager.get_user_insights(actual_user_id)
@@ -828,6 +989,15 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy"}
 
+@app.get("/chat/metrics")
+async def get_latency_metrics():
+    """도구별 응답 지연 시간 조회 (TTFT 기준)"""
+    return {
+        "latency": latency_tracker.summary(),
+        "semantic_cache": semantic_cache.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/chat/history/{user_id}")
 async def get_chat_history(user_id: str, limit: int = 20):
     """사용자의 채팅 기록 조회"""
@@ -1136,6 +1306,7 @@ async def chat_ui():
 
                     const reader = response.body.getReader();
                     const decoder = new TextDecoder();
+                    let streamingDiv = null;
 
                     while (true) {
                         const { done, value } = await reader.read();
@@ -1153,8 +1324,17 @@ async def chat_ui():
                                         addMessage(data.content, 'system');
                                     } else if (data.type === 'tool_selected') {
                                         addMessage(data.content, 'system');
+                                    } else if (data.type === 'delta') {
+                                        if (!streamingDiv) {
+                                            addMessage('', 'bot', data.tool_used);
+                                            streamingDiv = chatContainer.lastElementChild.firstElementChild;
+                                        }
+                                        streamingDiv.textContent += data.content;
+                                        chatContainer.scrollTop = chatContainer.scrollHeight;
                                     } else if (data.type === 'result') {
-                                        addMessage(data.content, 'bot', data.tool_used);
+                                        if (!streamingDiv) {
+                                            addMessage(data.content, 'bot', data.tool_used);
+                                        }
                                     } else if (data.type === 'error') {
                                         addMessage(data.content, 'system');
                                     } else if (data.type === 'complete') {
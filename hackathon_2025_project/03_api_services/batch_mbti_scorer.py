@@ -0,0 +1,328 @@
+"""
+투자 MBTI 배치 추천 엔진
+전체 사용자의 분석 특성을 배열로 한 번에 적재하고 NumPy로 모든 MBTI 유형 점수를 계산하여
+mbti_recommendations 테이블에 저장 (매일 밤 캠페인용 일괄 추천)
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from investment_mbti_analyzer import InvestmentMBTIAnalyzer
+
+GRADE_RISK = {"A": 0.8, "B": 0.6, "C": 0.4, "D": 0.2}
+
+# recommend_mbti_type의 if/elif 조건을 (하한, 상한, 하한 포함 여부, 상한 포함 여부) 구간으로 표현
+TRADING_FREQUENCY_RULES = {
+    "high": (0.6, np.inf, False, False),
+    "low": (-np.inf, 0.3, False, False),
+    "medium": (0.3, 0.6, True, True)
+}
+RISK_TOLERANCE_RULES = {
+    "high": (0.6, np.inf, False, False),
+    "low": (-np.inf, 0.4, False, False),
+    "medium": (0.4, 0.6, True, True)
+}
+INVESTMENT_HORIZON_RULES = {
+    "very_long": (0.8, np.inf, False, False),
+    "long": (0.6, np.inf, False, False),
+    "medium": (0.4, 0.6, True, True),
+    "short": (-np.inf, 0.4, False, False)
+}
+BEHAVIOR_PATTERN_RULES = {
+    "aggressive": (0.5, np.inf, False, False),
+    "conservative": (-np.inf, 0.3, False, False),
+    "analytical": (0.4, np.inf, False, False)
+}
+
+FEATURE_COLUMNS = ["frequency_score", "risk_score", "horizon_score", "research_score"]
+
+class BatchMBTIScorer:
+    """전체 사용자 MBTI 일괄 추천기"""
+
+    def __init__(self, db_path: str = 'securities_data.db', chunk_size: int = 50000,
+                 workers: int = None, analyzer: InvestmentMBTIAnalyzer = None):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.analyzer = analyzer or InvestmentMBTIAnalyzer()
+
+        self.type_keys = list(self.analyzer.mbti_types.keys())
+        self.sector_names = list(self.analyzer.SECTOR_MAPPING.keys())
+        # 종목 -> 섹터 인덱스 (_classify_stocks_by_sector와 같이 먼저 매칭된 섹터 사용)
+        self.symbol_sector = {}
+        for index, sector in enumerate(self.sector_names):
+            for symbol in self.analyzer.SECTOR_MAPPING[sector]:
+                self.symbol_sector.setdefault(symbol, index)
+        self._compile_rules()
+
+    def _compile_rules(self):
+        """유형별 규칙을 (유형 수,) 크기의 구간 배열과 섹터 선호 행렬로 변환"""
+        def compile_intervals(characteristic: str, rules: Dict[str, Tuple]) -> Dict[str, np.ndarray]:
+            bounds = [rules.get(self.analyzer.mbti_types[t]["characteristics"][characteristic]) for t in self.type_keys]
+            return {
+                "enabled": np.array([b is not None for b in bounds]),
+                "low": np.array([b[0] if b else np.inf for b in bounds]),
+                "high": np.array([b[1] if b else -np.inf for b in bounds]),
+                "low_inclusive": np.array([bool(b and b[2]) for b in bounds]),
+                "high_inclusive": np.array([bool(b and b[3]) for b in bounds])
+            }
+
+        self.rules = {
+            "frequency_score": (compile_intervals("trading_frequency", TRADING_FREQUENCY_RULES), "trading_pattern"),
+            "risk_score": (compile_intervals("risk_tolerance", RISK_TOLERANCE_RULES), "risk_profile"),
+            "horizon_score": (compile_intervals("investment_horizon", INVESTMENT_HORIZON_RULES), "investment_horizon"),
+            "research_score": (compile_intervals("behavior_pattern", BEHAVIOR_PATTERN_RULES), "app_behavior")
+        }
+
+        # 섹터 x 유형 선호 행렬
+        self.sector_preference = np.zeros((len(self.sector_names), len(self.type_keys)))
+        for t, mbti_type in enumerate(self.type_keys):
+            for sector in self.analyzer.mbti_types[mbti_type]["characteristics"]["preferred_sectors"]:
+                if sector in self.sector_names:
+                    self.sector_preference[self.sector_names.index(sector), t] = 1.0
+
+    @staticmethod
+    def _interval_mask(values: np.ndarray, intervals: Dict[str, np.ndarray]) -> np.ndarray:
+        """(사용자 수, 유형 수) 크기의 구간 포함 여부"""
+        x = values[:, None]
+        above = np.where(intervals["low_inclusive"], x >= intervals["low"], x > intervals["low"])
+        below = np.where(intervals["high_inclusive"], x <= intervals["high"], x < intervals["high"])
+        return above & below & intervals["enabled"]
+
+    def score(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """모든 사용자 x 모든 유형 점수 행렬 계산 (recommend_mbti_type과 같은 규칙)"""
+        weights = self.analyzer.weights
+        n_users = len(features["frequency_score"])
+        scores = np.zeros((n_users, len(self.type_keys)))
+
+        for feature, (intervals, weight_key) in self.rules.items():
+            scores += self._interval_mask(features[feature], intervals) * (weights[weight_key] * 0.8)
+
+        sector_match = features["sector_counts"] @ self.sector_preference
+        scores += weights["watchlist_analysis"] * np.minimum(sector_match / 5, 1.0)
+        return scores
+
+    def load_features(self, conn: sqlite3.Connection, low_user_id: str, high_user_id: str,
+                      as_of: datetime = None) -> Tuple[pd.Index, Dict[str, np.ndarray]]:
+        """user_id 범위의 분석 특성을 집계 쿼리로 적재 (사용자별 5회 조회 대신 테이블별 1회)"""
+        as_of = as_of or datetime.now()
+        trade_start = (as_of - timedelta(days=90)).strftime('%Y-%m-%d')
+        behavior_start = (as_of - timedelta(days=30)).strftime('%Y-%m-%d')
+        user_range = (low_user_id, high_user_id)
+
+        users = pd.read_sql_query('''
+            SELECT user_id, grade, experience_months, join_date FROM users
+            WHERE user_id BETWEEN ? AND ? ORDER BY user_id
+        ''', conn, params=user_range).set_index('user_id')
+        user_index = users.index
+
+        trades = pd.read_sql_query('''
+            SELECT user_id, COUNT(*) AS trade_count, SUM(trade_amount) AS total_amount
+            FROM trades WHERE user_id BETWEEN ? AND ? AND trade_date >= ?
+            GROUP BY user_id
+        ''', conn, params=user_range + (trade_start,)).set_index('user_id').reindex(user_index)
+
+        # 종목별 최초 매수일 ~ 최초 매도일 (analyze_user_data의 보유 기간 계산과 동일)
+        holdings = pd.read_sql_query('''
+            SELECT user_id, AVG(holding_days) AS avg_holding_period FROM (
+                SELECT user_id,
+                       julianday(MIN(CASE WHEN trade_type = 'sell' THEN trade_date END)) -
+                       julianday(MIN(CASE WHEN trade_type = 'buy' THEN trade_date END)) AS holding_days
+                FROM trades WHERE user_id BETWEEN ? AND ? AND trade_date >= ?
+                GROUP BY user_id, stock_symbol
+            ) WHERE holding_days > 0
+            GROUP BY user_id
+        ''', conn, params=user_range + (trade_start,)).set_index('user_id').reindex(user_index)
+
+        behaviors = pd.read_sql_query('''
+            SELECT user_id,
+                   SUM(action_type = 'stock_detail_view') AS stock_views,
+                   SUM(action_type = 'news_exploration') AS news_views
+            FROM app_behaviors WHERE user_id BETWEEN ? AND ? AND date >= ?
+            GROUP BY user_id
+        ''', conn, params=user_range + (behavior_start,)).set_index('user_id').reindex(user_index)
+
+        watchlists = pd.read_sql_query('''
+            SELECT user_id, stock_symbol FROM watchlists WHERE user_id BETWEEN ? AND ?
+        ''', conn, params=user_range)
+
+        # 거래 패턴 / 리스크
+        trade_count = trades['trade_count'].fillna(0).to_numpy(dtype=float)
+        total_amount = trades['total_amount'].fillna(0).to_numpy(dtype=float)
+        avg_amount = np.divide(total_amount, trade_count, out=np.zeros_like(total_amount), where=trade_count > 0)
+        frequency_score = np.minimum(trade_count / 30, 1.0)
+
+        grade_risk = users['grade'].map(GRADE_RISK).fillna(0.4).to_numpy(dtype=float)
+        experience_risk = np.minimum(users['experience_months'].fillna(0).to_numpy(dtype=float) / 60, 1.0)
+        frequency_risk = np.minimum(trade_count / 90, 1.0)
+        amount_risk = np.minimum(avg_amount / 5000000, 1.0)
+        risk_score = grade_risk * 0.3 + experience_risk * 0.3 + frequency_risk * 0.2 + amount_risk * 0.2
+
+        # 투자 기간
+        join_date = pd.to_datetime(users['join_date'].fillna('2024-01-01'), format='%Y-%m-%d', errors='coerce')
+        days_since_join = (pd.Timestamp(as_of) - join_date).dt.days.fillna(0).to_numpy(dtype=float)
+        membership_duration = np.minimum(days_since_join / 365, 1.0)
+        avg_holding_period = holdings['avg_holding_period'].fillna(365).to_numpy(dtype=float)
+        horizon_score = membership_duration * 0.4 + np.minimum(avg_holding_period / 365, 1.0) * 0.6
+
+        # 앱 행동 (종목 탐색 + 뉴스 탐색, 30일 기준)
+        stock_views = behaviors['stock_views'].fillna(0).to_numpy(dtype=float)
+        news_views = behaviors['news_views'].fillna(0).to_numpy(dtype=float)
+        research_score = (stock_views / 30 + news_views / 30) / 2
+
+        # 관심종목 섹터 분포
+        sector_counts = np.zeros((len(user_index), len(self.sector_names)))
+        if not watchlists.empty:
+            positions = user_index.get_indexer(watchlists['user_id'])
+            sectors = watchlists['stock_symbol'].map(self.symbol_sector).fillna(-1).to_numpy(dtype=int)
+            valid = (positions >= 0) & (sectors >= 0)
+            np.add.at(sector_counts, (positions[valid], sectors[valid]), 1)
+
+        return user_index, {
+            "frequency_score": frequency_score,
+            "risk_score": risk_score,
+            "horizon_score": horizon_score,
+            "research_score": research_score,
+            "sector_counts": sector_counts
+        }
+
+    def ensure_tables(self, conn: sqlite3.Connection):
+        """결과 테이블과 범위 집계에 필요한 인덱스 생성"""
+        score_columns = ", ".join(f"score_{t} REAL" for t in self.type_keys)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS mbti_recommendations (
+                user_id TEXT PRIMARY KEY,
+                mbti_type TEXT,
+                mbti_name TEXT,
+                score REAL,
+                confidence REAL,
+                second_type TEXT,
+                third_type TEXT,
+                {score_columns},
+                computed_at TEXT
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_trades_user_date ON trades (user_id, trade_date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_app_behaviors_user_date ON app_behaviors (user_id, date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_watchlists_user ON watchlists (user_id)')
+        conn.commit()
+
+    def _chunk_ranges(self, conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+        """user_id 순서로 chunk_size명씩 나눈 (시작, 끝) 범위"""
+        user_ids = [row[0] for row in conn.execute('SELECT user_id FROM users ORDER BY user_id')]
+        return [
+            (user_ids[i], user_ids[min(i + self.chunk_size, len(user_ids)) - 1])
+            for i in range(0, len(user_ids), self.chunk_size)
+        ]
+
+    def score_range(self, low_user_id: str, high_user_id: str, as_of: datetime = None) -> Dict[str, Any]:
+        """user_id 범위 1개를 적재하고 점수 계산 (워커 프로세스에서 실행)"""
+        started = time.perf_counter()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            user_index, features = self.load_features(conn, low_user_id, high_user_id, as_of)
+        finally:
+            conn.close()
+        loaded = time.perf_counter()
+        scores = self.score(features)
+        return {
+            "user_ids": list(user_index),
+            "scores": scores,
+            "load_seconds": loaded - started,
+            "score_seconds": time.perf_counter() - loaded
+        }
+
+    def _write(self, conn: sqlite3.Connection, user_ids: List[str], scores: np.ndarray, computed_at: str):
+        """청크 결과를 한 트랜잭션으로 저장"""
+        ranking = np.argsort(-scores, axis=1, kind='stable')[:, :3]
+        top_scores = np.round(scores[np.arange(len(user_ids)), ranking[:, 0]], 3)
+        types = np.array(self.type_keys)
+        names = np.array([self.analyzer.mbti_types[t]["name"] for t in self.type_keys])
+        rounded = np.round(scores, 3)
+
+        rows = zip(
+            user_ids,
+            types[ranking[:, 0]].tolist(),
+            names[ranking[:, 0]].tolist(),
+            top_scores.tolist(),
+            np.round(top_scores * 100, 1).tolist(),
+            types[ranking[:, 1]].tolist(),
+            types[ranking[:, 2]].tolist(),
+            *rounded.T.tolist(),
+            [computed_at] * len(user_ids)
+        )
+        placeholders = ", ".join("?" * (8 + len(self.type_keys)))
+        with conn:
+            conn.executemany(f'INSERT OR REPLACE INTO mbti_recommendations VALUES ({placeholders})', rows)
+
+    def run(self, as_of: datetime = None) -> Dict[str, Any]:
+        """전체 사용자 일괄 추천 실행 후 처리량 통계 반환"""
+        as_of = as_of or datetime.now()
+        computed_at = as_of.isoformat()
+        started = time.perf_counter()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        self.ensure_tables(conn)
+        ranges = self._chunk_ranges(conn)
+
+        total_users = 0
+        load_seconds = score_seconds = write_seconds = 0.0
+        try:
+            if self.workers > 1 and len(ranges) > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    futures = [executor.submit(self.score_range, low, high, as_of) for low, high in ranges]
+                    for future in futures:
+                        result = future.result()
+                        write_started = time.perf_counter()
+                        self._write(conn, result["user_ids"], result["scores"], computed_at)
+                        write_seconds += time.perf_counter() - write_started
+                        load_seconds += result["load_seconds"]
+                        score_seconds += result["score_seconds"]
+                        total_users += len(result["user_ids"])
+            else:
+                for low, high in ranges:
+                    result = self.score_range(low, high, as_of)
+                    write_started = time.perf_counter()
+                    self._write(conn, result["user_ids"], result["scores"], computed_at)
+                    write_seconds += time.perf_counter() - write_started
+                    load_seconds += result["load_seconds"]
+                    score_seconds += result["score_seconds"]
+                    total_users += len(result["user_ids"])
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "users": total_users,
+            "chunks": len(ranges),
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "users_per_second": round(total_users / elapsed, 1) if elapsed > 0 else 0.0,
+            "load_seconds": round(load_seconds, 3),
+            "score_seconds": round(score_seconds, 3),
+            "write_seconds": round(write_seconds, 3)
+        }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='전체 사용자 투자 MBTI 일괄 추천')
+    parser.add_argument('--db', default='securities_data.db', help='SQLite 데이터베이스 경로')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='청크당 사용자 수')
+    parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수 (기본값: CPU 코어 수)')
+    args = parser.parse_args()
+
+    scorer = BatchMBTIScorer(args.db, chunk_size=args.chunk_size, workers=args.workers)
+    stats = scorer.run()
+
+    print("=== 투자 MBTI 일괄 추천 완료 ===")
+    print(f"사용자 수: {stats['users']:,}명 ({stats['chunks']}개 청크, {stats['workers']}개 프로세스)")
+    print(f"소요 시간: {stats['elapsed_seconds']}초 (적재 {stats['load_seconds']}초, 계산 {stats['score_seconds']}초, 저장 {stats['write_seconds']}초)")
+    print(f"처리량: {stats['users_per_second']:,}명/초")
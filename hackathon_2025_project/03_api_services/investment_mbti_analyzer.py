@@ -12,6 +12,19 @@ import json
 class InvestmentMBTIAnalyzer:
     """투자 MBTI 분석기"""
     
+    # 관심종목 섹터 분류 (종목명 기반 간단한 분류, 먼저 매칭된 섹터 사용)
+    SECTOR_MAPPING = {
+        "기술": ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "AMD", "INTC", "삼성전자", "SK하이닉스", "NAVER", "카카오"],
+        "금융": ["KB금융", "신한지주", "하나금융지주", "우리금융지주", "NH투자증권", "XLF"],
+        "자동차": ["현대차", "기아", "현대모비스", "TSLA"],
+        "화학": ["LG화학", "롯데케미칼"],
+        "철강": ["POSCO"],
+        "통신": ["SK텔레콤", "KT&G", "T", "VZ"],
+        "유틸리티": ["한국전력", "KO"],
+        "소비재": ["신세계", "HDV"],
+        "에너지": ["ICLN", "TAN", "KRBN"]
+    }
+    
     def __init__(self):
         # 투자 MBTI 유형 정의 (기존 해커톤 코드와 동일)
         self.mbti_types = {
@@ -279,17 +292,7 @@ class InvestmentMBTIAnalyzer:
     
     def _classify_stocks_by_sector(self, watchlist: List[Dict]) -> Dict[str, int]:
         """종목을 섹터별로 분류"""
-        sector_mapping = {
-            "기술": ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "AMD", "INTC", "삼성전자", "SK하이닉스", "NAVER", "카카오"],
-            "금융": ["KB금융", "신한지주", "하나금융지주", "우리금융지주", "NH투자증권", "XLF"],
-            "자동차": ["현대차", "기아", "현대모비스", "TSLA"],
-            "화학": ["LG화학", "롯데케미칼"],
-            "철강": ["POSCO"],
-            "통신": ["SK텔레콤", "KT&G", "T", "VZ"],
-            "유틸리티": ["한국전력", "KO"],
-            "소비재": ["신세계", "HDV"],
-            "에너지": ["ICLN", "TAN", "KRBN"]
-        }
+        sector_mapping = self.SECTOR_MAPPING
         
         sector_counts = {}
         for stock in watchlist:
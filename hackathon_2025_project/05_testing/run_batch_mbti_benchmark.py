@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+투자 MBTI 배치 추천 벤치마크 스크립트
+합성 사용자 데이터베이스를 만들어 BatchMBTIScorer 처리량을 측정하고,
+표본 사용자에 대해 기존 사용자별 추천(recommend_mbti_type) 점수와 일치하는지 확인
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '03_api_services'))
+
+from batch_mbti_scorer import BatchMBTIScorer
+from investment_mbti_analyzer import InvestmentMBTIAnalyzer
+
+SYMBOLS = [("삼성전자", "KR"), ("SK하이닉스", "KR"), ("현대차", "KR"), ("KB금융", "KR"), ("한국전력", "KR"),
+           ("POSCO", "KR"), ("NVDA", "US"), ("TSLA", "US"), ("AAPL", "US"), ("KO", "US"), ("ICLN", "US"), ("SPY", "US")]
+ACTIONS = ["app_visit", "stock_detail_view", "news_exploration", "community_exploration"]
+
+def build_database(db_path: str, num_users: int, seed: int = 42):
+    """합성 사용자/거래/행동/관심종목 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    today = datetime.now()
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE users (user_id TEXT PRIMARY KEY, join_date TEXT, grade TEXT, age_group TEXT,
+                            gender TEXT, experience_months INTEGER, initial_capital INTEGER, created_at TEXT);
+        CREATE TABLE trades (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, trade_date TEXT, trade_type TEXT,
+                             market TEXT, stock_symbol TEXT, quantity INTEGER, price REAL, trade_amount REAL,
+                             commission REAL, profit_loss REAL, timestamp TEXT);
+        CREATE TABLE app_behaviors (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, date TEXT, action_type TEXT,
+                                    action_detail TEXT, duration_minutes INTEGER, timestamp TEXT);
+        CREATE TABLE watchlists (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, stock_symbol TEXT, market TEXT,
+                                 add_date TEXT, current_price REAL, buy_orders INTEGER, sell_orders INTEGER,
+                                 price_alerts BOOLEAN, target_price REAL, created_at TEXT);
+    ''')
+
+    user_ids = [f"user_{i:07d}" for i in range(1, num_users + 1)]
+    grades = rng.choice(list("ABCD"), num_users)
+    experience = rng.integers(0, 120, num_users)
+    join_offsets = rng.integers(0, 900, num_users)
+    conn.executemany('INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+        (user_ids[i], (today - timedelta(days=int(join_offsets[i]))).strftime('%Y-%m-%d'), grades[i],
+         "30대", "M", int(experience[i]), 5000, None)
+        for i in range(num_users)
+    ))
+
+    def per_user_rows(max_per_user: int):
+        counts = rng.integers(0, max_per_user + 1, num_users)
+        owners = np.repeat(np.arange(num_users), counts)
+        return owners, len(owners)
+
+    owners, n = per_user_rows(24)
+    symbols = rng.integers(0, len(SYMBOLS), n)
+    days = rng.integers(0, 120, n)
+    trade_types = rng.choice(["buy", "sell"], n)
+    amounts = rng.integers(100000, 8000000, n)
+    conn.executemany('''INSERT INTO trades (user_id, trade_date, trade_type, market, stock_symbol, quantity, price,
+                        trade_amount, commission, profit_loss, timestamp) VALUES (?, ?, ?, ?, ?, 1, ?, ?, 0, 0, ?)''', (
+        (user_ids[owners[i]], (today - timedelta(days=int(days[i]))).strftime('%Y-%m-%d'), trade_types[i],
+         SYMBOLS[symbols[i]][1], SYMBOLS[symbols[i]][0], float(amounts[i]), float(amounts[i]),
+         (today - timedelta(days=int(days[i]))).isoformat())
+        for i in range(n)
+    ))
+
+    owners, n = per_user_rows(40)
+    actions = rng.integers(0, len(ACTIONS), n)
+    days = rng.integers(0, 45, n)
+    conn.executemany('''INSERT INTO app_behaviors (user_id, date, action_type, action_detail, duration_minutes, timestamp)
+                        VALUES (?, ?, ?, '', 10, ?)''', (
+        (user_ids[owners[i]], (today - timedelta(days=int(days[i]))).strftime('%Y-%m-%d'), ACTIONS[actions[i]],
+         (today - timedelta(days=int(days[i]))).isoformat())
+        for i in range(n)
+    ))
+
+    owners, n = per_user_rows(10)
+    symbols = rng.integers(0, len(SYMBOLS), n)
+    conn.executemany('''INSERT INTO watchlists (user_id, stock_symbol, market, price_alerts) VALUES (?, ?, ?, 0)''', (
+        (user_ids[owners[i]], SYMBOLS[symbols[i]][0], SYMBOLS[symbols[i]][1]) for i in range(n)
+    ))
+    conn.commit()
+    conn.close()
+
+class SQLiteDataSource:
+    """analyze_user_data가 사용하는 조회 메서드만 제공하는 데이터 소스"""
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+
+    def _rows(self, query, params):
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def get_user_info(self, user_id):
+        rows = self._rows('SELECT * FROM users WHERE user_id = ?', (user_id,))
+        return rows[0] if rows else None
+
+    def get_user_trades(self, user_id, days):
+        start = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        return self._rows('SELECT * FROM trades WHERE user_id = ? AND trade_date >= ? ORDER BY timestamp DESC', (user_id, start))
+
+    def get_user_behaviors(self, user_id, days):
+        start = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        return self._rows('SELECT * FROM app_behaviors WHERE user_id = ? AND date >= ? ORDER BY timestamp DESC', (user_id, start))
+
+    def get_user_watchlist(self, user_id):
+        return self._rows('SELECT * FROM watchlists WHERE user_id = ?', (user_id,))
+
+def verify_against_per_user(db_path: str, scorer: BatchMBTIScorer, sample_size: int) -> int:
+    """표본 사용자의 배치 점수와 사용자별 추천 점수 비교, 불일치 수 반환"""
+    analyzer = InvestmentMBTIAnalyzer()
+    source = SQLiteDataSource(db_path)
+    conn = sqlite3.connect(db_path)
+    columns = ", ".join(f"score_{t}" for t in scorer.type_keys)
+    sample = conn.execute(f'SELECT user_id, {columns} FROM mbti_recommendations ORDER BY RANDOM() LIMIT ?',
+                          (sample_size,)).fetchall()
+
+    checked = mismatches = 0
+    for row in sample:
+        analysis = analyzer.analyze_user_data(row[0], source)
+        # 거래/행동 데이터가 없는 사용자는 사용자별 경로가 점수를 계산하지 못하므로 제외
+        if "frequency_score" not in analysis["trading_analysis"] or "research_score" not in analysis["behavior_analysis"]:
+            continue
+        expected = analyzer.recommend_mbti_type(analysis)["all_scores"]
+        checked += 1
+        if any(abs(round(expected[t], 3) - row[i + 1]) > 1e-3 for i, t in enumerate(scorer.type_keys)):
+            mismatches += 1
+    conn.close()
+    print(f"   사용자별 추천과 비교: {checked}명 중 불일치 {mismatches}명")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description='투자 MBTI 배치 추천 벤치마크')
+    parser.add_argument('--users', type=int, default=100000, help='합성 사용자 수')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='청크당 사용자 수')
+    parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수')
+    parser.add_argument('--verify', type=int, default=200, help='사용자별 추천과 비교할 표본 수')
+    args = parser.parse_args()
+
+    print("=== 투자 MBTI 배치 추천 벤치마크 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'batch_benchmark.db')
+
+        started = time.perf_counter()
+        build_database(db_path, args.users)
+        print(f"1. 합성 데이터 생성: {args.users:,}명 ({time.perf_counter() - started:.1f}초)")
+
+        scorer = BatchMBTIScorer(db_path, chunk_size=args.chunk_size, workers=args.workers)
+        stats = scorer.run()
+        print(f"2. 일괄 추천: {stats['elapsed_seconds']}초, {stats['users_per_second']:,}명/초 "
+              f"({stats['chunks']}개 청크, {stats['workers']}개 프로세스)")
+        print(f"   적재 {stats['load_seconds']}초 / 계산 {stats['score_seconds']}초 / 저장 {stats['write_seconds']}초")
+        print(f"   1,000,000명 예상 소요 시간: {1000000 / stats['users_per_second'] / 60:.1f}분")
+
+        print("3. 정확성 확인")
+        mismatches = verify_against_per_user(db_path, scorer, args.verify) if args.verify else 0
+
+    print("\n=== 벤치마크 완료 ===")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
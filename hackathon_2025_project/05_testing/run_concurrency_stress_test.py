@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+증권서비스 웹 API 동시성 스트레스 테스트
+여러 스레드가 조회 라우트를 동시에 호출하는 동안 /api/load-data 쓰기를 섞어서 실행하고,
+오류 수와 스레드 수별 조회 처리량(확장성)을 보고
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '03_api_services'))
+
+from run_batch_mbti_benchmark import build_database
+
+READ_ROUTES = [
+    '/api/users/{user_id}',
+    '/api/users/{user_id}/trades?days=90',
+    '/api/users/{user_id}/behaviors?days=30',
+    '/api/users/{user_id}/trading-summary',
+    '/api/users/{user_id}/usage-summary',
+    '/api/users?limit=50&offset={offset}',
+]
+
+def run_readers(app, user_ids, threads: int, requests_per_thread: int, errors: list) -> float:
+    """스레드마다 별도 테스트 클라이언트로 조회 요청을 보내고 걸린 시간 반환"""
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        for _ in range(requests_per_thread):
+            route = rng.choice(READ_ROUTES).format(user_id=rng.choice(user_ids), offset=rng.randint(0, 1000))
+            try:
+                response = client.get(route)
+                body = response.get_json()
+                if response.status_code != 200 or not body.get('success'):
+                    errors.append(f"{route} -> {response.status_code} {body.get('message')}")
+            except Exception as e:
+                errors.append(f"{route} -> {e}")
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - started
+
+def run_writer(app, stop: threading.Event, errors: list, counter: list):
+    """조회가 진행되는 동안 /api/load-data를 반복 호출"""
+    client = app.test_client()
+    while not stop.is_set():
+        response = client.post('/api/load-data')
+        if response.status_code != 200:
+            errors.append(f"/api/load-data -> {response.status_code} {response.get_json().get('message')}")
+        counter[0] += 1
+
+def main():
+    parser = argparse.ArgumentParser(description='증권서비스 웹 API 동시성 스트레스 테스트')
+    parser.add_argument('--users', type=int, default=2000, help='합성 사용자 수')
+    parser.add_argument('--requests', type=int, default=300, help='스레드당 조회 요청 수')
+    parser.add_argument('--max-threads', type=int, default=max(4, os.cpu_count() or 1), help='최대 조회 스레드 수')
+    args = parser.parse_args()
+
+    print("=== 증권서비스 웹 API 동시성 스트레스 테스트 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'securities_data.db')
+        build_database(db_path, args.users)
+
+        # /api/load-data가 읽을 CSV (사용자 테이블만 교체)
+        conn = sqlite3.connect(db_path)
+        pd.read_sql('SELECT * FROM users', conn).to_csv(os.path.join(tmp, 'securities_users.csv'), index=False)
+        user_ids = [row[0] for row in conn.execute('SELECT user_id FROM users')]
+        conn.close()
+
+        os.chdir(tmp)
+        os.environ['SECURITIES_DB_PATH'] = db_path
+        from securities_data_api_web import app, api
+        print(f"1. 합성 데이터: {args.users:,}명, CPU 코어 {os.cpu_count()}개\n")
+
+        print("2. 조회 전용 처리량")
+        thread_counts = sorted({1, 2, 4, args.max_threads, os.cpu_count() or 1})
+        thread_counts = [t for t in thread_counts if t <= args.max_threads]
+        errors = []
+        baseline = None
+        for threads in thread_counts:
+            elapsed = run_readers(app, user_ids, threads, args.requests, errors)
+            rps = threads * args.requests / elapsed
+            baseline = baseline or rps
+            print(f"   스레드 {threads:>2}개: {rps:8.1f} req/s (1스레드 대비 {rps / baseline:.2f}배)")
+
+        print("\n3. 조회 + /api/load-data 동시 실행")
+        stop = threading.Event()
+        loads = [0]
+        writer = threading.Thread(target=run_writer, args=(app, stop, errors, loads))
+        writer.start()
+        elapsed = run_readers(app, user_ids, args.max_threads, args.requests, errors)
+        stop.set()
+        writer.join()
+        print(f"   조회 {args.max_threads * args.requests:,}건 ({elapsed:.1f}초), 데이터 로드 {loads[0]}회")
+        print(f"   연결 풀 상태: {api.db.get_stats()}")
+
+        api.db.close()
+
+    print(f"\n오류: {len(errors)}건")
+    for error in errors[:10]:
+        print(f"   {error}")
+    print("\n=== 스트레스 테스트 완료 ===")
+    sys.exit(1 if errors else 0)
+
+if __name__ == '__main__':
+    main()
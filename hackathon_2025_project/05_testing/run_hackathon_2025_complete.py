@@ -3,6 +3,7 @@
 """
 해커톤 2025 완전한 AI 투자교육 플랫폼 실행 스크립트
 카카오페이증권 UI + 실제 데이터 + MBTI 추천 + AI 에이전트 통합 서비스
+실행 프로필 인자(예: --mode production --workers 4)는 API 서버에 그대로 전달
 """
 
 import os
@@ -82,7 +83,7 @@ def start_api_server():
     
     try:
         # 백그라운드에서 API 서버 실행
-        process = subprocess.Popen([sys.executable, 'securities_data_api_web.py'],
+        process = subprocess.Popen([sys.executable, 'securities_data_api_web.py', *sys.argv[1:]],
                                  stdout=subprocess.PIPE, 
                                  stderr=subprocess.PIPE,
                                  text=True)
@@ -3,6 +3,7 @@
 """
 투자성향 맞춤형 서비스 실행 스크립트
 사용자 행동 데이터 기반 투자성향 진단 및 맞춤형 정보 제공
+실행 프로필 인자(예: --mode production --workers 4)는 API 서버에 그대로 전달
 """
 
 import os
@@ -81,7 +82,7 @@ def start_api_server():
     
     try:
         # 백그라운드에서 API 서버 실행
-        process = subprocess.Popen([sys.executable, 'securities_data_api_web.py'],
+        process = subprocess.Popen([sys.executable, 'securities_data_api_web.py', *sys.argv[1:]],
                                  stdout=subprocess.PIPE, 
                                  stderr=subprocess.PIPE,
                                  text=True)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 증권서비스 더미 데이터 생성 및 API 서버 실행 스크립트
+실행 프로필 인자(예: --mode production --workers 4)는 API 서버에 그대로 전달
 """
 
 import os
@@ -54,7 +55,7 @@ def start_api_server():
     
     # Flask 서버를 별도 프로세스로 실행
     server_process = subprocess.Popen([
-        sys.executable, 'securities_data_api.py'
+        sys.executable, 'securities_data_api.py', *sys.argv[1:]
     ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     
     # 서버 시작 대기
@@ -2,6 +2,7 @@
 """
 증권서비스 웹 애플리케이션 실행 스크립트
 더미 데이터 생성, API 서버 실행, 웹 애플리케이션 실행을 자동화
+실행 프로필 인자(예: --mode production --workers 4)는 API 서버에 그대로 전달
 """
 
 import subprocess
@@ -63,7 +64,7 @@ def main():
     # API 서버 백그라운드 실행
     try:
         api_process = subprocess.Popen(
-            ["python", "securities_data_api_web.py"],
+            ["python", "securities_data_api_web.py", *sys.argv[1:]],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+AI 채팅 토픽 매칭 벤치마크
+메시지 길이별로 토픽 선택 시간을 비교하고 결과가 모두 같은지 확인
+- legacy: 카테고리마다 message.lower()를 다시 하고 any(...)로 검사하던 이전 방식
+- tables: 시작 시 만든 우선순위 키워드 테이블 (소문자 변환 1회 + 부분 문자열 검색)
+- aho-corasick: 순수 파이썬 Aho–Corasick 오토마톤 (한 번의 문자 순회, 비교용)
+
+실행: python ai_benchmark.py --lengths 50 2000 20000 --messages 200
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+
+from services.ai_service import GREETING, AIService
+
+# 이전 generate_response의 카테고리별 키워드 (검사 순서 = 우선순위)
+LEGACY_RULES = [
+    (GREETING, ['안녕', 'hello', 'hi']),
+    ('오늘의 3줄 리포트', ['리포트', 'report']),
+    ('섹터 로테이션', ['섹터', 'sector']),
+    ('리스크 체크', ['리스크', 'risk']),
+    ('뉴스 요약', ['뉴스', 'news']),
+    ('실전 학습 시나리오', ['실습', 'practice'])
+]
+
+WORDS = ('삼성전자 주가 전망 어떻게 보시나요 장기 투자 배당 ETF 분산 금리 환율 성장주 가치주 '
+         'Report 섹터 News risk 실습 Hello 포트폴리오 비중 조정 NVDA 실적 발표').split()
+
+def legacy_match(message):
+    for topic, keywords in LEGACY_RULES:
+        if any(keyword in message.lower() for keyword in keywords):
+            return topic
+    return None
+
+class AhoCorasick:
+    """키워드 → 우선순위 오토마톤 (노드별 가장 높은 우선순위 출력만 보관)"""
+
+    NO_MATCH = 1 << 30
+
+    def __init__(self, rules):
+        self.topics = [topic for topic, _ in rules]
+        self.goto, self.fail, self.best = [{}], [0], [self.NO_MATCH]
+        for priority, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                node = 0
+                for ch in keyword.lower():
+                    nxt = self.goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.best.append(self.NO_MATCH)
+                        self.goto[node][ch] = nxt
+                    node = nxt
+                self.best[node] = min(self.best[node], priority)
+
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.best[child] = min(self.best[child], self.best[self.fail[child]])
+                pending.append(child)
+
+    def match(self, message):
+        goto, fail, best = self.goto, self.fail, self.best
+        state, found = 0, self.NO_MATCH
+        for ch in message.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        return None if found == self.NO_MATCH else self.topics[found]
+
+def make_messages(rng, length, count):
+    messages = []
+    for _ in range(count):
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(rng.choice(WORDS))
+        messages.append(' '.join(words)[:length])
+    return messages
+
+def time_per_call(match, messages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            match(message)
+    return (time.perf_counter() - started) * 1e6 / (repeat * len(messages))
+
+def main():
+    parser = argparse.ArgumentParser(description='AI 채팅 토픽 매칭 벤치마크')
+    parser.add_argument('--lengths', type=int, nargs='*', default=[50, 2000, 20000], help='메시지 길이 (여러 값)')
+    parser.add_argument('--messages', type=int, default=200, help='길이별 메시지 수')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수')
+    args = parser.parse_args()
+
+    service = AIService()
+    automaton = AhoCorasick(LEGACY_RULES)
+    matchers = [('legacy', legacy_match), ('tables', service.tables.match_topic), ('aho-corasick', automaton.match)]
+    rng = random.Random(7)
+
+    print("=== AI 채팅 토픽 매칭 벤치마크 ===\n")
+    print(f"{'length':>7} " + ' '.join(f"{name + ' (us)':>18}" for name, _ in matchers) + f" {'same':>5}")
+    for length in args.lengths:
+        # 키워드가 거의 없는 긴 질문이 최악의 경우이므로 절반은 키워드 없는 단어로만 구성
+        messages = make_messages(rng, length, args.messages // 2)
+        plain = random.Random(length)
+        messages += [' '.join(plain.choice(WORDS[:14]) for _ in range(length // 4))[:length]
+                     for _ in range(args.messages - len(messages))]
+        expected = [legacy_match(message) for message in messages]
+        same = all([match(message) for message in messages] == expected for _, match in matchers)
+        timings = [time_per_call(match, messages, args.repeat) for _, match in matchers]
+        print(f"{length:>7} " + ' '.join(f"{value:>18.2f}" for value in timings) + f" {str(same):>5}")
+
+    started = time.perf_counter()
+    calls = 20000
+    for i in range(calls):
+        service.generate_response('오늘 리스크 관리는 어떻게 하나요?', 'growth')
+    print(f"\ngenerate_response: {(time.perf_counter() - started) * 1e6 / calls:.2f}us/회 (정의 파일 변경 확인 포함)")
+    print("\n=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
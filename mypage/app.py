@@ -1,15 +1,24 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 from datetime import datetime
+import atexit
 import json
 import os
-from models.database import init_db, get_db_connection
+import sys
+from models.database import (init_db, init_app, get_db, get_pool, get_reports, page_limit, list_memos_page, get_memo_changes,
+                             apply_memo_batch)
+from models.leaderboard import PracticeLeaderboard
+from models.write_behind import WriteBehindQueue
 from services.ai_service import AIService
 from services.report_service import ReportService
 from services.mbti_service import MBTIService
 from services.practice_service import PracticeService
 from services.risk_service import RiskService
 
+# 공통 실행 프로필 (저장소 루트의 serving 패키지)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from serving import run_app
+
 app = Flask(__name__)
 CORS(app)
 
@@ -17,13 +26,39 @@ CORS(app)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 app.config['DATABASE'] = 'mypage/investment_ai.db'
 
+# 요청 범위 DB 연결 (요청이 끝나면 풀에 반납)
+init_app(app)
+
 # 서비스 초기화
 ai_service = AIService()
-report_service = ReportService()
+report_service = ReportService(history=get_reports)
 mbti_service = MBTIService()
-practice_service = PracticeService()
+practice_service = PracticeService(PracticeLeaderboard(get_pool()))
 risk_service = RiskService()
 
+# 채팅 기록/리포트 저장은 응답과 분리해 백그라운드에서 모아서 기록 (종료 시 남은 행 기록)
+history_writer = WriteBehindQueue(get_pool())
+atexit.register(history_writer.close)
+
+def preload_services():
+    """서버 시작 시(운영 모드에서는 워커 fork 전) 한 번 실행: DB 초기화와 실습 순위 적재"""
+    init_db()
+    practice_service.leaderboard.sync()
+
+def prepare_fork():
+    """워커 fork 전 마스터의 풀 연결을 닫아 워커마다 새 연결을 열도록 함"""
+    get_pool().close()
+
+INSERT_CHAT_HISTORY = '''
+    INSERT INTO chat_history (user_message, ai_response, agent_id, created_at)
+    VALUES (?, ?, ?, ?)
+'''
+
+INSERT_REPORT = '''
+    INSERT INTO reports (agent_id, content, created_at)
+    VALUES (?, ?, ?)
+'''
+
 @app.route('/')
 def index():
     """메인 페이지"""
@@ -90,6 +125,14 @@ def get_agents():
     }
     return jsonify(agents)
 
+@app.route('/api/agents/reload', methods=['POST'])
+def reload_agents():
+    """Agent 정의 파일(data/ai_agents.json) 다시 읽기 API (파일 수정 시 자동으로도 다시 읽음)"""
+    try:
+        return jsonify(ai_service.reload())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """AI 채팅 API"""
@@ -105,15 +148,8 @@ def chat():
         # AI 서비스를 통한 응답 생성
         response = ai_service.generate_response(message, agent_id, topic)
         
-        # 채팅 기록 저장
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO chat_history (user_message, ai_response, agent_id, created_at)
-            VALUES (?, ?, ?, ?)
-        ''', (message or topic, response, agent_id, datetime.now()))
-        conn.commit()
-        conn.close()
+        # 채팅 기록 저장 (백그라운드 기록)
+        history_writer.enqueue(INSERT_CHAT_HISTORY, (message or topic, response, agent_id, datetime.now()))
         
         return jsonify({
             'response': response,
@@ -131,18 +167,9 @@ def generate_report():
         data = request.get_json()
         agent_id = data.get('agent_id', 'standard')
         
-        # 리포트 서비스를 통한 리포트 생성
-        report = report_service.generate_report(agent_id)
-        
-        # 리포트 저장
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO reports (agent_id, content, created_at)
-            VALUES (?, ?, ?)
-        ''', (agent_id, json.dumps(report, ensure_ascii=False), datetime.now()))
-        conn.commit()
-        conn.close()
+        # 리포트 서비스를 통한 리포트 생성 (시장 데이터 버전별로 한 번만 만들고, 새로 만든 리포트만 저장)
+        report = report_service.generate_report(agent_id, on_render=lambda rendered: history_writer.enqueue(
+            INSERT_REPORT, (rendered['agent_id'], json.dumps(rendered, ensure_ascii=False), datetime.now())))
         
         return jsonify({
             'report': report,
@@ -153,6 +180,32 @@ def generate_report():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/reports', methods=['GET'])
+def get_historical_reports():
+    """과거 리포트 조회 API (?agent_id=, ?limit= 최대 100)"""
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        return jsonify(report_service.get_historical_reports(request.args.get('agent_id'), limit))
+    except ValueError:
+        return jsonify({'error': 'limit은 정수여야 합니다'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/market-data', methods=['GET'])
+def get_market_data():
+    """리포트에 쓰이는 시장 데이터 스냅샷과 버전 조회 API"""
+    return jsonify(report_service.get_market_data())
+
+@app.route('/api/market-data', methods=['POST'])
+def update_market_data():
+    """시장 데이터 스냅샷 갱신 API ({"kospi": {"current", "change", "trend"}, ...}, 재시작 없이 리포트에 반영)"""
+    try:
+        return jsonify(report_service.update_market_data(request.get_json() or {}))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/mbti', methods=['POST'])
 def analyze_mbti():
     """MBTI 투자 성향 분석 API"""
@@ -167,20 +220,60 @@ def analyze_mbti():
         result = mbti_service.analyze_answers(answers)
         
         # 분석 결과 저장
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO mbti_results (answers, result, created_at)
             VALUES (?, ?, ?)
         ''', (json.dumps(answers), json.dumps(result, ensure_ascii=False), datetime.now()))
         conn.commit()
-        conn.close()
         
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/mbti/bulk', methods=['POST'])
+def analyze_mbti_bulk():
+    """MBTI 일괄 분석 API ({"answer_sets": [[10개 답변], ...]}, 결과는 한 트랜잭션으로 저장)"""
+    try:
+        data = request.get_json() or {}
+        answer_sets = data.get('answer_sets')
+        results = mbti_service.analyze_batch(answer_sets)
+
+        # 같은 결과 dict는 한 번만 직렬화
+        serialized = {}
+        created_at = datetime.now()
+        rows = []
+        for answers, result in zip(answer_sets, results):
+            if id(result) not in serialized:
+                serialized[id(result)] = json.dumps(result, ensure_ascii=False)
+            rows.append((json.dumps(answers), serialized[id(result)], created_at))
+
+        conn = get_db()
+        conn.executemany('''
+            INSERT INTO mbti_results (answers, result, created_at)
+            VALUES (?, ?, ?)
+        ''', rows)
+        conn.commit()
+
+        recommended_counts = {}
+        for result in results:
+            agent = result['recommended_agent']
+            recommended_counts[agent] = recommended_counts.get(agent, 0) + 1
+
+        return jsonify({
+            'count': len(results),
+            'recommended_counts': recommended_counts,
+            'results': [{'recommended_agent': result['recommended_agent'],
+                         'normalized_scores': result['normalized_scores']} for result in results]
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/practice', methods=['POST'])
 def practice_scenario():
     """실습 시나리오 API"""
@@ -189,30 +282,51 @@ def practice_scenario():
         agent_id = data.get('agent_id', 'standard')
         decision = data.get('decision', '')
         symbol = data.get('symbol', '')
+        seed = data.get('seed')
+        outcome_seed = data.get('outcome_seed')
+        user_id = data.get('user_id', 'default')
         
         # 실습 서비스를 통한 시나리오 생성
         scenario = practice_service.get_scenario(agent_id)
         
         if decision:
             # 의사결정 결과 계산
-            result = practice_service.calculate_result(decision, symbol)
+            result = practice_service.calculate_result(decision, symbol, seed, outcome_seed)
             scenario['result'] = result
             
             # 실습 결과 저장
-            conn = get_db_connection()
+            conn = get_db()
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO practice_results (agent_id, symbol, decision, result, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (agent_id, symbol, decision, json.dumps(result, ensure_ascii=False), datetime.now()))
+                INSERT INTO practice_results (agent_id, symbol, decision, result, created_at, user_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (agent_id, symbol, decision, json.dumps(result, ensure_ascii=False), datetime.now(), user_id))
             conn.commit()
-            conn.close()
         
         return jsonify(scenario)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/practice/stats', methods=['GET'])
+def practice_statistics():
+    """사용자 실습 통계 API (?user_id=, 누적 통계와 리더보드 순위)"""
+    try:
+        return jsonify(practice_service.get_practice_statistics(request.args.get('user_id', 'default')))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/practice/leaderboard', methods=['GET'])
+def practice_leaderboard():
+    """실습 리더보드 API (?limit=, 최대 100명)"""
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        return jsonify(practice_service.get_leaderboard(limit))
+    except ValueError:
+        return jsonify({'error': 'limit은 정수여야 합니다'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/risk', methods=['POST'])
 def risk_analysis():
     """리스크 분석 API"""
@@ -224,33 +338,63 @@ def risk_analysis():
         analysis = risk_service.analyze_risk(agent_id)
         
         # 리스크 분석 결과 저장
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO risk_analyses (agent_id, analysis, created_at)
             VALUES (?, ?, ?)
         ''', (agent_id, json.dumps(analysis, ensure_ascii=False), datetime.now()))
         conn.commit()
-        conn.close()
         
         return jsonify(analysis)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/risk/stress-test', methods=['POST'])
+def bulk_stress_test():
+    """시나리오 × Agent/포트폴리오 일괄 스트레스 테스트 API
+
+    {"agent_ids": [...], "portfolios": [{"id", "beta", "volatility"}],
+     "scenarios": [{"id", "market", "volatility", "rate"}] 또는 "grid": {"market": [...], "volatility": [...], "rate": [...]}}
+    """
+    try:
+        data = request.get_json() or {}
+        return jsonify(risk_service.stress_test(data.get('agent_ids'), data.get('portfolios'),
+                                                data.get('scenarios'), data.get('grid')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/memos', methods=['GET'])
 def get_memos():
-    """메모 목록 조회 API"""
+    """메모 목록 조회 API
+
+    ?agent_id=로 Agent별 필터, ?cursor=(첫 페이지는 빈 값)를 주면 최신순 페이지와 next_cursor를 반환
+    """
     try:
-        conn = get_db_connection()
+        agent_id = request.args.get('agent_id')
+        conn = get_db()
+        if 'cursor' in request.args:
+            limit = page_limit(request.args.get('limit'))
+            return jsonify(list_memos_page(conn, agent_id, limit, request.args.get('cursor')))
+
         cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, agent_id, title, content, synced, created_at
-            FROM memos
-            ORDER BY created_at DESC
-        ''')
+        if agent_id:
+            cursor.execute('''
+                SELECT id, agent_id, title, content, synced, created_at
+                FROM memos
+                WHERE agent_id = ?
+                ORDER BY created_at DESC
+            ''', (agent_id,))
+        else:
+            cursor.execute('''
+                SELECT id, agent_id, title, content, synced, created_at
+                FROM memos
+                ORDER BY created_at DESC
+            ''')
         memos = cursor.fetchall()
-        conn.close()
         
         result = []
         for memo in memos:
@@ -265,6 +409,41 @@ def get_memos():
         
         return jsonify(result)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/memos/changes', methods=['GET'])
+def get_memo_changes_api():
+    """메모 증분 동기화 API
+
+    ?cursor=N 이후 추가/수정된 메모(changes)와 삭제된 메모 ID(deleted), 다음 요청에 쓸 cursor를 반환
+    (처음 동기화는 cursor=0, has_more가 true이면 같은 방식으로 이어서 요청)
+    """
+    try:
+        limit = page_limit(request.args.get('limit'))
+        return jsonify(get_memo_changes(get_db(), request.args.get('cursor', 0),
+                                        request.args.get('agent_id'), limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/memos/batch', methods=['POST'])
+def batch_memos():
+    """메모 일괄 동기화/삭제 API ({"sync": [id...], "delete": [id...]}, 한 트랜잭션)"""
+    try:
+        data = request.get_json() or {}
+        sync_ids = data.get('sync', [])
+        delete_ids = data.get('delete', [])
+        if not isinstance(sync_ids, list) or not isinstance(delete_ids, list):
+            return jsonify({'error': 'sync와 delete는 메모 ID 목록이어야 합니다'}), 400
+        
+        return jsonify(apply_memo_batch(get_db(), sync_ids, delete_ids))
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -280,14 +459,13 @@ def save_memo():
         if not title or not content:
             return jsonify({'error': '제목과 내용이 필요합니다'}), 400
         
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO memos (agent_id, title, content, synced, created_at)
             VALUES (?, ?, ?, ?, ?)
         ''', (agent_id, title, content, True, datetime.now()))
         conn.commit()
-        conn.close()
         
         return jsonify({'message': '메모가 저장되었습니다'})
         
@@ -298,11 +476,10 @@ def save_memo():
 def delete_memo(memo_id):
     """메모 삭제 API"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM memos WHERE id = ?', (memo_id,))
         conn.commit()
-        conn.close()
         
         return jsonify({'message': '메모가 삭제되었습니다'})
         
@@ -313,11 +490,10 @@ def delete_memo(memo_id):
 def sync_memo(memo_id):
     """메모 동기화 API"""
     try:
-        conn = get_db_connection()
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('UPDATE memos SET synced = 1 WHERE id = ?', (memo_id,))
         conn.commit()
-        conn.close()
         
         return jsonify({'message': '메모가 동기화되었습니다'})
         
@@ -326,7 +502,7 @@ def sync_memo(memo_id):
 
 if __name__ == '__main__':
     # 데이터베이스 초기화
-    init_db()
+    preload_services()
     
-    # 개발 서버 실행
-    app.run(debug=True, host='0.0.0.0', port=5004)
+    # 서버 실행 (기본은 개발 서버, --mode production 또는 SERVER_MODE=production이면 멀티 워커 서버)
+    run_app(app, 5004, before_fork=prepare_fork)
@@ -1,18 +1,255 @@
 import sqlite3
 import os
+import json
+import base64
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 
+# 데이터베이스 파일 (MYPAGE_DB_PATH 환경 변수로 바꿀 수 있음)
+DB_PATH = os.environ.get('MYPAGE_DB_PATH', os.path.join(os.path.dirname(__file__), '..', 'investment_ai.db'))
+
+# 연결 풀 크기 (요청 스레드 수보다 작으면 반납될 때까지 대기)
+POOL_SIZE = max(4, (os.cpu_count() or 1) * 2)
+
+# Agent별 최신순 조회(WHERE agent_id = ? ORDER BY created_at DESC)를 인덱스 범위 검색으로 처리
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_chat_history_agent_created ON chat_history (agent_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_reports_agent_created ON reports (agent_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_memos_agent_created ON memos (agent_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_memos_created ON memos (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_practice_results_agent_created ON practice_results (agent_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_memo_changes_agent_seq ON memo_changes (agent_id, seq)',
+    'CREATE INDEX IF NOT EXISTS idx_memo_changes_memo ON memo_changes (memo_id)',
+    'CREATE INDEX IF NOT EXISTS idx_practice_stats_seq ON practice_stats (seq)'
+]
+
+# 실습 결과가 기록될 때마다 사용자별 누적 통계를 같은 트랜잭션에서 갱신
+# (성공 = 실현 경로로 정한 결과의 success, 그 값이 없는 이전 결과는 20 스텝 손익 > 0).
+# seq는 마지막 실습 결과 id(증가 순번)로, 리더보드가 마지막으로 읽은 이후 바뀐 사용자만 다시 읽음
+PRACTICE_SUCCESS = "COALESCE(json_extract({result}, '$.success'), json_extract({result}, '$.pnl20') > 0, 0)"
+
+PRACTICE_STATS_TRIGGER = f'''
+    CREATE TRIGGER IF NOT EXISTS practice_results_stats AFTER INSERT ON practice_results BEGIN
+        INSERT INTO practice_stats (user_id, total_practices, successes, buy_count, hold_count, sell_count,
+                                    best_performance, last_practice_at, seq)
+        VALUES (NEW.user_id, 1, {PRACTICE_SUCCESS.format(result='NEW.result')},
+                NEW.decision = 'buy', NEW.decision = 'hold', NEW.decision = 'sell',
+                json_extract(NEW.result, '$.pnl20'), NEW.created_at, NEW.id)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_practices = total_practices + 1,
+            successes = successes + excluded.successes,
+            buy_count = buy_count + excluded.buy_count,
+            hold_count = hold_count + excluded.hold_count,
+            sell_count = sell_count + excluded.sell_count,
+            best_performance = MAX(COALESCE(best_performance, excluded.best_performance),
+                                   COALESCE(excluded.best_performance, best_performance)),
+            last_practice_at = MAX(last_practice_at, excluded.last_practice_at),
+            seq = excluded.seq;
+    END
+'''
+
+# 메모 변경 기록: 메모마다 마지막 변경 한 건만 남기므로(삭제는 툼스톤) 크기는 메모 수 수준으로 유지되고,
+# 증분 동기화는 커서(seq) 이후의 변경만 읽음
+MEMO_CHANGE_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS memos_change_insert AFTER INSERT ON memos BEGIN
+        DELETE FROM memo_changes WHERE memo_id = NEW.id;
+        INSERT INTO memo_changes (memo_id, agent_id, op) VALUES (NEW.id, NEW.agent_id, 'upsert');
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS memos_change_update AFTER UPDATE ON memos BEGIN
+        DELETE FROM memo_changes WHERE memo_id = NEW.id;
+        INSERT INTO memo_changes (memo_id, agent_id, op) VALUES (NEW.id, NEW.agent_id, 'upsert');
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS memos_change_delete AFTER DELETE ON memos BEGIN
+        DELETE FROM memo_changes WHERE memo_id = OLD.id;
+        INSERT INTO memo_changes (memo_id, agent_id, op) VALUES (OLD.id, OLD.agent_id, 'delete');
+    END
+    '''
+]
+
+# 메모 목록/동기화 기본 및 최대 페이지 크기
+MEMO_PAGE_SIZE = 50
+MEMO_MAX_PAGE_SIZE = 500
+
+class ConnectionPool:
+    """WAL 모드 SQLite 연결 풀
+
+    요청마다 연결을 새로 열지 않고 풀에서 빌려 쓴 뒤 반납합니다.
+    WAL 모드이므로 한 연결이 쓰는 동안에도 다른 연결의 조회는 막히지 않습니다.
+    fork된 워커 프로세스에서는 부모의 연결을 쓰지 않고 새로 엽니다.
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE, timeout=30.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.stats = {'checkouts': 0, 'waits': 0, 'opened': 0}
+        # fork 전에 열려 있던 연결 (자식 프로세스에서 닫으면 부모의 잠금/WAL 상태를 망가뜨릴 수 있어 보관만 함)
+        self._inherited = []
+        if hasattr(os, 'register_at_fork'):
+            after_fork = weakref.WeakMethod(self._after_fork)
+            os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
+    def _after_fork(self):
+        """fork된 자식 프로세스: 부모의 연결과 잠금을 쓰지 않고 새 풀로 시작"""
+        while True:
+            try:
+                self._inherited.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def acquire(self):
+        """유휴 연결을 꺼내거나, 풀 한도 안에서 새로 열거나, 반납될 때까지 대기"""
+        with self._lock:
+            self.stats['checkouts'] += 1
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+                self.stats['opened'] += 1
+            else:
+                self.stats['waits'] += 1
+
+        if create:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=self.timeout)
+
+    def release(self, conn):
+        """커밋되지 않은 변경은 롤백한 뒤 풀에 반납"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """요청 밖(스크립트, 초기화)에서 쓰는 연결: 성공 시 커밋, 실패 시 롤백"""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            self.release(conn)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'size': self.size, 'open': self._created, 'idle': self._idle.qsize()}
+
+    def close(self):
+        """유휴 연결 종료 (워커를 fork하기 전 마스터에서도 호출, 이후 필요하면 새로 엶)"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """프로세스 공용 연결 풀 (처음 사용할 때 생성)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
 def get_db_connection():
-    """데이터베이스 연결"""
-    db_path = os.path.join(os.path.dirname(__file__), '..', 'investment_ai.db')
-    conn = sqlite3.connect(db_path)
+    """데이터베이스 연결 (풀과 별개의 단독 연결, 사용 후 직접 close)"""
+    conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_db():
+    """요청 범위 연결: 요청 안에서는 같은 연결을 재사용하고 요청이 끝나면 풀에 반납"""
+    from flask import g
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+def close_db(exception=None):
+    """요청 종료 시 연결 반납 (커밋되지 않은 변경은 롤백)"""
+    from flask import g
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def init_app(app):
+    """Flask 앱에 요청 범위 연결 반납 등록"""
+    app.teardown_appcontext(close_db)
+
 def init_db():
     """데이터베이스 초기화"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_pool().connection() as conn:
+        _create_tables(conn.cursor())
+        _migrate(conn)
+        # 성공 기준이 바뀐 트리거를 기존 DB에도 반영하도록 실습 통계 트리거는 항상 다시 만듦
+        conn.execute('DROP TRIGGER IF EXISTS practice_results_stats')
+        for statement in INDEXES + MEMO_CHANGE_TRIGGERS + [PRACTICE_STATS_TRIGGER]:
+            conn.execute(statement)
+        # 변경 기록 도입 이전 메모도 첫 동기화(cursor=0)에 포함되도록 기록
+        conn.execute('''
+            INSERT INTO memo_changes (memo_id, agent_id, op)
+            SELECT id, agent_id, 'upsert' FROM memos
+            WHERE id NOT IN (SELECT memo_id FROM memo_changes)
+            ORDER BY id
+        ''')
+        # 통계 테이블 도입 이전의 실습 결과로 누적 통계를 한 번 만듦
+        if conn.execute('SELECT 1 FROM practice_stats LIMIT 1').fetchone() is None:
+            conn.execute(f'''
+                INSERT INTO practice_stats (user_id, total_practices, successes, buy_count, hold_count, sell_count,
+                                            best_performance, last_practice_at, seq)
+                SELECT user_id, COUNT(*), SUM({PRACTICE_SUCCESS.format(result='result')}),
+                       SUM(decision = 'buy'), SUM(decision = 'hold'), SUM(decision = 'sell'),
+                       MAX(json_extract(result, '$.pnl20')), MAX(created_at), MAX(id)
+                FROM practice_results
+                GROUP BY user_id
+            ''')
+
+    print("데이터베이스가 초기화되었습니다.")
+
+def _migrate(conn):
+    """기존 DB 파일에 추가된 컬럼 반영"""
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(practice_results)')}
+    if 'user_id' not in columns:
+        conn.execute("ALTER TABLE practice_results ADD COLUMN user_id TEXT NOT NULL DEFAULT 'default'")
+
+def _create_tables(cursor):
+    """테이블 생성"""
     
     # 채팅 기록 테이블
     cursor.execute('''
@@ -53,7 +290,23 @@ def init_db():
             symbol TEXT NOT NULL,
             decision TEXT NOT NULL,
             result TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            user_id TEXT NOT NULL DEFAULT 'default'
+        )
+    ''')
+    
+    # 사용자별 실습 누적 통계 테이블 (실습 결과 기록 시 트리거로 갱신)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS practice_stats (
+            user_id TEXT PRIMARY KEY,
+            total_practices INTEGER NOT NULL,
+            successes INTEGER NOT NULL,
+            buy_count INTEGER NOT NULL,
+            hold_count INTEGER NOT NULL,
+            sell_count INTEGER NOT NULL,
+            best_performance REAL,
+            last_practice_at TIMESTAMP,
+            seq INTEGER NOT NULL
         )
     ''')
     
@@ -79,6 +332,16 @@ def init_db():
         )
     ''')
     
+    # 메모 변경 기록 테이블 (증분 동기화용)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS memo_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            memo_id INTEGER NOT NULL,
+            agent_id TEXT NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''')
+    
     # 사용자 설정 테이블
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_settings (
@@ -90,19 +353,11 @@ def init_db():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    conn.commit()
-    conn.close()
-    
-    print("데이터베이스가 초기화되었습니다.")
 
 def get_user_settings(user_id='default'):
     """사용자 설정 조회"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM user_settings WHERE user_id = ?', (user_id,))
-    settings = cursor.fetchone()
-    conn.close()
+    with get_pool().connection() as conn:
+        settings = conn.execute('SELECT * FROM user_settings WHERE user_id = ?', (user_id,)).fetchone()
     
     if settings:
         return dict(settings)
@@ -110,85 +365,149 @@ def get_user_settings(user_id='default'):
 
 def save_user_settings(user_id='default', current_agent='standard', preferences=None):
     """사용자 설정 저장"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT OR REPLACE INTO user_settings (user_id, current_agent, preferences, updated_at)
-        VALUES (?, ?, ?, ?)
-    ''', (user_id, current_agent, json.dumps(preferences) if preferences else None, datetime.now()))
+    with get_pool().connection() as conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO user_settings (user_id, current_agent, preferences, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (user_id, current_agent, json.dumps(preferences) if preferences else None, datetime.now()))
+
+def _latest(table, agent_id, limit):
+    """Agent별(또는 전체) 최신순 조회 (agent_id, created_at) / created_at 인덱스를 역순으로 읽음"""
+    with get_pool().connection() as conn:
+        if agent_id:
+            rows = conn.execute(f'''
+                SELECT * FROM {table} 
+                WHERE agent_id = ? 
+                ORDER BY created_at DESC 
+                LIMIT ?
+            ''', (agent_id, limit)).fetchall()
+        else:
+            rows = conn.execute(f'''
+                SELECT * FROM {table} 
+                ORDER BY created_at DESC 
+                LIMIT ?
+            ''', (limit,)).fetchall()
     
-    conn.commit()
-    conn.close()
+    return [dict(row) for row in rows]
 
 def get_chat_history(agent_id=None, limit=50):
     """채팅 기록 조회"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if agent_id:
-        cursor.execute('''
-            SELECT * FROM chat_history 
-            WHERE agent_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (agent_id, limit))
-    else:
-        cursor.execute('''
-            SELECT * FROM chat_history 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (limit,))
-    
-    history = cursor.fetchall()
-    conn.close()
-    
-    return [dict(row) for row in history]
+    return _latest('chat_history', agent_id, limit)
 
 def get_reports(agent_id=None, limit=20):
     """리포트 조회"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if agent_id:
-        cursor.execute('''
-            SELECT * FROM reports 
-            WHERE agent_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (agent_id, limit))
-    else:
-        cursor.execute('''
-            SELECT * FROM reports 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (limit,))
-    
-    reports = cursor.fetchall()
-    conn.close()
-    
-    return [dict(row) for row in reports]
+    return _latest('reports', agent_id, limit)
 
 def get_memos(agent_id=None, limit=50):
     """메모 조회"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    return _latest('memos', agent_id, limit)
+
+def page_limit(value, default=MEMO_PAGE_SIZE):
+    """요청의 limit 값 검증 (1 ~ MEMO_MAX_PAGE_SIZE)"""
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValueError('limit은 정수여야 합니다')
+    if limit < 1:
+        raise ValueError('limit은 1 이상이어야 합니다')
+    return min(limit, MEMO_MAX_PAGE_SIZE)
+
+def encode_memo_cursor(memo):
+    """목록 페이지 커서 (마지막 메모의 created_at, id)"""
+    raw = json.dumps([memo['created_at'], memo['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_memo_cursor(cursor):
+    try:
+        created_at, memo_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), int(memo_id)
+    except Exception:
+        raise ValueError('잘못된 커서입니다')
+
+def _memo_dict(row):
+    return {
+        'id': row['id'],
+        'agent_id': row['agent_id'],
+        'title': row['title'],
+        'content': row['content'],
+        'synced': bool(row['synced']),
+        'dateStr': row['created_at']
+    }
+
+def list_memos_page(conn, agent_id=None, limit=MEMO_PAGE_SIZE, cursor=None):
+    """메모 목록 키셋 페이지 (최신순, (agent_id, created_at) 인덱스를 이어서 읽음)"""
+    conditions, params = [], []
     if agent_id:
-        cursor.execute('''
-            SELECT * FROM memos 
-            WHERE agent_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (agent_id, limit))
-    else:
-        cursor.execute('''
-            SELECT * FROM memos 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (limit,))
-    
-    memos = cursor.fetchall()
-    conn.close()
-    
-    return [dict(row) for row in memos]
+        conditions.append('agent_id = ?')
+        params.append(agent_id)
+    if cursor:
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend(decode_memo_cursor(cursor))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    rows = conn.execute(f'''
+        SELECT id, agent_id, title, content, synced, created_at
+        FROM memos
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    ''', (*params, limit + 1)).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'memos': [_memo_dict(row) for row in rows],
+        'next_cursor': encode_memo_cursor(rows[-1]) if has_more else None
+    }
+
+def get_memo_changes(conn, since=0, agent_id=None, limit=MEMO_PAGE_SIZE):
+    """since 이후 변경된 메모 (삭제는 deleted 표시), 다음 요청에 쓸 cursor 포함"""
+    try:
+        since = int(since or 0)
+    except (TypeError, ValueError):
+        raise ValueError('cursor는 정수여야 합니다')
+    agent_filter = 'AND c.agent_id = ?' if agent_id else ''
+    params = (since, agent_id, limit + 1) if agent_id else (since, limit + 1)
+    rows = conn.execute(f'''
+        SELECT c.seq, c.memo_id, c.op, m.id, m.agent_id, m.title, m.content, m.synced, m.created_at
+        FROM memo_changes c
+        LEFT JOIN memos m ON m.id = c.memo_id
+        WHERE c.seq > ? {agent_filter}
+        ORDER BY c.seq
+        LIMIT ?
+    ''', params).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changes, deleted = [], []
+    for row in rows:
+        if row['op'] == 'delete' or row['id'] is None:
+            deleted.append(row['memo_id'])
+        else:
+            changes.append(_memo_dict(row))
+    # 변경이 없으면 since를 그대로 돌려줌 (따로 읽은 MAX(seq)로 건너뛰면 그 사이 기록된 변경을 놓칠 수 있음)
+    cursor = rows[-1]['seq'] if rows else since
+    return {'changes': changes, 'deleted': deleted, 'cursor': cursor, 'has_more': has_more}
+
+def apply_memo_batch(conn, sync_ids=(), delete_ids=()):
+    """여러 메모의 동기화 표시/삭제를 한 트랜잭션에서 처리 (처리 건수 반환)"""
+    try:
+        sync_ids = [int(memo_id) for memo_id in sync_ids]
+        delete_ids = [int(memo_id) for memo_id in delete_ids]
+    except (TypeError, ValueError):
+        raise ValueError('메모 ID는 정수여야 합니다')
+    try:
+        synced = conn.execute(
+            'UPDATE memos SET synced = 1 WHERE synced = 0 AND id IN (SELECT value FROM json_each(?))',
+            (json.dumps(sync_ids),)
+        ).rowcount
+        deleted = conn.execute(
+            'DELETE FROM memos WHERE id IN (SELECT value FROM json_each(?))',
+            (json.dumps(delete_ids),)
+        ).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    # 동기화 커서는 돌려주지 않음: 최신 seq로 건너뛰면 다른 기기가 기록했지만 아직 받지 않은 변경을 놓치므로
+    # 클라이언트는 /api/memos/changes로 이어서 받아야 함
+    return {'synced': synced, 'deleted': deleted}
@@ -0,0 +1,116 @@
+import bisect
+import threading
+from itertools import islice
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+class _SortedKeys:
+    """sortedcontainers가 없을 때 쓰는 정렬 목록 (조회는 이진 탐색, 갱신은 리스트 삽입/삭제)"""
+
+    def __init__(self, keys=()):
+        self._keys = sorted(keys)
+
+    def add(self, key):
+        bisect.insort(self._keys, key)
+
+    def remove(self, key):
+        del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def bisect_left(self, key):
+        return bisect.bisect_left(self._keys, key)
+
+    def islice(self, start, stop):
+        return islice(self._keys, start, stop)
+
+    def __len__(self):
+        return len(self._keys)
+
+def _sorted_keys(keys=()):
+    if SortedList is not None:
+        return SortedList(keys)
+    return _SortedKeys(keys)
+
+PRACTICE_STATS_COLUMNS = '''
+    user_id, total_practices, successes, buy_count, hold_count, sell_count, best_performance, last_practice_at, seq
+'''
+
+class PracticeLeaderboard:
+    """실습 리더보드: practice_stats(사용자별 누적 통계)를 정렬된 순위 키로 메모리에 유지
+
+    - 순위 기준: 성공률 → 실습 횟수 (모두 내림차순), 같으면 user_id
+      (최고 수익률은 관망이면 항상 0이라 결정 비율에 따라 순위가 갈리므로 순위에 쓰지 않음)
+    - 조회할 때마다 마지막으로 읽은 seq 이후 바뀐 사용자만 DB에서 읽어 반영하므로
+      다른 프로세스(워커)에서 기록된 실습도 반영됨
+    - 상위 N명은 O(log n + N), 특정 사용자 순위는 O(log n)
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._keys = _sorted_keys()
+        self._stats = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _rank_key(stats):
+        return (-stats['success_rate'], -stats['total_practices'], stats['user_id'])
+
+    @staticmethod
+    def _to_stats(row):
+        total = row['total_practices']
+        decisions = {'buy': row['buy_count'], 'hold': row['hold_count'], 'sell': row['sell_count']}
+        return {
+            'user_id': row['user_id'],
+            'total_practices': total,
+            'success_rate': round(row['successes'] / total, 4) if total else 0.0,
+            'favorite_decision': max(decisions, key=decisions.get) if total else None,
+            'best_performance': round(row['best_performance'], 2) if row['best_performance'] is not None else None,
+            'last_practice_date': str(row['last_practice_at'])[:10] if row['last_practice_at'] else None
+        }
+
+    def sync(self):
+        """마지막으로 읽은 이후 바뀐 사용자 통계를 순위에 반영"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT {PRACTICE_STATS_COLUMNS} FROM practice_stats WHERE seq > ? ORDER BY seq
+            ''', (self._seq,)).fetchall()
+        if not rows:
+            return 0
+        with self._lock:
+            if not self._stats:
+                # 처음 읽을 때는 한 번에 정렬해서 만듦
+                self._stats = {row['user_id']: self._to_stats(row) for row in rows}
+                self._keys = _sorted_keys(self._rank_key(stats) for stats in self._stats.values())
+                self._seq = rows[-1]['seq']
+                return len(rows)
+            for row in rows:
+                if row['seq'] <= self._seq:
+                    continue
+                stats = self._to_stats(row)
+                previous = self._stats.get(stats['user_id'])
+                if previous is not None:
+                    self._keys.remove(self._rank_key(previous))
+                self._keys.add(self._rank_key(stats))
+                self._stats[stats['user_id']] = stats
+                self._seq = row['seq']
+        return len(rows)
+
+    def top(self, limit=10):
+        """상위 limit명"""
+        self.sync()
+        with self._lock:
+            keys = list(self._keys.islice(0, limit))
+            return [{'rank': rank, **self._stats[key[-1]]} for rank, key in enumerate(keys, start=1)]
+
+    def get_user(self, user_id):
+        """사용자 통계와 순위 (실습 기록이 없으면 None)"""
+        self.sync()
+        with self._lock:
+            stats = self._stats.get(user_id)
+            if stats is None:
+                return None
+            return {**stats, 'rank': self._keys.bisect_left(self._rank_key(stats)) + 1,
+                    'total_users': len(self._keys)}
@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+
+class WriteBehindQueue:
+    """요청 밖에서 모아서 쓰는 INSERT 대기열
+
+    요청 스레드는 (SQL, 파라미터)를 넣고 바로 반환하며, 백그라운드 스레드가
+    batch_size개 또는 flush_interval초마다 모인 행을 한 트랜잭션의 executemany로 기록합니다.
+    - 대기열이 max_size만큼 차면 넣는 쪽이 자리가 날 때까지 대기 (메모리 상한)
+    - flush(): 지금까지 넣은 행이 모두 기록될 때까지 대기
+    - close(): 남은 행을 기록하고 스레드 종료 (프로세스 종료 시 호출)
+    - 배치 기록이 실패하면(잠금 시간 초과 등) 한 번 더 시도하고, 그래도 실패하면 실패 건수로 집계
+    """
+
+    def __init__(self, pool, max_size=10000, flush_interval=0.2, batch_size=500):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.stats = {'enqueued': 0, 'written': 0, 'batches': 0, 'retries': 0, 'failed': 0, 'full_waits': 0,
+                      'max_depth': 0}
+
+    def _ensure_thread(self):
+        # fork된 워커 프로세스에는 부모의 스레드가 없으므로 프로세스마다 새로 시작
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, sql, params):
+        """INSERT 한 건 추가 (대기열이 가득 차면 자리가 날 때까지 대기)"""
+        if self._closed:
+            raise RuntimeError('기록 대기열이 종료되었습니다')
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((sql, params))
+        except queue.Full:
+            with self._lock:
+                self.stats['full_waits'] += 1
+            self._queue.put((sql, params))
+        with self._lock:
+            self.stats['enqueued'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], self._queue.qsize())
+
+    def _drain(self):
+        """첫 항목은 flush_interval까지 기다리고, 이후 batch_size까지 대기 없이 꺼냄"""
+        try:
+            items = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(items) < self.batch_size:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _write(self, items):
+        grouped = {}
+        for sql, params in items:
+            grouped.setdefault(sql, []).append(params)
+        # 실패한 트랜잭션은 연결 반납 시 롤백되므로 같은 배치를 그대로 다시 기록할 수 있음
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as conn:
+                    for sql, rows in grouped.items():
+                        conn.executemany(sql, rows)
+            except Exception as e:
+                if attempt == 0:
+                    with self._lock:
+                        self.stats['retries'] += 1
+                    continue
+                with self._lock:
+                    self.stats['failed'] += len(items)
+                print(f"기록 대기열 저장 실패 ({len(items)}건): {e}")
+                return
+            with self._lock:
+                self.stats['written'] += len(items)
+                self.stats['batches'] += 1
+            return
+
+    def _run(self):
+        while True:
+            items = self._drain()
+            if items:
+                self._write(items)
+                for _ in items:
+                    self._queue.task_done()
+            elif self._closed:
+                return
+
+    def flush(self):
+        """지금까지 넣은 행이 모두 기록될 때까지 대기"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """남은 행을 기록하고 백그라운드 스레드 종료"""
+        self._closed = True
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+            self._thread.join(timeout=self.flush_interval * 5)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, 'depth': self._queue.qsize()}
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+실습 리더보드 공정성과 결과 피드백 점검
+의사결정 비율이 다른 사용자 집단(매수만, 매도만, 관망만, 섞어서)이 같은 횟수로 실습했을 때
+성공률과 리더보드 순위가 결정 비율에 따라 갈리지 않는지 확인
+
+- 집단별 평균 성공률이 1/3(삼분위 기준 성공 확률)에서 --tolerance 이내
+- 집단별 평균 순위 백분위가 0.5에서 --tolerance 이내
+- 상위 10%에 모든 집단이 포함
+- 모든 결정에서 결과의 success와 분석 문구, 첫 번째 권장사항이 같은 성공 여부를 가리킴
+하나라도 어긋나면 종료 코드 1
+
+실행: python practice_check.py --users 500 --practices 30
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime
+
+import models.database as database
+from models.database import get_pool, init_db
+from models.leaderboard import PracticeLeaderboard
+from services.practice_service import PRACTICE_ANALYSES, PRACTICE_RECOMMENDATIONS, PracticeService
+
+# 집단 이름 → 의사결정 후보
+DECISION_MIXES = {
+    'buy-only': ['buy'],
+    'sell-only': ['sell'],
+    'hold-only': ['hold'],
+    'mixed': ['buy', 'hold', 'sell']
+}
+
+SUCCESS_PROBABILITY = 1 / 3
+
+def record_practices(service, users, practices, rng):
+    """집단별 users명이 practices번씩 실습한 결과를 기록하고 사용자 → 집단 반환"""
+    symbols = [scenario['symbol'] for scenario in service.scenarios.values()]
+    groups, rows = {}, []
+    # 동률이면 user_id 순이므로 집단과 무관한 무작위 id를 씀
+    user_ids = iter(rng.sample(range(10 ** 6), users * len(DECISION_MIXES)))
+    for mix, decisions in DECISION_MIXES.items():
+        for _ in range(users):
+            user_id = f'user-{next(user_ids):06d}'
+            groups[user_id] = mix
+            for _ in range(practices):
+                decision, symbol = rng.choice(decisions), rng.choice(symbols)
+                result = service.calculate_result(decision, symbol, outcome_seed=rng.getrandbits(32))
+                rows.append(('standard', symbol, decision, json.dumps(result, ensure_ascii=False), datetime.now(),
+                             user_id))
+    rng.shuffle(rows)
+    with get_pool().connection() as conn:
+        conn.executemany('''
+            INSERT INTO practice_results (agent_id, symbol, decision, result, created_at, user_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return groups
+
+def check_feedback(service, rng, samples=300):
+    """결정별로 success와 분석/권장사항이 어긋난 결과 수 (결정 → 어긋난 수, 성공 수, 표본 수)"""
+    symbols = [scenario['symbol'] for scenario in service.scenarios.values()]
+    report = {}
+    for decision in PRACTICE_ANALYSES:
+        mismatches = successes = 0
+        for _ in range(samples):
+            result = service.calculate_result(decision, rng.choice(symbols), outcome_seed=rng.getrandbits(32))
+            success = result['success']
+            successes += success
+            if (result['analysis'] != PRACTICE_ANALYSES[decision][success]
+                    or result['recommendations'][0] != PRACTICE_RECOMMENDATIONS[decision][success]):
+                mismatches += 1
+        report[decision] = (mismatches, successes, samples)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='실습 리더보드 공정성 점검')
+    parser.add_argument('--users', type=int, default=500, help='집단별 사용자 수')
+    parser.add_argument('--practices', type=int, default=30, help='사용자별 실습 횟수')
+    parser.add_argument('--tolerance', type=float, default=0.05, help='허용 오차')
+    parser.add_argument('--seed', type=int, default=7, help='난수 시드')
+    args = parser.parse_args()
+
+    print("=== 실습 리더보드 공정성 점검 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, 'practice_check.db')
+        init_db()
+        service = PracticeService(PracticeLeaderboard(get_pool()))
+        groups = record_practices(service, args.users, args.practices, random.Random(args.seed))
+
+        total = len(groups)
+        ranking = service.get_leaderboard(total)
+        top = {entry['user_id'] for entry in ranking[:max(total // 10, 1)]}
+        get_pool().close()
+
+    print(f"집단별 {args.users}명 × 실습 {args.practices}회, 전체 {total}명\n")
+    print(f"   {'group':<10} {'success':>9} {'rank pct':>9} {'top 10%':>8}")
+    failures = []
+    for mix in DECISION_MIXES:
+        entries = [entry for entry in ranking if groups[entry['user_id']] == mix]
+        success = sum(entry['success_rate'] for entry in entries) / len(entries)
+        percentile = sum((entry['rank'] - 1) / (total - 1) for entry in entries) / len(entries)
+        in_top = sum(entry['user_id'] in top for entry in entries)
+        print(f"   {mix:<10} {success:>9.3f} {percentile:>9.3f} {in_top:>8}")
+        if abs(success - SUCCESS_PROBABILITY) > args.tolerance:
+            failures.append(f"{mix}: 평균 성공률 {success:.3f}")
+        if abs(percentile - 0.5) > args.tolerance:
+            failures.append(f"{mix}: 평균 순위 백분위 {percentile:.3f}")
+        if in_top == 0:
+            failures.append(f"{mix}: 상위 10%에 없음")
+
+    print("\n결정별 성공 여부와 분석/권장사항 일치")
+    print(f"   {'decision':<10} {'success':>9} {'mismatch':>9}")
+    for decision, (mismatches, successes, samples) in check_feedback(service, random.Random(args.seed)).items():
+        print(f"   {decision:<10} {successes / samples:>9.3f} {mismatches:>9}")
+        if mismatches:
+            failures.append(f"{decision}: 성공 여부와 다른 분석/권장사항 {mismatches}건")
+
+    if failures:
+        print("\n점검에 실패했습니다:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n결정 비율과 무관하게 성공률과 순위가 분포하고, 분석/권장사항이 성공 여부와 일치합니다.")
+    print("\n=== 점검 완료 ===")
+
+if __name__ == '__main__':
+    main()
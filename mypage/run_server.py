@@ -1,33 +1,34 @@
 #!/usr/bin/env python3
 """
 투자교육 AI 비서 서버 실행 스크립트
+
+python run_server.py                                   # 개발 서버 (디버거, 리로더)
+python run_server.py --mode production --workers 4     # 운영: 워커 4개 × 스레드 8개
+(SERVER_MODE, SERVER_WORKERS, SERVER_THREADS, SERVER_KEEPALIVE, SERVER_GRACEFUL_TIMEOUT 환경 변수로도 설정)
 """
 
 import os
 import sys
-from app import app, init_db
+from app import app, preload_services, prepare_fork
+from serving import parse_serving_args, run_app
 
 def main():
     """메인 실행 함수"""
     print("🚀 투자교육 AI 비서 서버를 시작합니다...")
+    options = parse_serving_args(5001)  # 포트 5000 대신 5001 사용
     
-    # 데이터베이스 초기화
+    # 데이터베이스 초기화 (운영 모드에서는 워커 fork 전에 한 번)
     print("📊 데이터베이스를 초기화합니다...")
-    init_db()
+    preload_services()
     
     # 서버 실행
-    port = 5001  # 포트 5000 대신 5001 사용
-    print(f"🌐 서버가 http://localhost:{port} 에서 실행됩니다.")
+    port = options.port
+    print(f"🌐 서버가 http://localhost:{port} 에서 실행됩니다 ({options.mode} 모드).")
     print(f"📱 브라우저에서 http://localhost:{port} 을 열어주세요.")
     print("⏹️  서버를 중지하려면 Ctrl+C를 누르세요.")
     
     try:
-        app.run(
-            debug=True,
-            host='0.0.0.0',
-            port=port,
-            threaded=True
-        )
+        run_app(app, 5001, before_fork=prepare_fork)
     except KeyboardInterrupt:
         print("\n👋 서버가 종료되었습니다.")
     except Exception as e:
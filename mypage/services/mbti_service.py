@@ -1,3 +1,11 @@
+import numpy as np
+
+# 점수를 매기는 Agent 순서 (동점일 때 앞선 Agent가 추천됨)
+SCORED_AGENTS = ('growth', 'dividend', 'index', 'value', 'quant', 'esg')
+
+# 일괄 분석 한 번에 받을 수 있는 최대 답변 세트 수
+MAX_BATCH_SIZE = 10000
+
 class MBTIService:
     def __init__(self):
         self.questions = [
@@ -131,6 +139,37 @@ class MBTIService:
             }
         }
     
+        self._compile_scoring_matrix()
+    
+    def _compile_scoring_matrix(self):
+        """설문을 (문항, 선택지 + 1, Agent) 점수 행렬로 변환
+
+        마지막 선택지 칸은 0점으로, 범위를 벗어난 답변은 이 칸을 가리키도록 해서 점수에 반영하지 않음
+        """
+        self.option_counts = np.array([len(question['options']) for question in self.questions])
+        self.invalid_option = int(self.option_counts.max())
+        matrix = np.zeros((len(self.questions), self.invalid_option + 1, len(SCORED_AGENTS)), dtype=np.int64)
+        agent_index = {agent: i for i, agent in enumerate(SCORED_AGENTS)}
+        for q, question in enumerate(self.questions):
+            for o, option in enumerate(question['options']):
+                for agent, score in option['scores'].items():
+                    matrix[q, o, agent_index[agent]] += score
+        self.scoring_matrix = matrix
+    
+    def score_batch(self, answer_sets):
+        """답변 세트 (B, 문항 수)를 한 번에 채점해 (B, Agent) 원점수 반환"""
+        try:
+            answers = np.asarray(answer_sets)
+        except (ValueError, TypeError):
+            raise ValueError(f"각 답변 세트는 {len(self.questions)}개 문항의 답변이어야 합니다.")
+        if answers.ndim != 2 or answers.shape[1] != len(self.questions):
+            raise ValueError(f"각 답변 세트는 {len(self.questions)}개 문항의 답변이어야 합니다.")
+        if not np.issubdtype(answers.dtype, np.integer):
+            raise ValueError("답변은 선택지 번호(정수)여야 합니다.")
+        valid = (answers >= 0) & (answers < self.option_counts)
+        options = np.where(valid, answers, self.invalid_option)
+        return self.scoring_matrix[np.arange(len(self.questions)), options].sum(axis=1)
+    
     def get_questions(self):
         """MBTI 질문 목록 반환"""
         return self.questions
@@ -141,16 +180,24 @@ class MBTIService:
             raise ValueError("10개 문항에 모두 답변해야 합니다.")
         
         # 점수 계산
-        scores = {
-            'growth': 0, 'dividend': 0, 'index': 0, 
-            'value': 0, 'quant': 0, 'esg': 0
-        }
-        
-        for i, answer in enumerate(answers):
-            if 0 <= answer < len(self.questions[i]['options']):
-                option = self.questions[i]['options'][answer]
-                for agent, score in option['scores'].items():
-                    scores[agent] += score
+        return self._build_result(self.score_batch([answers])[0])
+    
+    def analyze_batch(self, answer_sets):
+        """여러 답변 세트를 한 번에 채점하고 세트별 분석 결과 반환
+
+        원점수가 같은 세트는 분석 결과를 한 번만 만들어 같은 dict를 공유하므로 결과는 읽기 전용으로 사용
+        """
+        if not isinstance(answer_sets, list) or not answer_sets:
+            raise ValueError("answer_sets는 비어 있지 않은 답변 세트 목록이어야 합니다.")
+        if len(answer_sets) > MAX_BATCH_SIZE:
+            raise ValueError(f"한 번에 최대 {MAX_BATCH_SIZE}개 답변 세트까지 분석할 수 있습니다.")
+        scores, inverse = np.unique(self.score_batch(answer_sets), axis=0, return_inverse=True)
+        results = [self._build_result(row) for row in scores.tolist()]
+        return [results[i] for i in inverse.reshape(-1).tolist()]
+    
+    def _build_result(self, raw_scores):
+        """Agent별 원점수로 분석 결과 생성"""
+        scores = dict(zip(SCORED_AGENTS, (int(score) for score in raw_scores)))
         
         # 정규화 (백분율)
         total_score = sum(scores.values())
@@ -1,9 +1,129 @@
-import random
-import math
-from datetime import datetime, timedelta
+import secrets
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# 몬테카를로 시뮬레이션 경로 수와 기간(스텝), 결과를 보는 시점
+SIMULATION_PATHS = 4096
+SIMULATION_STEPS = 20
+PNL_STEPS = (5, 20)
+
+# 스텝당 기대 수익률과 기본 변동성 (심볼별 변동성 배수를 곱함)
+STEP_DRIFT = 0.0008
+STEP_VOLATILITY = 0.012
+
+# (심볼, 시드)별 시뮬레이션 결과 보관 개수
+SIMULATION_CACHE_SIZE = 64
+
+# 의사결정별 손익 방향 (매수 = 보유 손익, 매도 = 보유했을 때 대비 피한 손실/놓친 수익, 관망 = 없음)
+# 매도/관망은 포지션이 없으므로 최대 낙폭은 0
+DECISION_EXPOSURE = {'buy': 1.0, 'hold': 0.0, 'sell': -1.0}
+
+# 의사결정별 성공 조건: 실현 경로의 20 스텝 가격 변화가 시뮬레이션 분포의 어느 삼분위에 드는지
+# (상위 = 상승, 가운데 = 횡보, 하위 = 하락). 삼분위 경계를 쓰므로 어느 결정이든 성공 확률은 1/3로 같고,
+# 성공률은 결정 비율이 아니라 실현된 결과로 정해짐
+DECISION_OUTCOME = {'buy': 'up', 'hold': 'flat', 'sell': 'down'}
+
+# 의사결정별 결과 분석과 첫 번째 권장사항 (키: 성공 여부)
+PRACTICE_ANALYSES = {
+    'buy': {
+        True: '매수 결정이 좋은 선택이었어요! 상승 모멘텀을 잘 포착했네요.',
+        False: '매수 타이밍이 아쉬웠어요. 더 낮은 가격에 진입할 기회를 놓쳤을 수 있어요.'
+    },
+    'hold': {
+        True: '관망은 신중한 선택이었어요. 더 명확한 신호를 기다리는 것도 좋은 전략이에요.',
+        False: '관망하는 동안 가격이 크게 움직였어요. 진입/청산 신호를 미리 정해두면 좋아요.'
+    },
+    'sell': {
+        True: '매도 결정이 적절했어요! 하락 리스크를 피할 수 있었네요.',
+        False: '매도 타이밍이 아쉬웠어요. 더 높은 가격에 매도할 기회를 놓쳤을 수 있어요.'
+    }
+}
+PRACTICE_RECOMMENDATIONS = {
+    'buy': {
+        True: '매수 타이밍을 잘 포착했어요. 분할 매수를 고려해보세요.',
+        False: '매수 전 더 신중한 분석이 필요했을 것 같아요.'
+    },
+    'hold': {
+        True: '관망 중에도 지속적인 모니터링이 필요해요.',
+        False: '관망 중에도 가격 알림으로 큰 움직임을 놓치지 마세요.'
+    },
+    'sell': {
+        True: '매도 타이밍을 잘 포착했어요. 손절 기준을 명확히 하세요.',
+        False: '매도 전 장기 관점을 고려해보세요.'
+    }
+}
+
+def symbol_seed(symbol):
+    """심볼별 기본 시드 (프로세스가 달라도 같은 값)"""
+    return zlib.crc32(symbol.encode('utf-8'))
+
+class PriceSimulation:
+    """한 심볼의 가격 경로 묶음과 의사결정별 결과 분포
+
+    경로는 로그 정규 수익률로 한 번에 생성하고, 5/20 스텝 가격 변화와 최대 낙폭을
+    경로별 배열로 계산해 둡니다. 의사결정별 분포 요약은 경로 전체에 대한 벡터 연산으로 한 번만 만들고,
+    실습 한 건의 결과는 그중 한 경로(실현 경로)의 값을 그대로 읽습니다.
+    """
+
+    def __init__(self, symbol, seed, volatility_multiplier, paths=SIMULATION_PATHS, steps=SIMULATION_STEPS):
+        self.symbol = symbol
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        sigma = STEP_VOLATILITY * volatility_multiplier
+        log_returns = rng.normal(STEP_DRIFT - 0.5 * sigma ** 2, sigma, size=(paths, steps))
+        # 각 경로의 시작 가격을 1로 둔 누적 가격 (paths × (steps + 1))
+        self.paths = np.exp(np.concatenate([np.zeros((paths, 1)), np.cumsum(log_returns, axis=1)], axis=1))
+        # 경로별 가격 변화(%)와 최대 낙폭(%, 음수)
+        self.moves = {step: (self.paths[:, step] - 1.0) * 100 for step in PNL_STEPS}
+        self.drawdowns = (self.paths / np.maximum.accumulate(self.paths, axis=1) - 1.0).min(axis=1) * 100
+        self.terciles = np.percentile(self.moves[PNL_STEPS[-1]], [100 / 3, 200 / 3])
+        self.summary = {decision: self._summarize(exposure) for decision, exposure in DECISION_EXPOSURE.items()}
+
+    def _summarize(self, exposure):
+        """포지션 방향별 손익(%)과 최대 낙폭(%) 분포 요약 (경로 전체 평균, 승률, 20 스텝 손익 구간)"""
+        if exposure == 0:
+            return {'pnl5': 0.0, 'pnl20': 0.0, 'mdd': 0.0, 'win_rate': 0.0,
+                    'pnl20_range': {'p5': 0.0, 'p50': 0.0, 'p95': 0.0}}
+
+        pnl = {f'pnl{step}': exposure * moves for step, moves in self.moves.items()}
+        drawdown = float(self.drawdowns.mean()) if exposure > 0 else 0.0
+        p5, p50, p95 = np.percentile(pnl['pnl20'], [5, 50, 95])
+        return {
+            **{key: round(float(values.mean()), 2) for key, values in pnl.items()},
+            'mdd': round(drawdown, 2),
+            'win_rate': round(float((pnl['pnl20'] > 0).mean()), 3),
+            'pnl20_range': {'p5': round(float(p5), 2), 'p50': round(float(p50), 2), 'p95': round(float(p95), 2)}
+        }
+
+    def outcome(self, index):
+        """index번 경로의 20 스텝 가격 변화 구간 (up / flat / down)"""
+        move = self.moves[PNL_STEPS[-1]][index]
+        if move > self.terciles[1]:
+            return 'up'
+        if move < self.terciles[0]:
+            return 'down'
+        return 'flat'
+
+    def realize(self, decision, index):
+        """index번 경로가 실제로 일어났을 때 의사결정의 손익(%), 최대 낙폭(%), 결과 구간과 성공 여부"""
+        exposure = DECISION_EXPOSURE.get(decision, 0.0)
+        outcome = self.outcome(index)
+        if exposure == 0:
+            result = {'pnl5': 0.0, 'pnl20': 0.0, 'mdd': 0.0}
+        else:
+            result = {f'pnl{step}': round(float(exposure * moves[index]), 2) for step, moves in self.moves.items()}
+            result['mdd'] = round(float(self.drawdowns[index]), 2) if exposure > 0 else 0.0
+        result['outcome'] = outcome
+        result['success'] = DECISION_OUTCOME.get(decision) == outcome
+        return result
 
 class PracticeService:
-    def __init__(self):
+    def __init__(self, leaderboard=None):
+        # 실습 통계/리더보드 (models.leaderboard.PracticeLeaderboard)
+        self.leaderboard = leaderboard
         self.scenarios = {
             'standard': {
                 'title': '지수 급락 후 반등 초입?',
@@ -90,6 +210,9 @@ class PracticeService:
                 'tickers': ['ICLN', 'TAN', 'KRBN', 'ESGU', 'CLEAN']
             }
         }
+        self._simulations = OrderedDict()
+        self._price_paths = {}
+        self._lock = threading.Lock()
     
     def get_scenario(self, agent_id='standard'):
         """Agent별 시나리오 반환"""
@@ -101,42 +224,57 @@ class PracticeService:
         return scenario
     
     def _generate_price_path(self, symbol):
-        """심볼별 가격 경로 생성"""
-        # 심볼 해시 기반 시드 생성
-        seed = sum(ord(c) for c in symbol) % 100
-        random.seed(seed)
-        
-        base_price = 100.0
-        prices = [base_price]
-        
-        for i in range(20):
-            # 드리프트와 변동성 추가
-            drift = 0.15 * i  # 완만한 우상향 드리프트
-            wave = 2.5 * math.sin((i + seed) * 0.6)  # 파동
-            noise = random.uniform(-1, 1)  # 랜덤 노이즈
-            
-            new_price = base_price + drift + wave + noise
-            prices.append(round(new_price, 2))
-        
-        return prices
+        """심볼별 가격 경로 생성 (같은 심볼이면 같은 경로이므로 한 번만 계산)"""
+        prices = self._price_paths.get(symbol)
+        if prices is None:
+            # 심볼 해시 기반 시드의 독립 난수 생성기 (전역 random 상태를 바꾸지 않음)
+            seed = sum(ord(c) for c in symbol) % 100
+            rng = np.random.default_rng(seed)
+            steps = np.arange(20)
+            drift = 0.15 * steps  # 완만한 우상향 드리프트
+            wave = 2.5 * np.sin((steps + seed) * 0.6)  # 파동
+            noise = rng.uniform(-1, 1, size=20)  # 랜덤 노이즈
+            base_price = 100.0
+            prices = [base_price] + np.round(base_price + drift + wave + noise, 2).tolist()
+            self._price_paths[symbol] = prices
+        return list(prices)
     
-    def calculate_result(self, decision, symbol):
-        """의사결정 결과 계산"""
-        # 심볼별 기본 결과 (실제로는 더 복잡한 계산)
-        base_results = {
-            'buy': {'pnl5': 2.3, 'pnl20': 4.7, 'mdd': -1.2},
-            'hold': {'pnl5': 0.0, 'pnl20': 0.0, 'mdd': 0.0},
-            'sell': {'pnl5': -2.1, 'pnl20': -4.3, 'mdd': 0.0}
-        }
-        
-        # 심볼별 변동성 조정
-        volatility_multiplier = self._get_volatility_multiplier(symbol)
+    def get_simulation(self, symbol, seed=None):
+        """(심볼, 시드)별 몬테카를로 시뮬레이션 (최근 사용 순으로 SIMULATION_CACHE_SIZE개 보관)"""
+        seed = symbol_seed(symbol) if seed is None else int(seed)
+        key = (symbol, seed)
+        with self._lock:
+            simulation = self._simulations.get(key)
+            if simulation is not None:
+                self._simulations.move_to_end(key)
+                return simulation
         
-        result = base_results.get(decision, base_results['hold']).copy()
+        simulation = PriceSimulation(symbol, seed, self._get_volatility_multiplier(symbol))
+        with self._lock:
+            self._simulations[key] = simulation
+            while len(self._simulations) > SIMULATION_CACHE_SIZE:
+                self._simulations.popitem(last=False)
+        return simulation
+    
+    def calculate_result(self, decision, symbol, seed=None, outcome_seed=None):
+        """의사결정 결과 계산
+
+        시뮬레이션 경로 중 하나를 실현 경로로 뽑아 그 경로의 손익과 최대 낙폭을 결과로 하고,
+        경로 전체에 대한 기대 손익/승률/손익 구간은 distribution에 함께 담습니다.
+        실현 경로는 요청마다 outcome_seed로 만든 난수 생성기로 고르며, outcome_seed가 없으면 새로 뽑아
+        결과에 기록하므로 같은 seed와 outcome_seed로 결과를 재현할 수 있습니다.
+        """
+        simulation = self.get_simulation(symbol, seed)
+        if decision not in DECISION_EXPOSURE:
+            decision = 'hold'
+        outcome_seed = secrets.randbits(32) if outcome_seed is None else int(outcome_seed)
+        path = int(np.random.default_rng(outcome_seed).integers(simulation.paths.shape[0]))
+        summary = simulation.summary[decision]
         
-        # 변동성에 따른 결과 조정
-        for key in ['pnl5', 'pnl20', 'mdd']:
-            result[key] = round(result[key] * volatility_multiplier, 2)
+        result = simulation.realize(decision, path)
+        result['distribution'] = {**summary, 'pnl20_range': dict(summary['pnl20_range'])}
+        result['simulation'] = {'paths': simulation.paths.shape[0], 'steps': simulation.paths.shape[1] - 1,
+                                'seed': simulation.seed, 'outcome_seed': outcome_seed, 'path': path}
         
         # 추가 분석 정보
         result['analysis'] = self._generate_analysis(decision, result)
@@ -158,50 +296,12 @@ class PracticeService:
         return volatility_map.get(symbol, 1.0)
     
     def _generate_analysis(self, decision, result):
-        """결과 분석 생성"""
-        analyses = {
-            'buy': {
-                'positive': '매수 결정이 좋은 선택이었어요! 상승 모멘텀을 잘 포착했네요.',
-                'negative': '매수 타이밍이 아쉬웠어요. 더 낮은 가격에 진입할 기회를 놓쳤을 수 있어요.'
-            },
-            'hold': {
-                'neutral': '관망은 신중한 선택이었어요. 더 명확한 신호를 기다리는 것도 좋은 전략이에요.'
-            },
-            'sell': {
-                'positive': '매도 결정이 적절했어요! 하락 리스크를 피할 수 있었네요.',
-                'negative': '매도 타이밍이 아쉬웠어요. 더 높은 가격에 매도할 기회를 놓쳤을 수 있어요.'
-            }
-        }
-        
-        decision_analyses = analyses.get(decision, {})
-        
-        if decision == 'hold':
-            return decision_analyses.get('neutral', '관망은 신중한 선택이었어요.')
-        
-        # 수익률에 따른 분석
-        if result['pnl20'] > 0:
-            return decision_analyses.get('positive', '좋은 결정이었어요!')
-        else:
-            return decision_analyses.get('negative', '아쉬운 결과였어요.')
+        """결과 분석 생성 (성공 여부 = 실현 경로가 결정과 맞는 구간에 들었는지, 통계와 같은 기준)"""
+        return PRACTICE_ANALYSES[decision][result['success']]
     
     def _generate_recommendations(self, decision, result):
-        """개선 권장사항 생성"""
-        recommendations = []
-        
-        if decision == 'buy':
-            if result['pnl20'] > 0:
-                recommendations.append('매수 타이밍을 잘 포착했어요. 분할 매수를 고려해보세요.')
-            else:
-                recommendations.append('매수 전 더 신중한 분석이 필요했을 것 같아요.')
-        
-        elif decision == 'sell':
-            if result['pnl20'] < 0:
-                recommendations.append('매도 타이밍을 잘 포착했어요. 손절 기준을 명확히 하세요.')
-            else:
-                recommendations.append('매도 전 장기 관점을 고려해보세요.')
-        
-        else:  # hold
-            recommendations.append('관망 중에도 지속적인 모니터링이 필요해요.')
+        """개선 권장사항 생성 (분석과 같은 성공 기준)"""
+        recommendations = [PRACTICE_RECOMMENDATIONS[decision][result['success']]]
         
         # 일반적인 권장사항
         recommendations.extend([
@@ -213,27 +313,22 @@ class PracticeService:
         return recommendations
     
     def get_practice_statistics(self, user_id='default'):
-        """실습 통계 조회"""
-        # 실제 구현에서는 데이터베이스에서 조회
-        return {
-            'total_practices': random.randint(10, 50),
-            'success_rate': round(random.uniform(0.4, 0.8), 2),
-            'favorite_decision': random.choice(['buy', 'hold', 'sell']),
-            'best_performance': round(random.uniform(5, 15), 2),
-            'last_practice_date': (datetime.now() - timedelta(days=random.randint(1, 7))).strftime('%Y-%m-%d')
-        }
+        """실습 통계 조회 (누적 통계와 리더보드 순위)"""
+        stats = self.leaderboard.get_user(user_id) if self.leaderboard is not None else None
+        if stats is None:
+            return {
+                'user_id': user_id,
+                'total_practices': 0,
+                'success_rate': 0.0,
+                'favorite_decision': None,
+                'best_performance': None,
+                'last_practice_date': None,
+                'rank': None
+            }
+        return stats
     
     def get_leaderboard(self, limit=10):
         """리더보드 조회"""
-        # 실제 구현에서는 데이터베이스에서 조회
-        leaderboard = []
-        for i in range(limit):
-            leaderboard.append({
-                'rank': i + 1,
-                'user_id': f'user_{i+1}',
-                'success_rate': round(random.uniform(0.3, 0.9), 2),
-                'total_practices': random.randint(5, 100),
-                'best_performance': round(random.uniform(3, 20), 2)
-            })
-        
-        return leaderboard
+        if self.leaderboard is None:
+            return []
+        return self.leaderboard.top(limit)
@@ -1,8 +1,67 @@
+import json
+import math
+import os
 import random
+import threading
+import time
 from datetime import datetime
 
+# 시장 데이터 스냅샷 파일 (없으면 DEFAULT_MARKET_DATA 사용). 파일이 바뀌면 재시작 없이 다시 읽고,
+# 수정 시각을 버전으로 써서 워커 프로세스들이 같은 버전의 리포트를 만듦
+MARKET_DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'market_data.json')
+
+# 시장 데이터 파일 변경 확인 주기(초)
+RELOAD_CHECK_INTERVAL = 2.0
+
+DEFAULT_MARKET_DATA = {
+    'kospi': {'current': 2650, 'change': '+1.2%', 'trend': '상승'},
+    'nasdaq': {'current': 14500, 'change': '+0.8%', 'trend': '상승'},
+    'dollar': {'current': 1320, 'change': '-0.3%', 'trend': '하락'},
+    'vix': {'current': 18.5, 'change': '-2.1%', 'trend': '하락'}
+}
+
+# Agent별 라인 상세 내용 템플릿 ({line}: 기본 라인, 시장 데이터는 {kospi[current]} 형태로 참조)
+# 정의되지 않은 Agent는 standard 상세 내용을 사용
+LINE_DETAILS = {
+    'standard': {
+        1: "{line}\n   • 코스피: {kospi[current]} ({kospi[change]})\n   • 나스닥: {nasdaq[current]} ({nasdaq[change]})\n   • 달러/원: {dollar[current]} ({dollar[change]})",
+        2: "{line}\n   • PER: 주가수익비율, 기업의 수익성 대비 주가 평가\n   • ETF: 지수를 추종하는 거래소거래펀드\n   • 분산투자: 리스크 분산을 위한 여러 자산에 투자",
+        3: "{line}\n   • 목표비중: 포트폴리오에서 각 자산의 목표 비율\n   • 손절기준: 손실 한도를 미리 정하는 리스크 관리"
+    },
+    'growth': {
+        1: "{line}\n   • 반도체: AI 수요 증가로 강세 지속\n   • AI: ChatGPT 등 생성형 AI 관련주 주목\n   • 2차전지: 전기차 보급 확대로 수요 증가",
+        2: "{line}\n   • 이번 주 실적 발표: 삼성전자, SK하이닉스\n   • 신제품 런칭: 애플 Vision Pro 출시 예정\n   • 투자 컨퍼런스: 글로벌 테크 기업들 참여",
+        3: "{line}\n   • 단계적 진입: 큰 금액을 나누어 매수\n   • 분할 매수: 시간을 두고 여러 번 매수"
+    },
+    'dividend': {
+        1: "{line}\n   • 이번 주 배당락: 삼성전자, 현대차\n   • 배당 지급: SK텔레콤, KT\n   • 배당 수익률: 평균 2.5% 수준",
+        2: "{line}\n   • 10년 국채 금리: 3.2%\n   • 배당 수익률: 2.5%\n   • 스프레드: -0.7% (배당주 상대적 매력)",
+        3: "{line}\n   • 현금흐름 안정: 배당 지속성 높은 기업\n   • 분산 유지: 여러 배당주에 분산 투자"
+    }
+}
+
+def validate_market_data(market_data):
+    """시장 데이터 항목 검증 (current는 유한한 숫자, change/trend는 문자열), 잘못되면 ValueError
+
+    렌더링(시장 요약의 vix 비교, 템플릿 포맷)이 실패하지 않도록 기록하거나 교체하기 전에 확인
+    """
+    if not isinstance(market_data, dict):
+        raise ValueError('시장 데이터는 객체여야 합니다')
+    unknown = set(market_data) - set(DEFAULT_MARKET_DATA)
+    if unknown:
+        raise ValueError(f'알 수 없는 시장 데이터: {", ".join(sorted(unknown))}')
+    for key, value in market_data.items():
+        if not isinstance(value, dict) or not {'current', 'change', 'trend'} <= set(value):
+            raise ValueError(f'{key}에는 current, change, trend가 필요합니다')
+        current = value['current']
+        if isinstance(current, bool) or not isinstance(current, (int, float)) or not math.isfinite(current):
+            raise ValueError(f'{key}.current는 유한한 숫자여야 합니다')
+        for field in ('change', 'trend'):
+            if not isinstance(value[field], str):
+                raise ValueError(f'{key}.{field}는 문자열이어야 합니다')
+
 class ReportService:
-    def __init__(self):
+    def __init__(self, market_data_file=MARKET_DATA_FILE, reload_interval=RELOAD_CHECK_INTERVAL, history=None):
         self.report_templates = {
             'standard': [
                 '📈 오늘의 주요 지수 한눈에 - 코스피/나스닥/달러지수 등 시장 온도체크',
@@ -41,67 +100,141 @@ class ReportService:
             ]
         }
         
-        self.market_data = {
-            'kospi': {'current': 2650, 'change': '+1.2%', 'trend': '상승'},
-            'nasdaq': {'current': 14500, 'change': '+0.8%', 'trend': '상승'},
-            'dollar': {'current': 1320, 'change': '-0.3%', 'trend': '하락'},
-            'vix': {'current': 18.5, 'change': '-2.1%', 'trend': '하락'}
-        }
+        self.market_data_file = market_data_file
+        self.reload_interval = reload_interval
+        # 과거 리포트 조회 함수 (models.database.get_reports)
+        self.history = history
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.market_data = DEFAULT_MARKET_DATA
+        self.market_data_version = 0
+        self._rendered = {}
+        self._today = None
+        self._load_market_data()
+    
+    def _load_market_data(self):
+        """시장 데이터 파일을 읽어 스냅샷 교체 (파일 수정 시각이 버전, 버전이 바뀌면 렌더링 결과 폐기)"""
+        try:
+            version = os.stat(self.market_data_file).st_mtime_ns
+        except FileNotFoundError:
+            version, market_data = 0, DEFAULT_MARKET_DATA
+        else:
+            if version == self.market_data_version:
+                return
+            with open(self.market_data_file, encoding='utf-8') as f:
+                loaded = json.load(f)
+            # 직접 고친 파일도 검증해서, 잘못되었으면 기존 스냅샷을 유지 (_maybe_reload가 ValueError 처리)
+            validate_market_data(loaded)
+            market_data = {**DEFAULT_MARKET_DATA, **loaded}
+        with self._lock:
+            if version != self.market_data_version:
+                self.market_data = market_data
+                self.market_data_version = version
+                self._rendered = {}
     
-    def generate_report(self, agent_id='standard'):
-        """Agent별 맞춤 리포트 생성"""
-        base_lines = self.report_templates.get(agent_id, self.report_templates['standard'])
+    def _maybe_reload(self):
+        """reload_interval마다 시장 데이터 파일 변경 확인"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            self._load_market_data()
+        except (OSError, ValueError) as e:
+            # 잘못된 파일이면 기존 스냅샷으로 계속 응답
+            print(f"시장 데이터 파일을 다시 읽지 못했습니다: {e}")
+    
+    def update_market_data(self, market_data):
+        """시장 데이터 스냅샷 갱신 (파일에 기록하면 모든 워커 프로세스가 다음 확인 때 반영)"""
+        validate_market_data(market_data)
         
-        # 시장 데이터 기반으로 동적 내용 생성
-        enhanced_lines = []
-        for i, line in enumerate(base_lines, 1):
-            enhanced_line = self._enhance_line(line, agent_id, i)
-            enhanced_lines.append(enhanced_line)
+        snapshot = {**self.market_data, **market_data}
+        os.makedirs(os.path.dirname(self.market_data_file), exist_ok=True)
+        temp_path = f'{self.market_data_file}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.market_data_file)
+        self._load_market_data()
+        return self.get_market_data()
+    
+    def get_market_data(self):
+        """현재 시장 데이터 스냅샷과 버전"""
+        self._maybe_reload()
+        return {'market_data': self.market_data, 'version': self.market_data_version}
+    
+    def generate_report(self, agent_id='standard', on_render=None):
+        """Agent별 맞춤 리포트 생성
+
+        라인과 시장 요약은 (Agent, 시장 데이터 버전)별로 한 번만 만들어 보관하고,
+        새로 만들었을 때만 on_render(report)를 호출 (리포트 이력 저장용).
+        템플릿이 없는 agent_id는 standard로 처리하므로 보관 항목과 이력은 Agent 수만큼만 늘어남
+        """
+        self._maybe_reload()
+        agent_id = agent_id if agent_id in self.report_templates else 'standard'
+        key = (agent_id, self.market_data_version)
+        rendered = self._rendered.get(key)
+        created = rendered is None
+        if created:
+            rendered = self._render(agent_id)
+            with self._lock:
+                if key[1] == self.market_data_version:
+                    self._rendered[key] = rendered
         
-        return {
-            'lines': enhanced_lines,
+        report = {
+            'lines': list(rendered['lines']),
             'agent_id': agent_id,
-            'date': datetime.now().strftime('%Y년 %m월 %d일'),
-            'market_summary': self._get_market_summary()
+            'date': self._today_label(),
+            'market_summary': rendered['market_summary'],
+            'market_data_version': key[1]
         }
+        if created and on_render is not None:
+            on_render(report)
+        return report
     
-    def _enhance_line(self, line, agent_id, line_number):
-        """라인별 상세 내용 추가"""
-        enhancements = {
-            'standard': {
-                1: f"{line}\n   • 코스피: {self.market_data['kospi']['current']} ({self.market_data['kospi']['change']})\n   • 나스닥: {self.market_data['nasdaq']['current']} ({self.market_data['nasdaq']['change']})\n   • 달러/원: {self.market_data['dollar']['current']} ({self.market_data['dollar']['change']})",
-                2: f"{line}\n   • PER: 주가수익비율, 기업의 수익성 대비 주가 평가\n   • ETF: 지수를 추종하는 거래소거래펀드\n   • 분산투자: 리스크 분산을 위한 여러 자산에 투자",
-                3: f"{line}\n   • 목표비중: 포트폴리오에서 각 자산의 목표 비율\n   • 손절기준: 손실 한도를 미리 정하는 리스크 관리"
-            },
-            'growth': {
-                1: f"{line}\n   • 반도체: AI 수요 증가로 강세 지속\n   • AI: ChatGPT 등 생성형 AI 관련주 주목\n   • 2차전지: 전기차 보급 확대로 수요 증가",
-                2: f"{line}\n   • 이번 주 실적 발표: 삼성전자, SK하이닉스\n   • 신제품 런칭: 애플 Vision Pro 출시 예정\n   • 투자 컨퍼런스: 글로벌 테크 기업들 참여",
-                3: f"{line}\n   • 단계적 진입: 큰 금액을 나누어 매수\n   • 분할 매수: 시간을 두고 여러 번 매수"
-            },
-            'dividend': {
-                1: f"{line}\n   • 이번 주 배당락: 삼성전자, 현대차\n   • 배당 지급: SK텔레콤, KT\n   • 배당 수익률: 평균 2.5% 수준",
-                2: f"{line}\n   • 10년 국채 금리: 3.2%\n   • 배당 수익률: 2.5%\n   • 스프레드: -0.7% (배당주 상대적 매력)",
-                3: f"{line}\n   • 현금흐름 안정: 배당 지속성 높은 기업\n   • 분산 유지: 여러 배당주에 분산 투자"
-            }
-        }
+    def _today_label(self):
+        """리포트 날짜 표시 (날짜가 바뀔 때만 다시 포맷)"""
+        today = datetime.now().date()
+        if self._today is None or self._today[0] != today:
+            self._today = (today, today.strftime('%Y년 %m월 %d일'))
+        return self._today[1]
+    
+    def _render(self, agent_id):
+        """시장 데이터 기반으로 동적 내용 생성"""
+        base_lines = self.report_templates[agent_id]
+        details = LINE_DETAILS.get(agent_id, LINE_DETAILS['standard'])
+        market_data = self.market_data
+        
+        enhanced_lines = []
+        for i, line in enumerate(base_lines, 1):
+            template = details.get(i)
+            enhanced_lines.append(template.format(line=line, **market_data) if template else line)
         
-        agent_enhancements = enhancements.get(agent_id, enhancements['standard'])
-        return agent_enhancements.get(line_number, line)
+        return {'lines': tuple(enhanced_lines), 'market_summary': self._get_market_summary(market_data)}
     
-    def _get_market_summary(self):
+    def _get_market_summary(self, market_data=None):
         """시장 요약 정보"""
+        market_data = market_data or self.market_data
         return {
-            'kospi': self.market_data['kospi'],
-            'nasdaq': self.market_data['nasdaq'],
-            'dollar': self.market_data['dollar'],
-            'vix': self.market_data['vix'],
-            'sentiment': '중립' if self.market_data['vix']['current'] < 20 else '불안'
+            'kospi': market_data['kospi'],
+            'nasdaq': market_data['nasdaq'],
+            'dollar': market_data['dollar'],
+            'vix': market_data['vix'],
+            'sentiment': '중립' if market_data['vix']['current'] < 20 else '불안'
         }
     
     def get_historical_reports(self, agent_id=None, limit=10):
-        """과거 리포트 조회"""
-        # 실제 구현에서는 데이터베이스에서 조회
-        return []
+        """과거 리포트 조회 (reports 테이블, (agent_id, created_at) 인덱스 최신순)"""
+        if self.history is None:
+            return []
+        reports = []
+        for row in self.history(agent_id, limit):
+            reports.append({
+                'id': row['id'],
+                'agent_id': row['agent_id'],
+                'report': json.loads(row['content']),
+                'created_at': row['created_at']
+            })
+        return reports
     
     def get_report_statistics(self, agent_id=None):
         """리포트 통계"""
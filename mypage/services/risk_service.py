@@ -1,6 +1,93 @@
+import json
 import random
 import math
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from itertools import product
+
+import numpy as np
+
+# 기본 스트레스 시나리오 (시장 변동, 변동성 배수, 금리 변동 %p)
+DEFAULT_SCENARIOS = [
+    {'id': 'market_crash', 'name': '시장 급락 (-20%)', 'market': -0.20, 'volatility': 1.0, 'rate': 0.0},
+    {'id': 'volatility_spike', 'name': '변동성 급증 (VIX 30+)', 'market': 0.0, 'volatility': 1.5, 'rate': 0.0},
+    {'id': 'interest_rate_hike', 'name': '금리 인상 (+2%)', 'market': 0.0, 'volatility': 1.0, 'rate': 2.0}
+]
+
+# 금리 1%p 변동당 베타 1 기준 가격 민감도 (금리 +2%p → 베타 × 10% 하락)
+RATE_SENSITIVITY = 0.05
+
+# 한 번에 평가할 수 있는 최대 시나리오 수 / 사용자 정의 포트폴리오 수
+MAX_SCENARIOS = 10000
+MAX_PORTFOLIOS = 1000
+
+# (프로필 버전, 포트폴리오, 시나리오 집합)별 결과 보관 개수
+STRESS_CACHE_SIZE = 128
+
+# 프로필 행렬 열 순서
+PROFILE_FIELDS = ('beta', 'volatility')
+
+class ScenarioMatrix:
+    """N개 시나리오 × M개 프로필 스트레스 결과 (한 번의 NumPy 브로드캐스팅으로 계산)
+
+    - expected_return: 시장 충격 × 베타 - 금리 변동 × 금리 민감도 × 베타 (%)
+    - stressed_volatility: 변동성 × 변동성 배수 (%)
+    - var_95: 기대 손익 - 1.645 × 충격 후 변동성 (%)
+    """
+
+    def __init__(self, scenarios, profiles):
+        market, vol_multiplier, rate = (scenarios[:, i:i + 1] for i in range(3))
+        beta, volatility = profiles[:, 0], profiles[:, 1]
+        self.expected_return = (market * beta - rate * RATE_SENSITIVITY * beta) * 100
+        self.stressed_volatility = vol_multiplier * volatility * 100
+        self.var_95 = self.expected_return - 1.645 * self.stressed_volatility
+
+    def to_dict(self, scenario_ids, profile_ids):
+        worst = self.var_95.argmin(axis=0)
+        return {
+            'profiles': profile_ids,
+            'scenarios': scenario_ids,
+            'expected_return': np.round(self.expected_return, 2).tolist(),
+            'stressed_volatility': np.round(self.stressed_volatility, 2).tolist(),
+            'var_95': np.round(self.var_95, 2).tolist(),
+            'worst_scenario': {
+                profile_id: {'scenario': scenario_ids[index], 'var_95': round(float(self.var_95[index, column]), 2)}
+                for column, (profile_id, index) in enumerate(zip(profile_ids, worst.tolist()))
+            }
+        }
+
+def _scenario_array(scenarios=None, grid=None):
+    """시나리오 목록 또는 격자({'market': [...], 'volatility': [...], 'rate': [...]})를 (N, 3) 배열로 변환"""
+    if grid is not None:
+        if not isinstance(grid, dict):
+            raise ValueError('grid는 {"market": [...], "volatility": [...], "rate": [...]} 형태의 객체여야 합니다')
+        axes = [grid.get('market', [0.0]), grid.get('volatility', [1.0]), grid.get('rate', [0.0])]
+        if not all(isinstance(axis, list) and axis for axis in axes):
+            raise ValueError('grid의 각 축은 비어 있지 않은 숫자 목록이어야 합니다')
+        count = len(axes[0]) * len(axes[1]) * len(axes[2])
+        if count > MAX_SCENARIOS:
+            raise ValueError(f'시나리오는 최대 {MAX_SCENARIOS}개까지 평가할 수 있습니다')
+        rows = list(product(*axes))
+    else:
+        scenarios = DEFAULT_SCENARIOS if scenarios is None else scenarios
+        if not isinstance(scenarios, list) or not scenarios or len(scenarios) > MAX_SCENARIOS:
+            raise ValueError(f'scenarios는 1~{MAX_SCENARIOS}개의 시나리오 목록이어야 합니다')
+        if not all(isinstance(item, dict) for item in scenarios):
+            raise ValueError('scenarios의 각 항목은 {"id", "market", "volatility", "rate"} 객체여야 합니다')
+        rows = [(item.get('market', 0.0), item.get('volatility', 1.0), item.get('rate', 0.0)) for item in scenarios]
+    try:
+        array = np.asarray(rows, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError('시나리오 값은 숫자여야 합니다')
+    if not np.isfinite(array).all():
+        raise ValueError('시나리오 값은 유한한 숫자여야 합니다')
+    # 격자 시나리오 id는 숫자로 변환한 값으로 만듦
+    if grid is not None:
+        ids = [f'market={m:g},volatility={v:g},rate={r:g}' for m, v, r in array.tolist()]
+    else:
+        ids = [item.get('id') or f'scenario_{i}' for i, item in enumerate(scenarios)]
+    return ids, array
 
 class RiskService:
     def __init__(self):
@@ -55,10 +142,84 @@ class RiskService:
                 'risk_level': '보통'
             }
         }
+        self._lock = threading.Lock()
+        self._stress_cache = OrderedDict()
+        self._rebuild_profile_matrix()
+    
+    def _rebuild_profile_matrix(self):
+        """프로필을 (M, 2) 행렬로 만들고 버전 증가 (프로필이 바뀌면 이전 스트레스 결과는 쓰이지 않음)"""
+        self.profile_ids = list(self.risk_profiles.keys())
+        self.profile_index = {agent_id: i for i, agent_id in enumerate(self.profile_ids)}
+        self.profile_matrix = np.array([[self.risk_profiles[agent_id][field] for field in PROFILE_FIELDS]
+                                        for agent_id in self.profile_ids], dtype=np.float64)
+        self.profile_version = getattr(self, 'profile_version', 0) + 1
+    
+    def update_risk_profile(self, agent_id, **fields):
+        """Agent 리스크 프로필 수정 (없으면 standard를 기준으로 추가)"""
+        with self._lock:
+            base = self.risk_profiles.get(agent_id, self.risk_profiles['standard'])
+            self.risk_profiles[agent_id] = {**base, **fields}
+            self._rebuild_profile_matrix()
+        return self.risk_profiles[agent_id]
+    
+    def stress_test(self, agent_ids=None, portfolios=None, scenarios=None, grid=None):
+        """시나리오 N개 × 프로필/포트폴리오 M개 스트레스 테스트
+
+        agent_ids(기본: 전체 Agent)와 사용자 정의 portfolios([{'id', 'beta', 'volatility'}])를 함께 평가하고,
+        결과는 (프로필 버전, 포트폴리오, 시나리오 집합)별로 보관
+        """
+        # 같은 요청이면 시나리오 배열을 다시 만들지 않도록 입력 그대로 키를 만듦
+        try:
+            scenario_key = json.dumps([scenarios, grid], sort_keys=True)
+        except (TypeError, ValueError):
+            raise ValueError('시나리오는 JSON 값이어야 합니다')
+        
+        with self._lock:
+            version, matrix, index = self.profile_version, self.profile_matrix, self.profile_index
+        if agent_ids is not None and not (isinstance(agent_ids, list)
+                                          and all(isinstance(agent_id, str) for agent_id in agent_ids)):
+            raise ValueError('agent_ids는 Agent ID(문자열) 목록이어야 합니다')
+        if portfolios is not None and not (isinstance(portfolios, list)
+                                           and all(isinstance(item, dict) for item in portfolios)):
+            raise ValueError('portfolios는 {"id", "beta", "volatility"} 객체 목록이어야 합니다')
+        agent_ids = list(index) if agent_ids is None and not portfolios else list(agent_ids or [])
+        unknown = [agent_id for agent_id in agent_ids if agent_id not in index]
+        if unknown:
+            raise ValueError(f'알 수 없는 Agent: {", ".join(map(str, unknown))}')
+        
+        portfolios = portfolios or []
+        if len(portfolios) > MAX_PORTFOLIOS:
+            raise ValueError(f'포트폴리오는 최대 {MAX_PORTFOLIOS}개까지 평가할 수 있습니다')
+        try:
+            custom = np.array([[item[field] for field in PROFILE_FIELDS] for item in portfolios],
+                              dtype=np.float64).reshape(-1, len(PROFILE_FIELDS))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('portfolios의 각 항목에는 숫자 beta, volatility가 필요합니다')
+        profile_ids = agent_ids + [str(item.get('id', f'portfolio_{i}')) for i, item in enumerate(portfolios)]
+        if not profile_ids:
+            raise ValueError('평가할 Agent 또는 포트폴리오가 없습니다')
+        
+        key = (version, tuple(profile_ids), custom.tobytes(), scenario_key)
+        with self._lock:
+            cached = self._stress_cache.get(key)
+            if cached is not None:
+                self._stress_cache.move_to_end(key)
+                return cached
+        
+        scenario_ids, scenario_array = _scenario_array(scenarios, grid)
+        profiles = np.vstack([matrix[[index[agent_id] for agent_id in agent_ids]], custom])
+        result = ScenarioMatrix(scenario_array, profiles).to_dict(scenario_ids, profile_ids)
+        result['profile_version'] = version
+        with self._lock:
+            self._stress_cache[key] = result
+            while len(self._stress_cache) > STRESS_CACHE_SIZE:
+                self._stress_cache.popitem(last=False)
+        return result
     
     def analyze_risk(self, agent_id='standard'):
         """리스크 분석 수행"""
-        profile = self.risk_profiles.get(agent_id, self.risk_profiles['standard'])
+        agent_key = agent_id if agent_id in self.risk_profiles else 'standard'
+        profile = self.risk_profiles[agent_key]
         
         # 현재 시장 상황 반영
         market_conditions = self._get_market_conditions()
@@ -74,7 +235,7 @@ class RiskService:
             'drawdown_analysis': self._analyze_drawdown(profile, market_conditions),
             'risk_return_analysis': self._analyze_risk_return(profile, market_conditions),
             'recommendations': self._generate_recommendations(profile, market_conditions),
-            'stress_test': self._perform_stress_test(profile),
+            'stress_test': self._perform_stress_test(agent_key),
             'metrics': risk_metrics,
             'market_conditions': market_conditions,
             'timestamp': datetime.now().isoformat()
@@ -282,25 +443,26 @@ class RiskService:
         
         return recommendations
     
-    def _perform_stress_test(self, profile):
-        """스트레스 테스트 수행"""
-        stress_scenarios = {
-            'market_crash': {
-                'scenario': '시장 급락 (-20%)',
-                'impact': round(profile['beta'] * 0.2 * 100, 1),
-                'description': f'시장이 20% 급락할 경우 약 {profile["beta"] * 0.2 * 100:.1f}% 하락 예상'
-            },
-            'volatility_spike': {
-                'scenario': '변동성 급증 (VIX 30+)',
-                'impact': round(profile['volatility'] * 1.5 * 100, 1),
-                'description': f'변동성이 급증할 경우 일일 변동성 {profile["volatility"] * 1.5 * 100:.1f}% 예상'
-            },
-            'interest_rate_hike': {
-                'scenario': '금리 인상 (+2%)',
-                'impact': round(profile['beta'] * 0.1 * 100, 1),
-                'description': f'금리가 2% 인상될 경우 약 {profile["beta"] * 0.1 * 100:.1f}% 하락 예상'
+    def _perform_stress_test(self, agent_id):
+        """스트레스 테스트 수행 (기본 시나리오 × 전체 Agent 결과에서 해당 Agent 열)"""
+        result = self.stress_test()
+        column = result['profiles'].index(agent_id)
+        stress_scenarios = {}
+        for row, scenario in enumerate(DEFAULT_SCENARIOS):
+            if scenario['volatility'] != 1.0:
+                impact = result['stressed_volatility'][row][column]
+                description = f'변동성이 급증할 경우 일일 변동성 {impact:.1f}% 예상'
+            else:
+                impact = round(-result['expected_return'][row][column], 1)
+                if scenario['rate']:
+                    description = f'금리가 {scenario["rate"]:g}% 인상될 경우 약 {impact:.1f}% 하락 예상'
+                else:
+                    description = f'시장이 {-scenario["market"] * 100:g}% 급락할 경우 약 {impact:.1f}% 하락 예상'
+            stress_scenarios[scenario['id']] = {
+                'scenario': scenario['name'],
+                'impact': round(impact, 1),
+                'description': description
             }
-        }
         
         return stress_scenarios
     
@@ -309,16 +471,8 @@ class RiskService:
         if agent_ids is None:
             agent_ids = list(self.risk_profiles.keys())
         
-        comparison = {}
-        for agent_id in agent_ids:
-            if agent_id in self.risk_profiles:
-                profile = self.risk_profiles[agent_id]
-                comparison[agent_id] = {
-                    'volatility': profile['volatility'],
-                    'max_drawdown': profile['max_drawdown'],
-                    'sharpe_ratio': profile['sharpe_ratio'],
-                    'beta': profile['beta'],
-                    'risk_level': profile['risk_level']
-                }
-        
-        return comparison
+        fields = ('volatility', 'max_drawdown', 'sharpe_ratio', 'beta', 'risk_level')
+        return {
+            agent_id: {field: self.risk_profiles[agent_id][field] for field in fields}
+            for agent_id in agent_ids if agent_id in self.risk_profiles
+        }
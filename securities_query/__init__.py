@@ -0,0 +1,27 @@
+"""
+증권서비스 공통 조회 엔진 패키지
+user/api, hackathon_2025_project/03_api_services의 Flask 앱들이 함께 사용
+"""
+
+from .cache import QueryResultCache
+from .cohorts import COHORT_DIMENSIONS, CohortRollups
+from .connection import SQLiteConnectionManager
+from .engine import DEFAULT_DAYS, SecuritiesQueryEngine
+from .response_cache import ResponseCache
+from .risk import RISK_INPUT_TABLES, RiskScoreService
+from .versions import DataVersionTracker
+from .routes import create_securities_blueprint
+
+__all__ = [
+    'COHORT_DIMENSIONS',
+    'CohortRollups',
+    'DEFAULT_DAYS',
+    'DataVersionTracker',
+    'QueryResultCache',
+    'RISK_INPUT_TABLES',
+    'ResponseCache',
+    'RiskScoreService',
+    'SQLiteConnectionManager',
+    'SecuritiesQueryEngine',
+    'create_securities_blueprint'
+]
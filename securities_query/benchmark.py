@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+공통 조회 엔진 벤치마크
+합성 데이터베이스 하나를 만들어 세 Flask 앱(user, hackathon 기본, hackathon 웹)에 같은 요청을 보내고
+라우트별 지연 시간(p50/p95)과 처리량을 캐시 사용/미사용으로 나누어 보고하고,
+ETag 조건부 요청으로 대시보드를 다시 불러올 때 SQL 조회가 생략되는지 확인
+
+실행: python -m securities_query.benchmark --users 2000 --requests 200
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APPS = {
+    'user': os.path.join(REPO_ROOT, 'user', 'api', 'securities_data_api.py'),
+    'hackathon': os.path.join(REPO_ROOT, 'hackathon_2025_project', '03_api_services', 'securities_data_api.py'),
+    'hackathon_web': os.path.join(REPO_ROOT, 'hackathon_2025_project', '03_api_services', 'securities_data_api_web.py')
+}
+
+ROUTES = [
+    '/api/users/{user_id}',
+    '/api/users/{user_id}/trades',
+    '/api/users/{user_id}/behaviors',
+    '/api/users/{user_id}/watchlist',
+    '/api/users/{user_id}/trading-summary',
+    '/api/users/{user_id}/usage-summary',
+    '/api/users/{user_id}/investment-profile',
+    '/api/users/{user_id}/risk-profile',
+    '/api/users/{user_id}/behavior-pattern',
+]
+
+ACTIONS = ['app_visit', 'stock_detail_view', 'news_exploration', 'community_exploration', 'chart_analysis']
+SYMBOLS = [('005930', 'KR'), ('000660', 'KR'), ('035420', 'KR'), ('AAPL', 'US'), ('TSLA', 'US'), ('NVDA', 'US')]
+
+def build_database(db_path: str, num_users: int, seed: int = 42) -> List[str]:
+    """다섯 개 테이블을 모두 갖춘 합성 데이터베이스 생성, 사용자 ID 목록 반환"""
+    from .engine import SCHEMA, TABLES
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    conn = sqlite3.connect(db_path)
+    for table in TABLES:
+        conn.execute(SCHEMA[table])
+
+    user_ids = [f"user_{i:05d}" for i in range(1, num_users + 1)]
+    conn.executemany('INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+        (uid, (now - timedelta(days=rng.randint(30, 900))).strftime('%Y-%m-%d'), rng.choice('ABCD'),
+         rng.choice(['20대', '30대', '40대', '50대']), rng.choice('MF'), rng.randint(0, 120),
+         rng.choice([500, 1000, 5000, 10000]), now.isoformat())
+        for uid in user_ids
+    ))
+
+    def moment(max_days: int) -> datetime:
+        return now - timedelta(days=rng.randint(0, max_days), minutes=rng.randint(0, 1439))
+
+    trades, behaviors, watchlists, balances = [], [], [], []
+    for uid in user_ids:
+        for _ in range(rng.randint(0, 60)):
+            at = moment(180)
+            symbol, market = rng.choice(SYMBOLS)
+            amount = rng.randint(100000, 5000000)
+            trades.append((uid, at.strftime('%Y-%m-%d'), rng.choice(['buy', 'sell']), market, symbol,
+                           rng.randint(1, 50), amount / 10, amount, amount * 0.00015,
+                           rng.randint(-300000, 300000), at.isoformat()))
+        for _ in range(rng.randint(0, 120)):
+            at = moment(60)
+            behaviors.append((uid, at.strftime('%Y-%m-%d'), rng.choice(ACTIONS), '', rng.randint(1, 30),
+                              at.isoformat()))
+        for symbol, market in rng.sample(SYMBOLS, rng.randint(0, len(SYMBOLS))):
+            watchlists.append((uid, symbol, market, now.strftime('%Y-%m-%d'), now.isoformat()))
+        for day in range(0, 30, 3):
+            date = (now - timedelta(days=day)).strftime('%Y-%m-%d')
+            balances.append((uid, date, 1000000.0, 2000000.0, 3000000.0, date))
+
+    conn.executemany('''INSERT INTO trades (user_id, trade_date, trade_type, market, stock_symbol, quantity, price,
+                        trade_amount, commission, profit_loss, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', trades)
+    conn.executemany('''INSERT INTO app_behaviors (user_id, date, action_type, action_detail, duration_minutes, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?)''', behaviors)
+    conn.executemany('''INSERT INTO watchlists (user_id, stock_symbol, market, add_date, created_at)
+                        VALUES (?, ?, ?, ?, ?)''', watchlists)
+    conn.executemany('''INSERT INTO account_balances (user_id, date, cash_balance, invested_amount, total_assets, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?)''', balances)
+    conn.commit()
+    conn.close()
+    return user_ids
+
+def load_app(name: str, path: str):
+    """앱 모듈을 파일 경로로 불러옴 (모듈 이름이 겹치지 않도록 별칭 사용)"""
+    app_dir = os.path.dirname(path)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    spec = importlib.util.spec_from_file_location(f"benchmark_app_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def measure(client, routes: List[str], user_ids: List[str], requests: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """라우트별 지연 시간(ms) 측정"""
+    rng = random.Random(seed)
+    # 캐시 효과를 보기 위해 일부 사용자에게 요청이 반복되도록 표본 사용자 집합을 제한
+    hot_users = rng.sample(user_ids, min(len(user_ids), max(10, requests // 5)))
+    results = {}
+    for route in routes:
+        latencies = []
+        for _ in range(requests):
+            url = route.format(user_id=rng.choice(hot_users))
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        latencies.sort()
+        results[route] = {
+            'p50_ms': statistics.median(latencies),
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+            'rps': len(latencies) / (sum(latencies) / 1000)
+        }
+    return results
+
+DASHBOARD_ROUTES = [
+    '/api/users/{user_id}',
+    '/api/users/{user_id}/watchlist',
+    '/api/users/{user_id}/trading-summary',
+    '/api/users/{user_id}/usage-summary',
+    '/api/users/{user_id}/investment-profile',
+]
+
+def measure_dashboard_reload(client, engine, user_ids: List[str], users: int) -> Dict[str, float]:
+    """대시보드 첫 로드 후 ETag로 재방문할 때의 지연 시간과 SQL 조회 수 비교"""
+    sample = user_ids[:users]
+    etags = {}
+
+    def load(conditional: bool):
+        reads_before = engine.db.stats['reads']
+        started = time.perf_counter()
+        not_modified = 0
+        for user_id in sample:
+            for route in DASHBOARD_ROUTES:
+                url = route.format(user_id=user_id)
+                headers = {'If-None-Match': etags[url]} if conditional and url in etags else {}
+                response = client.get(url, headers=headers)
+                if response.status_code == 304:
+                    not_modified += 1
+                elif response.headers.get('ETag'):
+                    etags[url] = response.headers['ETag']
+        return {
+            'ms_per_dashboard': (time.perf_counter() - started) * 1000 / len(sample),
+            'sql_reads': engine.db.stats['reads'] - reads_before,
+            'not_modified': not_modified
+        }
+
+    return {'first': load(False), 'reload': load(True)}
+
+def main():
+    parser = argparse.ArgumentParser(description='증권서비스 공통 조회 엔진 벤치마크')
+    parser.add_argument('--users', type=int, default=2000, help='합성 사용자 수')
+    parser.add_argument('--requests', type=int, default=200, help='라우트당 요청 수')
+    parser.add_argument('--apps', nargs='*', default=list(APPS), choices=list(APPS), help='측정할 앱')
+    args = parser.parse_args()
+
+    print("=== 증권서비스 공통 조회 엔진 벤치마크 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'benchmark.db')
+        started = time.perf_counter()
+        user_ids = build_database(db_path, args.users)
+        print(f"합성 데이터: {args.users:,}명 ({time.perf_counter() - started:.1f}초)\n")
+        os.environ['SECURITIES_DB_PATH'] = db_path
+
+        for name in args.apps:
+            module = load_app(name, APPS[name])
+            client = module.app.test_client()
+            engine = module.api
+
+            print(f"[{name}] {os.path.relpath(APPS[name], REPO_ROOT)}")
+            print(f"   {'route':<42} {'cache off p50/p95 (ms)':>24} {'cache on p50/p95 (ms)':>24} {'speedup':>8}")
+            response_cache = module.app.blueprints['securities'].response_cache
+            engine.cache.enabled = response_cache.enabled = False
+            cold = measure(client, ROUTES, user_ids, args.requests, seed=1)
+            engine.cache.enabled = response_cache.enabled = True
+            engine.cache.clear()
+            response_cache.clear()
+            warm = measure(client, ROUTES, user_ids, args.requests, seed=1)
+            for route in ROUTES:
+                c, w = cold[route], warm[route]
+                print(f"   {route:<42} {c['p50_ms']:>11.2f} / {c['p95_ms']:>8.2f} "
+                      f"{w['p50_ms']:>11.2f} / {w['p95_ms']:>8.2f} {c['p50_ms'] / w['p50_ms']:>7.1f}x")
+            total_cold = sum(r['p50_ms'] for r in cold.values())
+            total_warm = sum(r['p50_ms'] for r in warm.values())
+            print(f"   p50 합계: 캐시 미사용 {total_cold:.1f}ms / 캐시 사용 {total_warm:.1f}ms")
+            print(f"   결과 캐시 적중률: {engine.cache.get_stats()['hit_rate']}, "
+                  f"응답 캐시 적중률: {response_cache.get_stats()['hit_rate']}")
+
+            response_cache.clear()
+            engine.cache.clear()
+            dashboard = measure_dashboard_reload(client, engine, user_ids[-50:], 50)
+            first, reload = dashboard['first'], dashboard['reload']
+            print(f"   대시보드({len(DASHBOARD_ROUTES)}개 요청) 첫 로드: {first['ms_per_dashboard']:.2f}ms, SQL 조회 {first['sql_reads']}회")
+            print(f"   대시보드 재방문(ETag): {reload['ms_per_dashboard']:.2f}ms, SQL 조회 {reload['sql_reads']}회, "
+                  f"304 응답 {reload['not_modified']}건\n")
+            engine.close()
+
+    print("=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
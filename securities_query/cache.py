@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+조회 결과 캐시 - 같은 인자의 조회를 TTL 동안 재사용
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+class QueryResultCache:
+    """TTL + LRU 용량 제한 조회 결과 캐시
+
+    반환된 결과는 캐시와 공유되므로 호출 측에서 수정하면 안 됩니다.
+    데이터 적재 등 쓰기가 일어나면 clear()로 전체 무효화합니다.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """캐시에 있으면 반환하고, 없으면 계산해서 저장"""
+        if not self.enabled:
+            return compute()
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+
+        # 계산은 잠금 밖에서 수행 (같은 키를 동시에 계산할 수 있으나 결과는 동일)
+        value = compute()
+        with self.lock:
+            self.entries[key] = (now + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return value
+
+    def clear(self):
+        """전체 무효화"""
+        with self.lock:
+            self.entries.clear()
+            self.stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중률 및 용량 통계"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            }
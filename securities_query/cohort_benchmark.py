@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+코호트 분석 벤치마크
+1) 합성 데이터베이스에서 코호트 집계 전체 재구성 시간, 기록(ingest) 시 증분 반영 지연 시간을 재고
+   증분 반영 결과가 전체 재구성 결과와 같은지 확인
+2) 사용자 집계(user_rollup)를 대규모(기본 100만 명)로 만들어 코호트 조회 지연 시간을
+   사용자 집계 테이블에 직접 윈도 함수를 실행하는 방식과 비교
+
+실행: python -m securities_query.cohort_benchmark --users 5000 --scale 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from .benchmark import build_database
+from .cohorts import COHORT_DIMENSIONS, ROLLUP_COLUMNS, USAGE_EDGES, FREQUENCY_EDGES, PNL_EDGES
+from .engine import SecuritiesQueryEngine
+
+# 비교용: 사전 집계 없이 사용자 집계 테이블에서 바로 손익 백분위수를 구하는 쿼리
+DIRECT_PERCENTILE_SQL = '''
+    WITH ranked AS (
+        SELECT {column} AS cohort, total_profit_loss AS value,
+               ROW_NUMBER() OVER (PARTITION BY {column} ORDER BY total_profit_loss) AS rn,
+               COUNT(*) OVER (PARTITION BY {column}) AS n
+        FROM user_rollup WHERE trade_count > 0
+    )
+    SELECT cohort, n,
+           MIN(CASE WHEN rn >= 0.10 * n THEN value END), MIN(CASE WHEN rn >= 0.25 * n THEN value END),
+           MIN(CASE WHEN rn >= 0.50 * n THEN value END), MIN(CASE WHEN rn >= 0.75 * n THEN value END),
+           MIN(CASE WHEN rn >= 0.90 * n THEN value END)
+    FROM ranked GROUP BY cohort
+'''
+
+MBTI_TYPES = ['SCHG', 'SCHV', 'SCLG', 'SCLV', 'SWHG', 'SWHV', 'SWLG', 'SWLV',
+              'LCHG', 'LCHV', 'LCLG', 'LCLV', 'LWHG', 'LWHV', 'LWLG', 'LWLV']
+
+def _bucket(value: float, edges) -> int:
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+def snapshot(engine: SecuritiesQueryEngine) -> dict:
+    with engine.db.read() as conn:
+        return {tuple(row[:4]): (row[4], round(row[5], 4))
+                for row in conn.execute('SELECT * FROM cohort_rollup') if row[4] or row[5]}
+
+def check_incremental(users: int, ingests: int):
+    """증분 반영 지연 시간과 전체 재구성 결과 일치 여부"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cohort.db')
+        user_ids = build_database(db_path, users)
+        engine = SecuritiesQueryEngine(db_path, init_schema=False)
+        started = time.perf_counter()
+        engine.init_database()
+        print(f"[1] 합성 데이터 {users:,}명, 코호트 집계 최초 구성(스키마 포함): {time.perf_counter() - started:.2f}초")
+
+        rng = random.Random(7)
+        latencies = []
+        for _ in range(ingests):
+            user_id = rng.choice(user_ids)
+            started = time.perf_counter()
+            engine.ingest_trades([{'user_id': user_id, 'market': rng.choice(['KR', 'US']),
+                                   'profit_loss': rng.randint(-900000, 900000), 'trade_amount': 100000}])
+            latencies.append((time.perf_counter() - started) * 1000)
+        incremental = snapshot(engine)
+        started = time.perf_counter()
+        engine.refresh_cohort_rollups()
+        rebuild_seconds = time.perf_counter() - started
+        latencies.sort()
+        print(f"    거래 기록 {ingests}건 (증분 반영 포함): p50 {statistics.median(latencies):.2f}ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f}ms")
+        print(f"    전체 재구성: {rebuild_seconds:.2f}초, 증분 결과 == 재구성 결과: {incremental == snapshot(engine)}")
+        engine.close()
+
+def measure_scale(scale: int, repeat: int, direct: bool):
+    """대규모 사용자 집계에서 코호트 조회 지연 시간"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cohort_scale.db')
+        engine = SecuritiesQueryEngine(db_path)
+        engine.cache.enabled = False
+        rng = random.Random(11)
+        started = time.perf_counter()
+
+        def rows():
+            for i in range(scale):
+                trade_count = max(0, int(rng.expovariate(1 / 20)))
+                pnl = rng.gauss(0, 600000) * (trade_count > 0)
+                korea = rng.randint(0, trade_count)
+                active_days = rng.randint(0, 60)
+                minutes = active_days * rng.expovariate(1 / 25)
+                yield (f"user_{i:07d}", rng.choice('ABCD'), rng.choice(['20대', '30대', '40대', '50대']),
+                       rng.choice(MBTI_TYPES), trade_count, pnl, korea, trade_count - korea, minutes, active_days,
+                       _bucket(pnl, PNL_EDGES), _bucket(trade_count, FREQUENCY_EDGES),
+                       0 if active_days == 0 else 1 + _bucket(minutes / active_days, USAGE_EDGES))
+
+        with engine.db.write() as conn:
+            conn.executemany(f"INSERT INTO user_rollup ({', '.join(ROLLUP_COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})", rows())
+            generated = time.perf_counter()
+            engine.cohorts.rebuild_cohorts(conn)
+        print(f"\n[2] 사용자 집계 {scale:,}명 생성 {generated - started:.1f}초, "
+              f"코호트 집계 재구성 {time.perf_counter() - generated:.1f}초")
+
+        print(f"    {'dimension':<10} {'rollup p50 (ms)':>16} {'cohorts':>8}" + (f" {'direct SQL (ms)':>16}" if direct else ''))
+        for dimension, column in COHORT_DIMENSIONS.items():
+            latencies = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = engine.get_cohort_analytics(dimension)
+                latencies.append((time.perf_counter() - started) * 1000)
+            line = f"    {dimension:<10} {statistics.median(latencies):>16.2f} {len(result['cohorts']):>8}"
+            if direct:
+                started = time.perf_counter()
+                with engine.db.read() as conn:
+                    conn.execute(DIRECT_PERCENTILE_SQL.format(column=column)).fetchall()
+                line += f" {(time.perf_counter() - started) * 1000:>16.0f}"
+            print(line)
+        engine.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='코호트 분석 벤치마크')
+    parser.add_argument('--users', type=int, default=5000, help='증분 반영 확인용 합성 사용자 수')
+    parser.add_argument('--ingests', type=int, default=200, help='증분 반영을 측정할 거래 기록 수')
+    parser.add_argument('--scale', type=int, default=1000000, help='코호트 조회 측정용 사용자 집계 행 수')
+    parser.add_argument('--repeat', type=int, default=20, help='코호트 조회 반복 횟수')
+    parser.add_argument('--skip-direct', action='store_true', help='윈도 함수 직접 계산 비교 생략')
+    args = parser.parse_args()
+
+    print("=== 코호트 분석 벤치마크 ===\n")
+    check_incremental(args.users, args.ingests)
+    measure_scale(args.scale, args.repeat, not args.skip_direct)
+    print("\n=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
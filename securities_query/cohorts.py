@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+코호트(등급/연령대/MBTI 유형) 분석용 사전 집계
+- user_rollup: 사용자별 누적 집계(거래 수, 손익 합계, 시장별 거래 수, 앱 사용 시간)와 구간 번호
+  (앱 사용 시간은 behavior_daily_rollup에서 읽으므로 행동 집계가 먼저 갱신되어 있어야 함)
+- cohort_rollup: (차원, 코호트, 지표, 구간)별 사용자 수와 합계
+CSV 적재 시 집합 SQL로 전체를 다시 만들고, 거래/행동 기록 시에는 해당 사용자의
+이전/새 집계 차이만 cohort_rollup에 더해 사용자 수와 무관하게 코호트 조회가 끝나도록 함
+"""
+
+import json
+import sqlite3
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# API 차원 이름 -> user_rollup 컬럼
+COHORT_DIMENSIONS = {
+    'grade': 'grade',
+    'age_group': 'age_group',
+    'mbti': 'mbti_type'
+}
+
+# 손익 합계 구간 경계 (원). 백분위수는 구간 안에서 선형 보간
+PNL_EDGES = [-10000000, -5000000, -2000000, -1000000, -500000, -200000, -100000, -50000, -20000, -10000, 0,
+             10000, 20000, 50000, 100000, 200000, 500000, 1000000, 2000000, 5000000, 10000000]
+# 거래 수 구간: 0 / 1-5 / 6-20 / 21-50 / 51+
+FREQUENCY_EDGES = [1, 6, 21, 51]
+FREQUENCY_LABELS = ['0', '1-5', '6-20', '21-50', '51+']
+# 활동일당 평균 사용 시간(분) 구간. 실제 데이터(user/data, 1,000명)의 사분위수(약 88/96/104분)에 맞춰
+# light/moderate/heavy/intense가 각각 1/4 정도가 되도록 정함
+USAGE_EDGES = [85, 95, 105]
+USAGE_LABELS = ['none', 'light', 'moderate', 'heavy', 'intense']
+# 거래 데이터의 시장 코드 (국내 KR, 해외 US)
+MARKETS = ['KR', 'US']
+PERCENTILES = [10, 25, 50, 75, 90]
+
+def _bucket_case(expression: str, edges: List[float]) -> str:
+    """값이 속한 구간 번호(0..len(edges))를 구하는 CASE 식"""
+    whens = ' '.join(f'WHEN {expression} < {edge} THEN {i}' for i, edge in enumerate(edges))
+    return f'CASE {whens} ELSE {len(edges)} END'
+
+ROLLUP_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS user_rollup (
+        user_id TEXT PRIMARY KEY,
+        grade TEXT,
+        age_group TEXT,
+        mbti_type TEXT,
+        trade_count INTEGER,
+        total_profit_loss REAL,
+        korea_trades INTEGER,
+        us_trades INTEGER,
+        usage_minutes REAL,
+        active_days INTEGER,
+        pnl_bucket INTEGER,
+        frequency_bucket INTEGER,
+        usage_bucket INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cohort_rollup (
+        dimension TEXT,
+        cohort TEXT,
+        metric TEXT,
+        bucket INTEGER,
+        users INTEGER,
+        total REAL,
+        PRIMARY KEY (dimension, cohort, metric, bucket)
+    )
+    '''
+]
+
+ROLLUP_COLUMNS = ['user_id', 'grade', 'age_group', 'mbti_type', 'trade_count', 'total_profit_loss',
+                  'korea_trades', 'us_trades', 'usage_minutes', 'active_days',
+                  'pnl_bucket', 'frequency_bucket', 'usage_bucket']
+
+# 사용자 집계 SELECT. {filter}는 전체 재구성 시 빈 문자열, 일부 사용자 갱신 시 json_each 목록 조건
+# {mbti}는 배치 MBTI 결과 테이블(mbti_recommendations)이 있을 때만 그 테이블을 사용
+_USER_ROLLUP_SELECT = '''
+    SELECT r.*,
+           {pnl_case} AS pnl_bucket,
+           {frequency_case} AS frequency_bucket,
+           CASE WHEN r.active_days = 0 THEN 0 ELSE 1 + {usage_case} END AS usage_bucket
+    FROM (
+        SELECT u.user_id,
+               COALESCE(u.grade, 'unknown') AS grade,
+               COALESCE(u.age_group, 'unknown') AS age_group,
+               COALESCE(m.mbti_type, 'unknown') AS mbti_type,
+               COALESCE(t.trade_count, 0) AS trade_count,
+               COALESCE(t.total_profit_loss, 0) AS total_profit_loss,
+               COALESCE(t.korea_trades, 0) AS korea_trades,
+               COALESCE(t.us_trades, 0) AS us_trades,
+               COALESCE(a.usage_minutes, 0) AS usage_minutes,
+               COALESCE(a.active_days, 0) AS active_days
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS trade_count, SUM(profit_loss) AS total_profit_loss,
+                   SUM(market = 'KR') AS korea_trades, SUM(market = 'US') AS us_trades
+            FROM trades {filter}
+            GROUP BY user_id
+        ) t ON t.user_id = u.user_id
+        LEFT JOIN (
+            SELECT user_id, SUM(total_duration) AS usage_minutes, COUNT(DISTINCT date) AS active_days
+            FROM behavior_daily_rollup {filter}
+            GROUP BY user_id
+        ) a ON a.user_id = u.user_id
+        LEFT JOIN {mbti} m ON m.user_id = u.user_id
+        {filter_users}
+    ) r
+'''.format(
+    pnl_case=_bucket_case('r.total_profit_loss', PNL_EDGES),
+    frequency_case=_bucket_case('r.trade_count', FREQUENCY_EDGES),
+    usage_case=_bucket_case('r.usage_minutes * 1.0 / r.active_days', USAGE_EDGES),
+    filter='{filter}', filter_users='{filter_users}', mbti='{mbti}'
+)
+
+_USER_FILTER = 'WHERE user_id IN (SELECT value FROM json_each(?))'
+_MBTI_TABLE = '(SELECT user_id, mbti_type FROM mbti_recommendations)'
+_MBTI_NONE = '(SELECT NULL AS user_id, NULL AS mbti_type)'
+
+def _user_rollup_sql(partial: bool, has_mbti: bool) -> str:
+    return _USER_ROLLUP_SELECT.format(
+        filter=_USER_FILTER if partial else '',
+        filter_users='WHERE u.user_id IN (SELECT value FROM json_each(?))' if partial else '',
+        mbti=_MBTI_TABLE if has_mbti else _MBTI_NONE
+    )
+
+# cohort_rollup 전체 재구성 (차원별로 user_rollup을 한 번씩 GROUP BY)
+_COHORT_REBUILD = [
+    statement.format(dimension=dimension, column=column)
+    for dimension, column in COHORT_DIMENSIONS.items()
+    for statement in (
+        '''INSERT INTO cohort_rollup SELECT '{dimension}', {column}, 'pnl', pnl_bucket, COUNT(*), SUM(total_profit_loss)
+           FROM user_rollup WHERE trade_count > 0 GROUP BY {column}, pnl_bucket''',
+        '''INSERT INTO cohort_rollup SELECT '{dimension}', {column}, 'frequency', frequency_bucket, COUNT(*), SUM(trade_count)
+           FROM user_rollup GROUP BY {column}, frequency_bucket''',
+        '''INSERT INTO cohort_rollup SELECT '{dimension}', {column}, 'usage', usage_bucket, COUNT(*), SUM(usage_minutes)
+           FROM user_rollup GROUP BY {column}, usage_bucket''',
+        '''INSERT INTO cohort_rollup SELECT '{dimension}', {column}, 'market', 0, SUM(korea_trades > 0), SUM(korea_trades)
+           FROM user_rollup GROUP BY {column}''',
+        '''INSERT INTO cohort_rollup SELECT '{dimension}', {column}, 'market', 1, SUM(us_trades > 0), SUM(us_trades)
+           FROM user_rollup GROUP BY {column}'''
+    )
+]
+
+_COHORT_UPSERT = '''
+    INSERT INTO cohort_rollup (dimension, cohort, metric, bucket, users, total) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (dimension, cohort, metric, bucket)
+    DO UPDATE SET users = users + excluded.users, total = total + excluded.total
+'''
+
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+def _contributions(row: Dict[str, Any]) -> Iterable[Tuple[tuple, int, float]]:
+    """사용자 집계 1행이 cohort_rollup에 더하는 값 ((차원, 코호트, 지표, 구간), 사용자 수, 합계)
+
+    _COHORT_REBUILD의 집계 규칙과 같아야 함
+    """
+    for dimension, column in COHORT_DIMENSIONS.items():
+        cohort = row[column]
+        if row['trade_count'] > 0:
+            yield (dimension, cohort, 'pnl', row['pnl_bucket']), 1, row['total_profit_loss']
+        yield (dimension, cohort, 'frequency', row['frequency_bucket']), 1, row['trade_count']
+        yield (dimension, cohort, 'usage', row['usage_bucket']), 1, row['usage_minutes']
+        yield (dimension, cohort, 'market', 0), int(row['korea_trades'] > 0), row['korea_trades']
+        yield (dimension, cohort, 'market', 1), int(row['us_trades'] > 0), row['us_trades']
+
+def _histogram_percentile(buckets: Dict[int, Tuple[int, float]], edges: List[float], percentile: float) -> float:
+    """구간별 (사용자 수, 합계)에서 백분위수 근사 (양끝 열린 구간은 구간 평균 사용)"""
+    count = sum(users for users, _ in buckets.values())
+    target = count * percentile / 100
+    seen = 0
+    for bucket in sorted(buckets):
+        users, total = buckets[bucket]
+        if users <= 0:
+            continue
+        if seen + users >= target:
+            if bucket == 0 or bucket == len(edges):
+                return total / users
+            low, high = edges[bucket - 1], edges[bucket]
+            return low + (high - low) * (target - seen) / users
+        seen += users
+    return 0.0
+
+class CohortRollups:
+    """코호트 사전 집계 테이블 관리와 조회"""
+
+    def ensure_tables(self, conn: sqlite3.Connection):
+        for statement in ROLLUP_SCHEMA:
+            conn.execute(statement)
+
+    def rebuild(self, conn: sqlite3.Connection) -> int:
+        """user_rollup / cohort_rollup 전체 재구성 (CSV 적재, 배치 MBTI 계산 이후)"""
+        self.ensure_tables(conn)
+        sql = _user_rollup_sql(partial=False, has_mbti=_has_table(conn, 'mbti_recommendations'))
+        conn.execute('DELETE FROM user_rollup')
+        conn.execute(f"INSERT INTO user_rollup ({', '.join(ROLLUP_COLUMNS)}) {sql}")
+        self.rebuild_cohorts(conn)
+        return conn.execute('SELECT COUNT(*) FROM user_rollup').fetchone()[0]
+
+    def rebuild_cohorts(self, conn: sqlite3.Connection):
+        """user_rollup에서 cohort_rollup만 다시 집계"""
+        conn.execute('DELETE FROM cohort_rollup')
+        for statement in _COHORT_REBUILD:
+            conn.execute(statement)
+
+    def refresh_users(self, conn: sqlite3.Connection, user_ids: Iterable[str]) -> int:
+        """일부 사용자의 집계를 다시 계산하고 이전 값과의 차이만 cohort_rollup에 반영"""
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return 0
+        # 이전 집계를 읽은 뒤 다른 프로세스가 같은 사용자를 갱신하면 차이가 두 번 반영되므로
+        # 읽기 전에 쓰기 잠금을 잡음 (호출한 쪽이 이미 트랜잭션을 시작했으면 그대로 사용)
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        ids_json = json.dumps(user_ids)
+        placeholders = ', '.join('?' * len(ROLLUP_COLUMNS))
+        old_rows = [dict(zip(ROLLUP_COLUMNS, row)) for row in conn.execute(
+            f"SELECT {', '.join(ROLLUP_COLUMNS)} FROM user_rollup WHERE user_id IN (SELECT value FROM json_each(?))",
+            (ids_json,))]
+        sql = _user_rollup_sql(partial=True, has_mbti=_has_table(conn, 'mbti_recommendations'))
+        new_rows = [dict(zip(ROLLUP_COLUMNS, row)) for row in conn.execute(sql, (ids_json, ids_json, ids_json))]
+
+        deltas = defaultdict(lambda: [0, 0.0])
+        for rows, sign in ((old_rows, -1), (new_rows, 1)):
+            for row in rows:
+                for key, users, total in _contributions(row):
+                    deltas[key][0] += sign * users
+                    deltas[key][1] += sign * total
+
+        conn.executemany(f"INSERT OR REPLACE INTO user_rollup ({', '.join(ROLLUP_COLUMNS)}) VALUES ({placeholders})",
+                         [tuple(row[column] for column in ROLLUP_COLUMNS) for row in new_rows])
+        conn.executemany(_COHORT_UPSERT, [key + (users, total) for key, (users, total) in deltas.items()
+                                          if users or total])
+        return len(new_rows)
+
+    def analyze(self, conn: sqlite3.Connection, dimension: str) -> Dict[str, Any]:
+        """차원별 코호트 분포 (손익 백분위수, 거래 빈도 히스토그램, 시장 비중, 사용 강도)"""
+        if dimension not in COHORT_DIMENSIONS:
+            raise ValueError(f"지원하지 않는 코호트 차원입니다: {dimension} (가능: {', '.join(COHORT_DIMENSIONS)})")
+
+        metrics = defaultdict(lambda: defaultdict(dict))
+        for cohort, metric, bucket, users, total in conn.execute(
+                'SELECT cohort, metric, bucket, users, total FROM cohort_rollup WHERE dimension = ?', (dimension,)):
+            metrics[cohort][metric][bucket] = (users, total)
+
+        cohorts = []
+        for cohort in sorted(metrics):
+            data = metrics[cohort]
+            frequency, usage, market, pnl = data['frequency'], data['usage'], data['market'], data['pnl']
+            users = sum(count for count, _ in frequency.values())
+            if users <= 0:
+                continue
+            traders = sum(count for count, _ in pnl.values())
+            pnl_total = sum(total for _, total in pnl.values())
+            market_trades = {name: market.get(i, (0, 0))[1] for i, name in enumerate(MARKETS)}
+            all_market_trades = sum(market_trades.values())
+            cohorts.append({
+                'cohort': cohort,
+                'users': users,
+                'profit_loss': {
+                    'traders': traders,
+                    'mean': round(pnl_total / traders, 2) if traders else 0.0,
+                    'percentiles': {f'p{p}': round(_histogram_percentile(pnl, PNL_EDGES, p), 2) if traders else 0.0
+                                    for p in PERCENTILES}
+                },
+                'trade_frequency': {
+                    'avg_trades': round(sum(total for _, total in frequency.values()) / users, 2),
+                    'histogram': {label: frequency.get(i, (0, 0))[0] for i, label in enumerate(FREQUENCY_LABELS)}
+                },
+                'market_split': {
+                    name: {
+                        'users': market.get(i, (0, 0))[0],
+                        'trades': int(market_trades[name]),
+                        'ratio': round(market_trades[name] / all_market_trades, 4) if all_market_trades else 0.0
+                    }
+                    for i, name in enumerate(MARKETS)
+                },
+                'usage_intensity': {
+                    'avg_minutes': round(sum(total for _, total in usage.values()) / users, 2),
+                    'histogram': {label: usage.get(i, (0, 0))[0] for i, label in enumerate(USAGE_LABELS)}
+                }
+            })
+
+        return {
+            'dimension': dimension,
+            'cohorts': cohorts,
+            'buckets': {
+                'profit_loss_edges': PNL_EDGES,
+                'trade_frequency': FREQUENCY_LABELS,
+                'usage_intensity': dict(zip(USAGE_LABELS, ['no activity'] + [f'< {e} min/day' for e in USAGE_EDGES]
+                                            + [f'>= {USAGE_EDGES[-1]} min/day']))
+            }
+        }
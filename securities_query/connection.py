@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+SQLite 연결 관리자
+조회용 읽기 전용 연결 풀과 직렬화된 단일 쓰기 연결을 제공하여
+Flask 요청 스레드들이 연결을 공유하지 않도록 함
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class SQLiteConnectionManager:
+    """읽기 전용 연결 풀 + 잠금으로 직렬화된 쓰기 연결
+
+    - read(): 풀에서 읽기 전용 연결을 빌려 쓰고 반납 (스레드 간 동시 사용 없음)
+    - write(): 쓰기 잠금을 잡은 상태에서 쓰기 연결 사용, 성공 시 커밋/실패 시 롤백
+    WAL 모드를 사용하므로 쓰기 도중에도 조회는 막히지 않고 이전 스냅샷을 읽습니다.
+    close() 후에 다시 사용하거나 fork된 워커 프로세스에서 사용하면 연결을 새로 엽니다.
+    """
+
+    def __init__(self, db_path: str, pool_size: Optional[int] = None, timeout: float = 30.0,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        self.pool_size = pool_size or max(4, (os.cpu_count() or 1) * 2)
+        self.timeout = timeout
+        # 연결별 준비된 문장(prepared statement) 캐시 크기. SQL 문자열이 같으면 재컴파일하지 않음
+        self.cached_statements = cached_statements
+        self._read_uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.stats = {'reads': 0, 'writes': 0, 'read_waits': 0, 'write_errors': 0}
+        # fork 전에 열려 있던 연결 (자식 프로세스에서 닫으면 부모의 잠금/WAL 상태를 망가뜨릴 수 있어 보관만 함)
+        self._inherited = []
+        if hasattr(os, 'register_at_fork'):
+            after_fork = weakref.WeakMethod(self._after_fork)
+            os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
+        # 쓰기 연결이 DB 파일을 만들고 WAL 모드로 전환 (읽기 전용 연결은 모드를 바꿀 수 없음)
+        self._writer = None
+        self._open_writer()
+
+    def _open_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                           cached_statements=self.cached_statements)
+            self._writer.row_factory = sqlite3.Row
+            self._writer.execute('PRAGMA journal_mode=WAL')
+            self._writer.execute('PRAGMA synchronous=NORMAL')
+        return self._writer
+
+    def _after_fork(self):
+        """fork된 자식 프로세스: 부모의 연결과 잠금을 쓰지 않고 새 풀로 시작"""
+        while True:
+            try:
+                self._inherited.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        if self._writer is not None:
+            self._inherited.append(self._writer)
+            self._writer = None
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._read_uri, uri=True, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        """유휴 연결을 꺼내거나, 풀 한도 안에서 새로 열거나, 반납될 때까지 대기"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+                self.stats['read_waits'] += 1
+
+        if create:
+            try:
+                return self._open_reader()
+            except Exception:
+                with self._pool_lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=self.timeout)
+
+    @contextmanager
+    def read(self):
+        """조회용 읽기 전용 연결"""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                self.stats['reads'] += 1
+            self._idle.put(conn)
+
+    @contextmanager
+    def write(self):
+        """직렬화된 쓰기 연결 (한 번에 하나의 쓰기만 수행)"""
+        with self._write_lock:
+            writer = self._open_writer()
+            try:
+                yield writer
+                writer.commit()
+                self.stats['writes'] += 1
+            except Exception:
+                writer.rollback()
+                self.stats['write_errors'] += 1
+                raise
+
+    def data_version(self) -> Optional[int]:
+        """쓰기 연결의 PRAGMA data_version (다른 프로세스가 커밋하면 바뀜)
+
+        이 프로세스의 쓰기는 모두 같은 쓰기 연결을 쓰므로 값이 바뀌지 않습니다.
+        쓰기가 진행 중이면 기다리지 않고 None 반환
+        """
+        if not self._write_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._open_writer().execute('PRAGMA data_version').fetchone()[0]
+        finally:
+            self._write_lock.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """연결 풀 상태"""
+        with self._pool_lock:
+            return {
+                **self.stats,
+                'pool_size': self.pool_size,
+                'open_readers': self._created,
+                'idle_readers': self._idle.qsize(),
+                'write_locked': self._write_lock.locked()
+            }
+
+    def close(self):
+        """유휴 읽기 연결과 쓰기 연결 종료 (워커를 fork하기 전 마스터에서도 호출)"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._pool_lock:
+                self._created -= 1
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
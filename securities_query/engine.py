@@ -0,0 +1,1051 @@
+#!/usr/bin/env python3
+"""
+증권서비스 데이터 조회 엔진
+세 Flask 앱(user/api, hackathon 03_api_services의 기본/웹 서버)이 공통으로 사용하는
+스키마, SQL, 기본 조회 기간, 분석 로직을 한곳에 모은 구현
+"""
+
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .cache import QueryResultCache
+from .cohorts import CohortRollups
+from .connection import SQLiteConnectionManager
+from .risk import RISK_INPUT_TABLES, RiskScoreService
+from .rollups import BehaviorRollups
+from .versions import DataVersionTracker
+
+# 기본 조회 기간 (일). 앱마다 달랐던 기본값을 하나로 통일
+DEFAULT_DAYS = {
+    'trades': 90,
+    'behaviors': 30,
+    'balance': 30,
+    'usage': 30,
+    'behavior_pattern': 30
+}
+
+TABLES = ['users', 'app_behaviors', 'trades', 'watchlists', 'account_balances']
+
+SCHEMA = {
+    'users': '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            join_date TEXT,
+            grade TEXT,
+            age_group TEXT,
+            gender TEXT,
+            experience_months INTEGER,
+            initial_capital INTEGER,
+            created_at TEXT
+        )
+    ''',
+    'app_behaviors': '''
+        CREATE TABLE IF NOT EXISTS app_behaviors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            date TEXT,
+            action_type TEXT,
+            action_detail TEXT,
+            duration_minutes INTEGER,
+            timestamp TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''',
+    'trades': '''
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            trade_date TEXT,
+            trade_type TEXT,
+            market TEXT,
+            stock_symbol TEXT,
+            quantity INTEGER,
+            price REAL,
+            trade_amount REAL,
+            commission REAL,
+            profit_loss REAL,
+            timestamp TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''',
+    'watchlists': '''
+        CREATE TABLE IF NOT EXISTS watchlists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            stock_symbol TEXT,
+            market TEXT,
+            add_date TEXT,
+            current_price REAL,
+            buy_orders INTEGER,
+            sell_orders INTEGER,
+            price_alerts BOOLEAN,
+            target_price REAL,
+            created_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    ''',
+    'account_balances': '''
+        CREATE TABLE IF NOT EXISTS account_balances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            date TEXT,
+            cash_balance REAL,
+            invested_amount REAL,
+            total_assets REAL,
+            timestamp TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+    '''
+}
+
+# 사용자별 조회가 전체 테이블을 훑지 않도록 하는 인덱스 (CSV 재적재 후에도 다시 생성)
+# (user_id, timestamp) 인덱스는 rowid를 포함하므로 키셋 페이지를 정렬 없이 인덱스 범위 탐색으로 읽음
+INDEXES = {
+    'app_behaviors': ['CREATE INDEX IF NOT EXISTS idx_app_behaviors_user_date ON app_behaviors (user_id, date)',
+                      'CREATE INDEX IF NOT EXISTS idx_app_behaviors_user_timestamp ON app_behaviors (user_id, timestamp)'],
+    'trades': ['CREATE INDEX IF NOT EXISTS idx_trades_user_date ON trades (user_id, trade_date)',
+               'CREATE INDEX IF NOT EXISTS idx_trades_user_timestamp ON trades (user_id, timestamp)'],
+    'watchlists': ['CREATE INDEX IF NOT EXISTS idx_watchlists_user ON watchlists (user_id)'],
+    'account_balances': ['CREATE INDEX IF NOT EXISTS idx_account_balances_user_date ON account_balances (user_id, date)']
+}
+
+# 모든 조회 SQL은 상수 문자열로 두어 연결별 준비된 문장 캐시를 재사용
+SQL = {
+    'user_info': 'SELECT * FROM users WHERE user_id = ?',
+    'users_page': 'SELECT * FROM users LIMIT ? OFFSET ?',
+    'users_all': 'SELECT * FROM users ORDER BY rowid',
+    # 키셋(커서) 페이지: 정렬 키 뒤에 rowid를 붙여 같은 timestamp에서도 순서가 유일하도록 함
+    # (+date: 날짜 인덱스 대신 (user_id, timestamp) 인덱스를 타서 정렬 없이 LIMIT까지만 읽도록 함)
+    'users_first': 'SELECT rowid AS _rowid, * FROM users ORDER BY rowid LIMIT ?',
+    'users_after': 'SELECT rowid AS _rowid, * FROM users WHERE rowid > ? ORDER BY rowid LIMIT ?',
+    'app_behaviors_first': '''
+        SELECT rowid AS _rowid, * FROM app_behaviors
+        WHERE user_id = ? AND +date >= ?
+        ORDER BY timestamp DESC, rowid DESC
+        LIMIT ?
+    ''',
+    'app_behaviors_after': '''
+        SELECT rowid AS _rowid, * FROM app_behaviors
+        WHERE user_id = ? AND +date >= ? AND (timestamp, rowid) < (?, ?)
+        ORDER BY timestamp DESC, rowid DESC
+        LIMIT ?
+    ''',
+    'trades_first': '''
+        SELECT rowid AS _rowid, * FROM trades
+        WHERE user_id = ? AND +trade_date >= ?
+        ORDER BY timestamp DESC, rowid DESC
+        LIMIT ?
+    ''',
+    'trades_after': '''
+        SELECT rowid AS _rowid, * FROM trades
+        WHERE user_id = ? AND +trade_date >= ? AND (timestamp, rowid) < (?, ?)
+        ORDER BY timestamp DESC, rowid DESC
+        LIMIT ?
+    ''',
+    'app_behaviors': '''
+        SELECT * FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        ORDER BY timestamp DESC
+    ''',
+    'trades': '''
+        SELECT * FROM trades
+        WHERE user_id = ? AND trade_date >= ?
+        ORDER BY timestamp DESC
+    ''',
+    'watchlist': '''
+        SELECT * FROM watchlists
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    ''',
+    'balance': '''
+        SELECT * FROM account_balances
+        WHERE user_id = ? AND date >= ?
+        ORDER BY date DESC
+    ''',
+    'trading_totals': '''
+        SELECT
+            COUNT(*) AS total_trades,
+            COUNT(CASE WHEN trade_type = 'buy' THEN 1 END) AS buy_trades,
+            COUNT(CASE WHEN trade_type = 'sell' THEN 1 END) AS sell_trades,
+            COALESCE(SUM(trade_amount), 0) AS total_amount,
+            COALESCE(SUM(commission), 0) AS total_commission,
+            COALESCE(SUM(profit_loss), 0) AS total_profit_loss
+        FROM trades WHERE user_id = ?
+    ''',
+    'top_stocks': '''
+        SELECT stock_symbol, COUNT(*) AS trade_count
+        FROM trades WHERE user_id = ?
+        GROUP BY stock_symbol
+        ORDER BY trade_count DESC
+        LIMIT 5
+    ''',
+    # 앱 행동 조회는 원본 대신 시간/일 단위 사전 집계(rollups.py)를 읽음
+    # (평균 사용 시간 = 합계 / 사용 시간이 기록된 횟수로 원본의 AVG와 같음)
+    'usage_by_action': '''
+        SELECT action_type, SUM(action_count) AS count,
+               SUM(total_duration) * 1.0 / NULLIF(SUM(duration_count), 0) AS avg_duration,
+               SUM(total_duration) AS total_duration
+        FROM behavior_daily_rollup
+        WHERE user_id = ? AND date >= ?
+        GROUP BY action_type
+    ''',
+    'market_preferences': '''
+        SELECT market, COUNT(*) AS count
+        FROM watchlists
+        WHERE user_id = ?
+        GROUP BY market
+    ''',
+    'monthly_trades': '''
+        SELECT strftime('%Y-%m', trade_date) AS month, COUNT(*) AS trade_count
+        FROM trades
+        WHERE user_id = ?
+        GROUP BY strftime('%Y-%m', trade_date)
+        ORDER BY month DESC
+        LIMIT 6
+    ''',
+    'avg_trade_amount': 'SELECT AVG(trade_amount) FROM trades WHERE user_id = ?',
+    'profit_pattern': '''
+        SELECT
+            COUNT(CASE WHEN profit_loss > 0 THEN 1 END) AS profitable_trades,
+            COUNT(CASE WHEN profit_loss < 0 THEN 1 END) AS loss_trades,
+            AVG(CASE WHEN profit_loss > 0 THEN profit_loss END) AS avg_profit,
+            AVG(CASE WHEN profit_loss < 0 THEN profit_loss END) AS avg_loss
+        FROM trades
+        WHERE user_id = ? AND profit_loss IS NOT NULL
+    ''',
+    'risk_metrics': '''
+        SELECT
+            MAX(profit_loss) AS max_profit,
+            MIN(profit_loss) AS max_loss,
+            AVG(profit_loss) AS avg_profit_loss,
+            COUNT(CASE WHEN profit_loss < -100000 THEN 1 END) AS large_loss_count,
+            COUNT(CASE WHEN profit_loss > 100000 THEN 1 END) AS large_profit_count,
+            COUNT(CASE WHEN profit_loss < -50000 THEN 1 END) AS stop_loss_count,
+            COUNT(CASE WHEN profit_loss > 50000 THEN 1 END) AS take_profit_count,
+            COUNT(*) AS total_trades
+        FROM trades
+        WHERE user_id = ? AND profit_loss IS NOT NULL
+    ''',
+    'amount_metrics': '''
+        SELECT
+            AVG(trade_amount) AS avg_amount,
+            MIN(trade_amount) AS min_amount,
+            MAX(trade_amount) AS max_amount,
+            COUNT(DISTINCT trade_amount) AS amount_variety
+        FROM trades
+        WHERE user_id = ?
+    ''',
+    'market_risk': '''
+        SELECT
+            COUNT(CASE WHEN market = 'US' THEN 1 END) AS us_stocks,
+            COUNT(CASE WHEN market = 'KR' THEN 1 END) AS korean_stocks,
+            COUNT(*) AS total_watchlist
+        FROM watchlists
+        WHERE user_id = ?
+    ''',
+    'hourly_pattern': '''
+        SELECT hour, SUM(action_count) AS action_count,
+               SUM(total_duration) * 1.0 / NULLIF(SUM(duration_count), 0) AS avg_duration
+        FROM behavior_hourly_rollup
+        WHERE user_id = ? AND date >= ? AND hour >= 0
+        GROUP BY hour
+        ORDER BY hour
+    ''',
+    'weekly_pattern': '''
+        SELECT strftime('%w', date) AS weekday, SUM(action_count) AS action_count,
+               SUM(total_duration) * 1.0 / NULLIF(SUM(duration_count), 0) AS avg_duration
+        FROM behavior_daily_rollup
+        WHERE user_id = ? AND date >= ?
+        GROUP BY strftime('%w', date)
+        ORDER BY weekday
+    ''',
+    'action_details': '''
+        SELECT action_type, action_detail,
+               SUM(action_count) AS count,
+               SUM(total_duration) * 1.0 / NULLIF(SUM(duration_count), 0) AS avg_duration,
+               MAX(max_duration) AS max_duration
+        FROM behavior_hourly_rollup
+        WHERE user_id = ? AND date >= ?
+        GROUP BY action_type, action_detail
+        ORDER BY count DESC
+    ''',
+    'daily_usage': '''
+        SELECT date, SUM(action_count) AS daily_actions, SUM(total_duration) AS daily_duration
+        FROM behavior_daily_rollup
+        WHERE user_id = ? AND date >= ?
+        GROUP BY date
+        ORDER BY date
+    ''',
+    # 거래일별 거래 수와 그날의 앱 사용량. 양쪽을 먼저 날짜별로 집계한 뒤 결합하므로
+    # (거래 × 행동) 행이 생기지 않고 사용자 이력 길이에 비례하는 비용으로 끝남
+    # (거래는 (user_id, trade_date) 인덱스, 행동은 일 단위 집계의 기본 키로 범위 탐색)
+    'trading_app_correlation': '''
+        WITH daily_trades AS (
+            SELECT trade_date, COUNT(*) AS trade_count
+            FROM trades
+            WHERE user_id = ?1 AND trade_date >= ?2
+            GROUP BY trade_date
+        ),
+        daily_usage AS (
+            SELECT date, SUM(action_count) AS app_actions, SUM(total_duration) AS app_duration
+            FROM behavior_daily_rollup
+            WHERE user_id = ?1 AND date >= ?2
+            GROUP BY date
+        )
+        SELECT t.trade_date, t.trade_count, COALESCE(u.app_actions, 0) AS app_actions, u.app_duration
+        FROM daily_trades t
+        LEFT JOIN daily_usage u ON u.date = t.trade_date
+        ORDER BY t.trade_date
+    '''
+}
+
+# 사용자별 기록(ingest) 시 받는 컬럼
+TRADE_COLUMNS = ['user_id', 'trade_date', 'trade_type', 'market', 'stock_symbol', 'quantity', 'price',
+                 'trade_amount', 'commission', 'profit_loss', 'timestamp']
+BEHAVIOR_COLUMNS = ['user_id', 'date', 'action_type', 'action_detail', 'duration_minutes', 'timestamp']
+WATCHLIST_COLUMNS = ['user_id', 'stock_symbol', 'market', 'add_date', 'current_price', 'buy_orders', 'sell_orders',
+                     'price_alerts', 'target_price', 'created_at']
+
+# 커서 페이지 크기 기본값/상한, 스트리밍 시 한 번에 가져오는 행 수
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+def _start_date(days: int) -> str:
+    return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+def encode_cursor(values: List[Any]) -> str:
+    """정렬 키 값 목록을 URL에 그대로 쓸 수 있는 불투명한 커서 문자열로 변환"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """커서 문자열을 정렬 키 값 목록으로 복원 (형식이 맞지 않으면 ValueError)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('잘못된 커서입니다.')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('잘못된 커서입니다.')
+    return values
+
+class SecuritiesQueryEngine:
+    """증권서비스 데이터 조회 엔진
+
+    - 연결: 읽기 전용 연결 풀 + 직렬화된 쓰기 연결 (SQLiteConnectionManager)
+    - SQL: 상수 문자열로 관리하여 연결별 준비된 문장 캐시 재사용
+    - 결과 캐시: (메서드, 인자, 데이터 버전) 단위 TTL 캐시
+    - 데이터 버전: 사용자별 거래/행동이 기록되면 그 사용자의 캐시만 무효화, CSV 적재 시 전체 무효화
+      (다른 프로세스의 커밋은 PRAGMA data_version으로 감지해 전체 무효화)
+    - 앱 행동 집계: 시간/일 단위 사전 집계를 CSV 적재 시 재구성, 행동 기록 시 새 행만 증분 반영
+    - 코호트 집계: CSV 적재 시 전체 재구성, 기록 시 같은 트랜잭션에서 해당 사용자분만 증분 반영
+    - 리스크 성향: 거래/관심종목이 바뀐 사용자만 다시 계산하고 나머지는 메모리에서 반환 (risk.py)
+    """
+
+    def __init__(self, db_path: str, pool_size: Optional[int] = None,
+                 cache_ttl: float = 60.0, cache_size: int = 4096, init_schema: bool = True):
+        self.db_path = db_path
+        self.db = SQLiteConnectionManager(db_path, pool_size=pool_size)
+        self.cache = QueryResultCache(max_entries=cache_size, ttl_seconds=cache_ttl)
+        self.versions = DataVersionTracker()
+        # 다른 프로세스(워커)가 커밋하면 이 프로세스의 캐시 버전도 바뀌도록 함
+        self.versions.watch(self.db.data_version)
+        self.behavior_rollups = BehaviorRollups()
+        self.cohorts = CohortRollups()
+        self.risk_scores = RiskScoreService(self, self.versions)
+        if init_schema:
+            self.init_database()
+
+    # ------------------------------------------------------------------
+    # 스키마 / 적재
+    # ------------------------------------------------------------------
+
+    def init_database(self):
+        """테이블과 인덱스 생성 (이미 있으면 그대로 둠)"""
+        with self.db.write() as conn:
+            for table in TABLES:
+                conn.execute(SCHEMA[table])
+                for statement in INDEXES.get(table, []):
+                    conn.execute(statement)
+            # 기존 데이터베이스에 사전 집계가 아직 없으면 한 번 만들어 둠 (코호트 집계가 행동 집계를 읽음)
+            self.behavior_rollups.ensure_tables(conn)
+            if self.behavior_rollups.is_empty(conn):
+                self.behavior_rollups.rebuild(conn)
+            self.cohorts.ensure_tables(conn)
+            if conn.execute('SELECT 1 FROM user_rollup LIMIT 1').fetchone() is None:
+                self.cohorts.rebuild(conn)
+        print(f"데이터베이스 초기화 완료: {self.db_path}")
+
+    def load_csv_to_db(self, csv_files: Dict[str, str]) -> Dict[str, int]:
+        """CSV 파일을 데이터베이스에 로드하고 테이블별 적재 건수 반환
+
+        임시 테이블에 적재한 뒤 짧은 트랜잭션에서 교체하므로
+        로드 중에도 조회 요청은 기존 테이블을 그대로 읽습니다.
+        """
+        loaded = {}
+        for table_name, file_path in csv_files.items():
+            if not os.path.exists(file_path):
+                print(f"CSV 파일을 찾을 수 없습니다: {file_path}")
+                continue
+
+            df = pd.read_csv(file_path)
+            staging_table = f"{table_name}__staging"
+            with self.db.write() as conn:
+                df.to_sql(staging_table, conn, if_exists='replace', index=False)
+
+                # 기존 테이블 삭제 후 임시 테이블로 교체 (하나의 트랜잭션)
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+                conn.execute(f"ALTER TABLE {staging_table} RENAME TO {table_name}")
+                for statement in INDEXES.get(table_name, []):
+                    conn.execute(statement)
+                if table_name == 'app_behaviors':
+                    self.behavior_rollups.rebuild(conn)
+
+            loaded[table_name] = len(df)
+            print(f"{table_name} 테이블에 {len(df)}개 레코드 로드 완료")
+
+        if loaded:
+            with self.db.write() as conn:
+                self.cohorts.rebuild(conn)
+            self.versions.bump_all()
+            self.cache.clear()
+            self.risk_scores.clear()
+        print("데이터 로드 완료!")
+        return loaded
+
+    def _ingest(self, table: str, columns: List[str], records: List[Dict[str, Any]]) -> int:
+        """사용자 기록을 한 트랜잭션으로 추가하고 해당 사용자들의 데이터 버전 갱신"""
+        if any(not record.get('user_id') for record in records):
+            raise ValueError('user_id가 없는 기록이 있습니다.')
+        rows = [tuple(record.get(column) for column in columns) for record in records]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        user_ids = {record['user_id'] for record in records}
+        with self.db.write() as conn:
+            # 다른 프로세스(워커)의 기록과 겹치지 않도록 last_rowid와 이전 집계를 읽기 전에 쓰기 잠금을 잡음
+            # (암묵적 BEGIN은 첫 INSERT에서야 시작되므로 그 전에 읽은 값이 다른 기록과 중복 집계될 수 있음)
+            conn.execute('BEGIN IMMEDIATE')
+            last_rowid = self.behavior_rollups.last_rowid(conn) if table == 'app_behaviors' else None
+            conn.executemany(query, rows)
+            if last_rowid is not None:
+                self.behavior_rollups.apply_since(conn, last_rowid)
+            self.cohorts.refresh_users(conn, user_ids)
+        for user_id in user_ids:
+            self.versions.bump_user(user_id)
+        if table in RISK_INPUT_TABLES:
+            self.risk_scores.invalidate(user_ids)
+        return len(rows)
+
+    def ingest_trades(self, trades: List[Dict[str, Any]]) -> int:
+        """거래 기록 추가 (timestamp/trade_date가 없으면 현재 시각 기준으로 채움)"""
+        now = datetime.now()
+        records = [{'timestamp': now.isoformat(), 'trade_date': now.strftime('%Y-%m-%d'), **trade} for trade in trades]
+        return self._ingest('trades', TRADE_COLUMNS, records)
+
+    def ingest_app_behaviors(self, behaviors: List[Dict[str, Any]]) -> int:
+        """앱 행동 기록 추가 (timestamp/date가 없으면 현재 시각 기준으로 채움)"""
+        now = datetime.now()
+        records = [{'timestamp': now.isoformat(), 'date': now.strftime('%Y-%m-%d'), **behavior} for behavior in behaviors]
+        return self._ingest('app_behaviors', BEHAVIOR_COLUMNS, records)
+
+    def ingest_watchlist(self, items: List[Dict[str, Any]]) -> int:
+        """관심종목 추가 (add_date/created_at이 없으면 현재 시각 기준으로 채움)"""
+        now = datetime.now()
+        records = [{'created_at': now.isoformat(), 'add_date': now.strftime('%Y-%m-%d'), **item} for item in items]
+        return self._ingest('watchlists', WATCHLIST_COLUMNS, records)
+
+    # ------------------------------------------------------------------
+    # 공통 조회 헬퍼
+    # ------------------------------------------------------------------
+
+    def _fetch_all(self, name: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self.db.read() as conn:
+            return [dict(row) for row in conn.execute(SQL[name], params).fetchall()]
+
+    def _fetch_one(self, name: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        with self.db.read() as conn:
+            row = conn.execute(SQL[name], params).fetchone()
+        return dict(row) if row else None
+
+    def _fetch_page(self, name: str, params: tuple, key_columns: List[str], limit: int,
+                    cursor: Optional[str]) -> Dict[str, Any]:
+        """키셋 페이지 조회. 마지막 행의 정렬 키를 다음 페이지 커서로 반환
+
+        OFFSET과 달리 앞 페이지를 건너뛰며 읽지 않으므로 페이지 위치와 무관하게 비용이 일정합니다.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor:
+            after = tuple(decode_cursor(cursor, len(key_columns)))
+            rows = self._fetch_all(f'{name}_after', params + after + (limit + 1,))
+        else:
+            rows = self._fetch_all(f'{name}_first', params + (limit + 1,))
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in key_columns]) if has_more else None
+        for row in rows:
+            del row['_rowid']
+        return {'rows': rows, 'next_cursor': next_cursor, 'limit': limit}
+
+    def _iter_rows(self, name: str, params: tuple = (), batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """조회 결과를 batch_size 행씩 가져오며 한 행씩 반환 (전체 결과를 메모리에 올리지 않음)
+
+        반복이 끝나거나 중단(close)될 때까지 읽기 연결 하나를 점유합니다.
+        """
+        with self.db.read() as conn:
+            cursor = conn.execute(SQL[name], params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield dict(row)
+
+    def _cached(self, key: tuple, compute, scope: str = 'user'):
+        """결과 캐시 조회. 키에 데이터 버전을 붙여 쓰기 후에는 자동으로 새로 계산"""
+        user_id = key[1] if scope == 'user' else None
+        return self.cache.get_or_compute(key + self.versions.key(scope, user_id), compute)
+
+    # ------------------------------------------------------------------
+    # 기본 조회
+    # ------------------------------------------------------------------
+
+    def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """사용자 기본 정보 조회"""
+        return self._cached(('user_info', user_id), lambda: self._fetch_one('user_info', (user_id,)))
+
+    def list_users(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """사용자 목록 조회"""
+        return self._cached(('users_page', limit, offset),
+                            lambda: self._fetch_all('users_page', (limit, offset)), scope='static')
+
+    def list_users_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """사용자 목록 커서 페이지 (rowid 순)"""
+        return self._cached(('users_keyset', limit, cursor),
+                            lambda: self._fetch_page('users', (), ['_rowid'], limit, cursor), scope='static')
+
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        """전체 사용자 스트리밍 조회"""
+        return self._iter_rows('users_all')
+
+    def get_user_app_behaviors(self, user_id: str, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """사용자 앱 행동 데이터 조회"""
+        days = DEFAULT_DAYS['behaviors'] if days is None else days
+        return self._cached(('app_behaviors', user_id, days),
+                            lambda: self._fetch_all('app_behaviors', (user_id, _start_date(days))))
+
+    # investment_mbti_analyzer 등 기존 호출부 호환용 이름
+    get_user_behaviors = get_user_app_behaviors
+
+    def get_user_app_behaviors_page(self, user_id: str, days: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+                                    cursor: Optional[str] = None) -> Dict[str, Any]:
+        """사용자 앱 행동 커서 페이지 (timestamp, rowid 내림차순)"""
+        days = DEFAULT_DAYS['behaviors'] if days is None else days
+        return self._cached(('app_behaviors_keyset', user_id, days, limit, cursor),
+                            lambda: self._fetch_page('app_behaviors', (user_id, _start_date(days)),
+                                                     ['timestamp', '_rowid'], limit, cursor))
+
+    def iter_user_app_behaviors(self, user_id: str, days: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """사용자 앱 행동 스트리밍 조회"""
+        days = DEFAULT_DAYS['behaviors'] if days is None else days
+        return self._iter_rows('app_behaviors', (user_id, _start_date(days)))
+
+    def get_user_trades(self, user_id: str, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """사용자 거래 데이터 조회"""
+        days = DEFAULT_DAYS['trades'] if days is None else days
+        return self._cached(('trades', user_id, days),
+                            lambda: self._fetch_all('trades', (user_id, _start_date(days))))
+
+    def get_user_trades_page(self, user_id: str, days: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """사용자 거래 커서 페이지 (timestamp, rowid 내림차순)"""
+        days = DEFAULT_DAYS['trades'] if days is None else days
+        return self._cached(('trades_keyset', user_id, days, limit, cursor),
+                            lambda: self._fetch_page('trades', (user_id, _start_date(days)),
+                                                     ['timestamp', '_rowid'], limit, cursor))
+
+    def iter_user_trades(self, user_id: str, days: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """사용자 거래 스트리밍 조회"""
+        days = DEFAULT_DAYS['trades'] if days is None else days
+        return self._iter_rows('trades', (user_id, _start_date(days)))
+
+    def get_user_watchlist(self, user_id: str) -> List[Dict[str, Any]]:
+        """사용자 관심종목 조회"""
+        return self._cached(('watchlist', user_id), lambda: self._fetch_all('watchlist', (user_id,)))
+
+    def get_user_balance(self, user_id: str, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """사용자 계좌 잔고 조회"""
+        days = DEFAULT_DAYS['balance'] if days is None else days
+        return self._cached(('balance', user_id, days),
+                            lambda: self._fetch_all('balance', (user_id, _start_date(days))))
+
+    def get_table_stats(self) -> Dict[str, int]:
+        """테이블별 레코드 수"""
+        def compute():
+            with self.db.read() as conn:
+                return {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in TABLES}
+        return self._cached(('table_stats',), compute, scope='data')
+
+    # ------------------------------------------------------------------
+    # 요약
+    # ------------------------------------------------------------------
+
+    def get_trading_summary(self, user_id: str) -> Dict[str, Any]:
+        """사용자 거래 요약 정보"""
+        def compute():
+            with self.db.read() as conn:
+                totals = dict(conn.execute(SQL['trading_totals'], (user_id,)).fetchone())
+                top_stocks = [{'stock': row[0], 'count': row[1]}
+                              for row in conn.execute(SQL['top_stocks'], (user_id,))]
+            return {**totals, 'top_traded_stocks': top_stocks}
+        return self._cached(('trading_summary', user_id), compute)
+
+    def get_app_usage_summary(self, user_id: str, days: Optional[int] = None) -> Dict[str, Any]:
+        """사용자 앱 사용 요약 정보"""
+        days = DEFAULT_DAYS['usage'] if days is None else days
+
+        def compute():
+            rows = self._fetch_all('usage_by_action', (user_id, _start_date(days)))
+            return {
+                'app_visits': sum(row['count'] for row in rows if row['action_type'] == 'app_visit'),
+                'total_duration_minutes': sum(row['total_duration'] or 0 for row in rows),
+                'action_statistics': [
+                    {'action': row['action_type'], 'count': row['count'], 'avg_duration': row['avg_duration']}
+                    for row in rows
+                ]
+            }
+        return self._cached(('usage_summary', user_id, days), compute)
+
+    # 웹 서버의 기존 메서드 이름 호환
+    get_usage_summary = get_app_usage_summary
+
+    # ------------------------------------------------------------------
+    # 투자 성향 분석
+    # ------------------------------------------------------------------
+
+    def get_investment_profile(self, user_id: str) -> Dict[str, Any]:
+        """사용자 투자 성향 종합 분석"""
+        return self._cached(('investment_profile', user_id), lambda: self._compute_investment_profile(user_id))
+
+    def _compute_investment_profile(self, user_id: str) -> Dict[str, Any]:
+        user_data = self.get_user_info(user_id)
+        if not user_data:
+            return {'error': 'User not found'}
+
+        trading_summary = self.get_trading_summary(user_id)
+
+        with self.db.read() as conn:
+            market_preferences = [{'market': row[0], 'count': row[1]}
+                                  for row in conn.execute(SQL['market_preferences'], (user_id,))]
+            monthly_trades = [{'month': row[0], 'count': row[1]}
+                              for row in conn.execute(SQL['monthly_trades'], (user_id,))]
+            avg_trade_amount = conn.execute(SQL['avg_trade_amount'], (user_id,)).fetchone()[0] or 0
+            profit_pattern = conn.execute(SQL['profit_pattern'], (user_id,)).fetchone()
+
+        investment_style = self._calculate_investment_style(trading_summary, user_data, market_preferences)
+
+        return {
+            'user_info': user_data,
+            'trading_summary': trading_summary,
+            'market_preferences': market_preferences,
+            'monthly_trading_pattern': monthly_trades,
+            'average_trade_amount': avg_trade_amount,
+            'profit_loss_pattern': {
+                'profitable_trades': profit_pattern[0] or 0,
+                'loss_trades': profit_pattern[1] or 0,
+                'average_profit': profit_pattern[2] or 0,
+                'average_loss': profit_pattern[3] or 0
+            },
+            'investment_style': investment_style
+        }
+
+    def _calculate_investment_style(self, trading_summary: Dict, user_data: Dict, market_preferences: List) -> Dict[str, Any]:
+        """투자 스타일 점수 계산"""
+        # 거래 빈도 점수 (0-100)
+        total_trades = trading_summary.get('total_trades', 0)
+        if total_trades == 0:
+            frequency_score = 0
+        elif total_trades < 10:
+            frequency_score = 20  # 낮은 빈도
+        elif total_trades < 50:
+            frequency_score = 50  # 중간 빈도
+        else:
+            frequency_score = 80  # 높은 빈도
+
+        # 리스크 성향 점수 (0-100)
+        avg_trade_amount = trading_summary.get('total_amount', 0) / max(total_trades, 1)
+        initial_capital = user_data.get('initial_capital', 1000000)
+        risk_ratio = avg_trade_amount / initial_capital if initial_capital > 0 else 0
+
+        if risk_ratio < 0.01:
+            risk_score = 20  # 보수적
+        elif risk_ratio < 0.05:
+            risk_score = 50  # 중간
+        else:
+            risk_score = 80  # 공격적
+
+        # 시장 선호도 점수
+        korean_market_count = sum(1 for pref in market_preferences if pref['market'] == 'KR')
+        us_market_count = sum(1 for pref in market_preferences if pref['market'] == 'US')
+        total_watchlist = sum(pref['count'] for pref in market_preferences)
+
+        if total_watchlist == 0:
+            market_diversification = 50
+        else:
+            korean_ratio = korean_market_count / total_watchlist
+            us_ratio = us_market_count / total_watchlist
+            market_diversification = (1 - abs(korean_ratio - us_ratio)) * 100
+
+        # 투자 스타일 분류
+        if frequency_score < 30 and risk_score < 30:
+            style = "보수적 장기투자형"
+        elif frequency_score > 70 and risk_score > 70:
+            style = "적극적 단기투자형"
+        elif frequency_score > 50 and risk_score < 50:
+            style = "활발한 중립투자형"
+        elif frequency_score < 50 and risk_score > 50:
+            style = "신중한 공격투자형"
+        else:
+            style = "균형잡힌 투자형"
+
+        return {
+            'style': style,
+            'frequency_score': frequency_score,
+            'risk_score': risk_score,
+            'market_diversification': market_diversification,
+            'scores': {
+                'trading_frequency': frequency_score,
+                'risk_tolerance': risk_score,
+                'market_diversification': market_diversification
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # 리스크 성향 분석
+    # ------------------------------------------------------------------
+
+    def get_risk_profile(self, user_id: str) -> Dict[str, Any]:
+        """사용자 리스크 성향 분석"""
+        return self.risk_scores.get(user_id)
+
+    def recompute_risk_profiles(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """전체 사용자 리스크 성향 재계산 (프로세스 풀)"""
+        return self.risk_scores.recompute_all(workers)
+
+    def _compute_risk_profile(self, user_id: str) -> Dict[str, Any]:
+        with self.db.read() as conn:
+            # 손실 허용도와 손절매/익절매 패턴은 같은 행 집합이므로 한 번에 집계
+            metrics = conn.execute(SQL['risk_metrics'], (user_id,)).fetchone()
+            amount_metrics = conn.execute(SQL['amount_metrics'], (user_id,)).fetchone()
+            market_risk = conn.execute(SQL['market_risk'], (user_id,)).fetchone()
+        risk_metrics = tuple(metrics)[:5]
+        loss_profit_pattern = tuple(metrics)[5:]
+
+        risk_scores = self._calculate_risk_scores(risk_metrics, amount_metrics, loss_profit_pattern, market_risk)
+
+        return {
+            'risk_metrics': {
+                'max_profit': risk_metrics[0] or 0,
+                'max_loss': risk_metrics[1] or 0,
+                'average_profit_loss': risk_metrics[2] or 0,
+                'large_loss_count': risk_metrics[3] or 0,
+                'large_profit_count': risk_metrics[4] or 0
+            },
+            'amount_metrics': {
+                'average_amount': amount_metrics[0] or 0,
+                'min_amount': amount_metrics[1] or 0,
+                'max_amount': amount_metrics[2] or 0,
+                'amount_variety': amount_metrics[3] or 0
+            },
+            'loss_profit_pattern': {
+                'stop_loss_count': loss_profit_pattern[0] or 0,
+                'take_profit_count': loss_profit_pattern[1] or 0,
+                'total_trades': loss_profit_pattern[2] or 0
+            },
+            'market_risk': {
+                'us_stocks_ratio': (market_risk[0] / max(market_risk[2], 1)) * 100,
+                'korean_stocks_ratio': (market_risk[1] / max(market_risk[2], 1)) * 100,
+                'total_watchlist': market_risk[2] or 0
+            },
+            'risk_scores': risk_scores
+        }
+
+    def _calculate_risk_scores(self, risk_metrics, amount_metrics, loss_profit_pattern, market_risk) -> Dict[str, Any]:
+        """리스크 점수 계산"""
+        # 손실 허용도 점수 (0-100)
+        max_loss = abs(risk_metrics[1]) if risk_metrics[1] else 0
+        if max_loss < 50000:
+            loss_tolerance = 20  # 낮은 손실 허용도
+        elif max_loss < 200000:
+            loss_tolerance = 50  # 중간 손실 허용도
+        else:
+            loss_tolerance = 80  # 높은 손실 허용도
+
+        # 거래 금액 변동성 점수 (0-100)
+        if amount_metrics[2] and amount_metrics[1]:
+            amount_volatility = (amount_metrics[2] - amount_metrics[1]) / amount_metrics[0] if amount_metrics[0] > 0 else 0
+            if amount_volatility < 2:
+                volatility_score = 20  # 낮은 변동성
+            elif amount_volatility < 5:
+                volatility_score = 50  # 중간 변동성
+            else:
+                volatility_score = 80  # 높은 변동성
+        else:
+            volatility_score = 50
+
+        # 손절매/익절매 패턴 점수 (0-100)
+        total_trades = loss_profit_pattern[2] or 1
+        stop_loss_ratio = (loss_profit_pattern[0] / total_trades) * 100
+
+        if stop_loss_ratio > 30:
+            discipline_score = 80  # 높은 규율
+        elif stop_loss_ratio > 10:
+            discipline_score = 50  # 중간 규율
+        else:
+            discipline_score = 20  # 낮은 규율
+
+        # 시장 분산도 점수 (0-100)
+        us_ratio = market_risk[0] / max(market_risk[2], 1)
+        korean_ratio = market_risk[1] / max(market_risk[2], 1)
+        diversification = (1 - abs(us_ratio - korean_ratio)) * 100
+
+        # 종합 리스크 점수
+        overall_risk = (loss_tolerance + volatility_score + (100 - discipline_score) + (100 - diversification)) / 4
+
+        # 리스크 등급 분류
+        if overall_risk < 30:
+            risk_level = "보수적"
+        elif overall_risk < 60:
+            risk_level = "중립적"
+        else:
+            risk_level = "공격적"
+
+        return {
+            'overall_risk_score': overall_risk,
+            'risk_level': risk_level,
+            'loss_tolerance': loss_tolerance,
+            'volatility_score': volatility_score,
+            'discipline_score': discipline_score,
+            'diversification_score': diversification,
+            'recommendations': self._get_risk_recommendations(overall_risk, risk_level)
+        }
+
+    def _get_risk_recommendations(self, risk_score: float, risk_level: str) -> List[str]:
+        """리스크 성향에 따른 투자 권장사항"""
+        recommendations = []
+
+        if risk_level == "보수적":
+            recommendations.extend([
+                "안정적인 대형주 중심의 포트폴리오 구성",
+                "장기 투자 관점에서 분산투자 실시",
+                "정기적인 리밸런싱으로 리스크 관리"
+            ])
+        elif risk_level == "중립적":
+            recommendations.extend([
+                "대형주와 중형주를 적절히 조합한 포트폴리오",
+                "섹터별 분산투자로 리스크 분산",
+                "시장 상황에 따른 유연한 투자 전략"
+            ])
+        else:  # 공격적
+            recommendations.extend([
+                "성장주와 테마주 중심의 포트폴리오",
+                "적극적인 매매 전략 활용",
+                "높은 수익률을 목표로 한 투자"
+            ])
+
+        if risk_score > 70:
+            recommendations.append("손절매 규칙을 엄격히 준수하여 리스크 관리")
+
+        return recommendations
+
+    # ------------------------------------------------------------------
+    # 행동 패턴 분석
+    # ------------------------------------------------------------------
+
+    def get_behavior_pattern(self, user_id: str, days: Optional[int] = None) -> Dict[str, Any]:
+        """사용자 행동 패턴 분석"""
+        days = DEFAULT_DAYS['behavior_pattern'] if days is None else days
+        return self._cached(('behavior_pattern', user_id, days),
+                            lambda: self._compute_behavior_pattern(user_id, days))
+
+    def _compute_behavior_pattern(self, user_id: str, days: int) -> Dict[str, Any]:
+        params = (user_id, _start_date(days))
+        with self.db.read() as conn:
+            hourly_pattern = [{'hour': int(row[0]), 'count': row[1], 'avg_duration': row[2]}
+                              for row in conn.execute(SQL['hourly_pattern'], params)]
+            weekly_pattern = [{'weekday': int(row[0]), 'count': row[1], 'avg_duration': row[2]}
+                              for row in conn.execute(SQL['weekly_pattern'], params)]
+            action_details = [{
+                'action_type': row[0],
+                'action_detail': row[1],
+                'count': row[2],
+                'avg_duration': row[3],
+                'max_duration': row[4]
+            } for row in conn.execute(SQL['action_details'], params)]
+            daily_usage = [{'date': row[0], 'actions': row[1], 'duration': row[2]}
+                           for row in conn.execute(SQL['daily_usage'], params)]
+            trading_app_correlation = [{'date': row[0], 'trades': row[1], 'app_actions': row[2], 'app_duration': row[3]}
+                                       for row in conn.execute(SQL['trading_app_correlation'], params)]
+
+        behavior_analysis = self._analyze_behavior_patterns(hourly_pattern, weekly_pattern, action_details, daily_usage)
+
+        return {
+            'analysis_period': f"{days}일",
+            'hourly_pattern': hourly_pattern,
+            'weekly_pattern': weekly_pattern,
+            'action_details': action_details,
+            'daily_usage': daily_usage,
+            'trading_app_correlation': trading_app_correlation,
+            'behavior_analysis': behavior_analysis
+        }
+
+    def _analyze_behavior_patterns(self, hourly_pattern, weekly_pattern, action_details, daily_usage) -> Dict[str, Any]:
+        """행동 패턴 분석"""
+        # 가장 활발한 시간대
+        if hourly_pattern:
+            peak_hour = max(hourly_pattern, key=lambda x: x['count'])
+            peak_hours = [h for h in hourly_pattern if h['count'] >= peak_hour['count'] * 0.8]
+        else:
+            peak_hour = None
+            peak_hours = []
+
+        # 가장 활발한 요일
+        if weekly_pattern:
+            peak_weekday = max(weekly_pattern, key=lambda x: x['count'])
+            weekday_names = ['일', '월', '화', '수', '목', '금', '토']
+            peak_weekday_name = weekday_names[peak_weekday['weekday']]
+        else:
+            peak_weekday_name = None
+
+        # 주요 행동 유형
+        if action_details:
+            top_actions = action_details[:5]
+            action_diversity = len(set(action['action_type'] for action in action_details))
+        else:
+            top_actions = []
+            action_diversity = 0
+
+        # 사용 패턴 분류
+        if daily_usage:
+            avg_daily_actions = sum(day['actions'] for day in daily_usage) / len(daily_usage)
+            avg_daily_duration = sum(day['duration'] for day in daily_usage) / len(daily_usage)
+
+            if avg_daily_actions > 20:
+                usage_intensity = "높음"
+            elif avg_daily_actions > 10:
+                usage_intensity = "보통"
+            else:
+                usage_intensity = "낮음"
+
+            if avg_daily_duration > 120:
+                duration_level = "긴 시간"
+            elif avg_daily_duration > 60:
+                duration_level = "보통 시간"
+            else:
+                duration_level = "짧은 시간"
+        else:
+            avg_daily_actions = 0
+            avg_daily_duration = 0
+            usage_intensity = "낮음"
+            duration_level = "짧은 시간"
+
+        # 사용자 유형 분류
+        if usage_intensity == "높음" and duration_level == "긴 시간":
+            user_type = "적극적 사용자"
+        elif usage_intensity == "낮음" and duration_level == "짧은 시간":
+            user_type = "소극적 사용자"
+        elif action_diversity > 5:
+            user_type = "다양한 기능 사용자"
+        else:
+            user_type = "일반 사용자"
+
+        return {
+            'peak_hour': peak_hour,
+            'peak_hours': peak_hours,
+            'peak_weekday': peak_weekday_name,
+            'top_actions': top_actions,
+            'action_diversity': action_diversity,
+            'usage_intensity': usage_intensity,
+            'duration_level': duration_level,
+            'user_type': user_type,
+            'average_daily_actions': avg_daily_actions,
+            'average_daily_duration': avg_daily_duration,
+            'recommendations': self._get_behavior_recommendations(user_type, usage_intensity, action_diversity)
+        }
+
+    def _get_behavior_recommendations(self, user_type: str, usage_intensity: str, action_diversity: int) -> List[str]:
+        """행동 패턴에 따른 개인화 권장사항"""
+        recommendations = []
+
+        if user_type == "적극적 사용자":
+            recommendations.extend([
+                "고급 차트 분석 도구 활용",
+                "실시간 알림 서비스 이용",
+                "프리미엄 기능 고려"
+            ])
+        elif user_type == "소극적 사용자":
+            recommendations.extend([
+                "간단한 포트폴리오 추천 서비스",
+                "주요 시장 뉴스 요약 제공",
+                "자동 리밸런싱 서비스"
+            ])
+        elif user_type == "다양한 기능 사용자":
+            recommendations.extend([
+                "통합 대시보드 제공",
+                "맞춤형 기능 추천",
+                "사용 패턴 기반 알림"
+            ])
+        else:
+            recommendations.extend([
+                "기본 기능 튜토리얼 제공",
+                "단계별 기능 안내",
+                "사용법 가이드"
+            ])
+
+        if usage_intensity == "낮음":
+            recommendations.append("앱 사용 빈도 증가를 위한 푸시 알림 설정")
+
+        if action_diversity < 3:
+            recommendations.append("다양한 기능 탐색을 위한 기능 소개")
+
+        return recommendations
+
+    # ------------------------------------------------------------------
+    # 코호트 분석
+    # ------------------------------------------------------------------
+
+    def get_cohort_analytics(self, dimension: str) -> Dict[str, Any]:
+        """등급/연령대/MBTI 유형별 분포 (사전 집계 테이블만 읽으므로 사용자 수와 무관)"""
+        def compute():
+            with self.db.read() as conn:
+                return self.cohorts.analyze(conn, dimension)
+        return self._cached(('cohort', dimension), compute, scope='data')
+
+    def refresh_cohort_rollups(self) -> int:
+        """코호트 집계 전체 재구성 (배치 MBTI 계산 후 실행), 집계된 사용자 수 반환"""
+        with self.db.write() as conn:
+            users = self.cohorts.rebuild(conn)
+        self.versions.bump_data()
+        return users
+
+    # ------------------------------------------------------------------
+    # 상태
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """연결 풀, 결과 캐시, 데이터 버전, 리스크 점수 캐시 상태"""
+        return {
+            'connections': self.db.get_stats(),
+            'cache': self.cache.get_stats(),
+            'versions': self.versions.get_stats(),
+            'risk_scores': self.risk_scores.get_stats()
+        }
+
+    def close(self):
+        """모든 연결 종료"""
+        self.db.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+대용량 응답 직렬화/압축 벤치마크
+합성 데이터베이스의 큰 목록 응답(거래/행동/사용자 목록)에 대해
+표준 json(Flask 기본) / 빠른 JSON 제공자의 직렬화 시간, 객체 목록 / 컬럼 형태의 크기,
+gzip / brotli 압축 크기와 시간을 비교하고, 실제 앱 요청으로 압축 응답을 확인
+이어서 거래 이력이 아주 긴 사용자에 대해 전체 목록 / 키셋 페이지 / NDJSON 스트리밍의
+최대 메모리 사용량과, 사용자 목록의 OFFSET 페이지 / 키셋 페이지 지연 시간을 비교
+
+실행: python -m securities_query.payload_benchmark --users 500 --repeat 50 --history 100000
+"""
+
+import argparse
+import gzip
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from .benchmark import APPS, build_database, load_app
+from .engine import SecuritiesQueryEngine, encode_cursor
+from .serialization import FastJSONProvider, brotli, to_columnar
+
+def timed(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """repeat회 실행한 중앙값(ms)과 마지막 결과"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {'ms': statistics.median(durations), 'result': result}
+
+def build_payloads(engine: SecuritiesQueryEngine, user_ids, users: int) -> Dict[str, Any]:
+    """대표적인 큰 목록 응답 (거래/행동이 가장 많은 사용자 + 사용자 목록)"""
+    sample = user_ids[:users]
+    trades = max((engine.get_user_trades(uid, 180) for uid in sample), key=len)
+    behaviors = max((engine.get_user_app_behaviors(uid, 60) for uid in sample), key=len)
+    return {
+        'trades (180d)': trades,
+        'behaviors (60d)': behaviors,
+        'users (limit 1000)': engine.list_users(1000, 0),
+        'trades x20 users': [row for uid in sample[:20] for row in engine.get_user_trades(uid, 180)]
+    }
+
+def peak_memory(func: Callable[[], Any]) -> Dict[str, Any]:
+    """실행 중 최대 메모리 할당량(MB)과 소요 시간(ms)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'peak_mb': peak / 1024 / 1024, 'ms': elapsed, 'result': result}
+
+def measure_long_history(client, engine: SecuritiesQueryEngine, history: int):
+    """거래 이력이 긴 사용자 한 명의 전체 조회 방식별 메모리/시간 비교"""
+    user_id = 'power_user'
+    now = datetime.now()
+    engine.ingest_trades([
+        {'user_id': user_id, 'trade_date': (now - timedelta(minutes=i)).strftime('%Y-%m-%d'),
+         'timestamp': (now - timedelta(minutes=i)).isoformat(), 'trade_type': 'buy' if i % 2 else 'sell',
+         'market': 'KR', 'stock_symbol': '005930', 'quantity': 10, 'price': 70000.0,
+         'trade_amount': 700000.0, 'commission': 105.0, 'profit_loss': float(i % 1000 - 500)}
+        for i in range(history)
+    ])
+    url = f"/api/users/{user_id}/trades?days=3650"
+
+    def full():
+        return len(client.get(url).get_data())
+
+    def pages():
+        total, cursor = 0, ''
+        while cursor is not None:
+            body = client.get(f"{url}&limit=1000&cursor={cursor}").get_json()
+            total += len(body['data'])
+            cursor = body['next_cursor']
+        return total
+
+    def stream():
+        response = client.get(f"{url}&format=ndjson", buffered=False)
+        lines = sum(chunk.count(b'\n') for chunk in response.response)
+        response.close()
+        return lines
+
+    # 결과 캐시가 페이지를 보관하면 메모리 비교가 왜곡되므로 끄고 측정
+    engine.cache.enabled = False
+    print(f"\n긴 거래 이력 ({history:,}건) 전체 조회")
+    print(f"   {'mode':<24} {'rows/bytes':>12} {'peak MB':>9} {'ms':>9}")
+    for label, func in (('JSON 전체 목록', full), ('키셋 페이지 (1000건)', pages), ('NDJSON 스트리밍', stream)):
+        measured = peak_memory(func)
+        print(f"   {label:<24} {measured['result']:>12,} {measured['peak_mb']:>9.1f} {measured['ms']:>9.1f}")
+    engine.cache.enabled = True
+
+def measure_users_pagination(engine: SecuritiesQueryEngine, users: int, repeat: int):
+    """사용자 목록 마지막 부근 페이지를 OFFSET / 키셋으로 읽는 시간 비교"""
+    engine.cache.enabled = False
+    limit = 100
+    offset = max(0, users - limit)
+    # 같은 위치의 키셋 커서 = offset 번째 행의 rowid (rowid 순서)
+    cursor = None
+    if offset:
+        with engine.db.read() as conn:
+            rowid = conn.execute('SELECT rowid FROM users ORDER BY rowid LIMIT 1 OFFSET ?', (offset - 1,)).fetchone()[0]
+        cursor = encode_cursor([rowid])
+    by_offset = timed(lambda: engine.list_users(limit, offset), repeat)
+    by_cursor = timed(lambda: engine.list_users_page(limit, cursor)['rows'], repeat)
+    same = [row['user_id'] for row in by_offset['result']] == [row['user_id'] for row in by_cursor['result']]
+    print(f"\n사용자 목록 offset={offset:,} 페이지 ({limit}건)")
+    print(f"   LIMIT/OFFSET: {by_offset['ms']:.3f}ms, 키셋 커서: {by_cursor['ms']:.3f}ms, 결과 동일: {same}")
+    engine.cache.enabled = True
+
+def main():
+    parser = argparse.ArgumentParser(description='대용량 응답 직렬화/압축 벤치마크')
+    parser.add_argument('--users', type=int, default=1000, help='합성 사용자 수')
+    parser.add_argument('--repeat', type=int, default=50, help='측정 반복 횟수')
+    parser.add_argument('--history', type=int, default=100000, help='긴 이력 사용자의 거래 건수')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_json = DefaultJSONProvider(app)
+    fast_json = FastJSONProvider(app)
+
+    print("=== 응답 직렬화/압축 벤치마크 ===")
+    print(f"JSON 백엔드: {FastJSONProvider.backend()}, brotli: {'사용 가능' if brotli else '미설치 (gzip만 사용)'}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'payload.db')
+        user_ids = build_database(db_path, args.users)
+        engine = SecuritiesQueryEngine(db_path)
+        engine.cache.enabled = False
+        payloads = build_payloads(engine, user_ids, min(args.users, 200))
+        engine.close()
+
+        print(f"{'payload':<20} {'rows':>6} {'shape':<9} {'bytes':>10} {'json ms':>8} {'fast ms':>8} "
+              f"{'gzip bytes':>11} {'gzip ms':>8} {'br bytes':>9} {'br ms':>7}")
+        for name, records in payloads.items():
+            for shape, body in (('records', {'success': True, 'data': records}),
+                                ('columnar', {'success': True, 'data': to_columnar(records)})):
+                standard = timed(lambda: default_json.dumps(body).encode('utf-8'), args.repeat)
+                fast = timed(lambda: fast_json.dumps_bytes(body), args.repeat)
+                raw = fast['result']
+                gz = timed(lambda: gzip.compress(raw, compresslevel=6, mtime=0), args.repeat)
+                br_bytes, br_ms = '-', '-'
+                if brotli is not None:
+                    br = timed(lambda: brotli.compress(raw, quality=5), args.repeat)
+                    br_bytes, br_ms = f"{len(br['result']):,}", f"{br['ms']:.2f}"
+                print(f"{name:<20} {len(records):>6} {shape:<9} {len(raw):>10,} {standard['ms']:>8.2f} "
+                      f"{fast['ms']:>8.2f} {len(gz['result']):>11,} {gz['ms']:>8.2f} {br_bytes:>9} {br_ms:>7}")
+            print(f"{'':<20} 표준 json 크기(ASCII 이스케이프): {len(default_json.dumps({'success': True, 'data': records}).encode()):,} bytes")
+
+        # 실제 앱에서 협상된 압축 응답 확인 (웹 앱 기준)
+        os.environ['SECURITIES_DB_PATH'] = db_path
+        module = load_app('hackathon_web', APPS['hackathon_web'])
+        client = module.app.test_client()
+        url = f"/api/users/{user_ids[0]}/trades?days=180"
+        plain = client.get(url)
+        compressed = client.get(url, headers={'Accept-Encoding': 'br, gzip'})
+        revalidated = client.get(url, headers={'Accept-Encoding': 'br, gzip', 'If-None-Match': compressed.headers['ETag']})
+        columnar = client.get(url + '&format=columnar', headers={'Accept-Encoding': 'gzip'})
+        print(f"\n앱 응답 {url}")
+        print(f"   압축 없음: {len(plain.get_data()):,} bytes, ETag {plain.headers.get('ETag')}")
+        print(f"   {compressed.headers.get('Content-Encoding')}: {len(compressed.get_data()):,} bytes, "
+              f"ETag {compressed.headers.get('ETag')}, Vary {compressed.headers.get('Vary')}")
+        print(f"   컬럼 형태 + {columnar.headers.get('Content-Encoding')}: {len(columnar.get_data()):,} bytes")
+        print(f"   조건부 재요청: {revalidated.status_code}")
+        print(f"   압축 통계: {module.app.blueprints['securities'].compressor.get_stats()}")
+
+        measure_users_pagination(module.api, args.users, args.repeat)
+        module.app.blueprints['securities'].response_cache.enabled = False
+        measure_long_history(client, module.api, args.history)
+        module.api.close()
+
+    print("\n=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+HTTP 응답 캐시 - 라우트 + 쿼리 인자 + 데이터 버전 단위로 직렬화된 응답을 저장하고
+ETag/Last-Modified 조건부 요청에 304로 응답
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from flask import Response, make_response, request
+
+from .versions import DataVersionTracker
+
+class ResponseCache:
+    """버전 키 기반 응답 캐시
+
+    사용자 데이터가 기록되면 버전이 바뀌어 이전 항목은 더 이상 조회되지 않고(LRU로 밀려남),
+    캐시 적중 시에는 SQL과 JSON 직렬화를 모두 건너뜁니다.
+    조회 기간이 날짜 기준이므로 날짜가 바뀌면 키도 바뀌고,
+    다른 프로세스의 쓰기에 대비해 TTL도 둡니다.
+    """
+
+    def __init__(self, versions: DataVersionTracker, max_entries: int = 2048, ttl_seconds: float = 300.0):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = True
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'evictions': 0}
+        self.lock = threading.Lock()
+
+    def _get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry['expires_at'] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+            return None
+
+    def _put(self, key: tuple, entry: Dict[str, Any]):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def serve(self, scope: str, user_id: Optional[str], render: Callable[[], Any]) -> Response:
+        """캐시된 응답 또는 새로 만든 응답을 조건부 요청 처리 후 반환"""
+        if not self.enabled or request.method != 'GET':
+            return make_response(render())
+
+        key = (request.path, tuple(sorted(request.args.items(multi=True))),
+               date.today().isoformat(), self.versions.key(scope, user_id))
+        entry = self._get(key)
+        if entry is None:
+            response = make_response(render())
+            # 오류 응답(404/500 등)과 스트리밍 응답은 캐시하지 않음
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'etag': hashlib.sha1(body).hexdigest()[:20],
+                'last_modified': self.versions.last_modified(scope, user_id),
+                'expires_at': time.monotonic() + self.ttl_seconds
+            }
+            self._put(key, entry)
+
+        response = Response(entry['body'], mimetype=entry['mimetype'])
+        response.set_etag(entry['etag'])
+        response.last_modified = datetime.fromtimestamp(entry['last_modified'], tz=timezone.utc)
+        # 캐시는 해도 매번 재검증 (버전이 바뀌면 ETag가 달라짐)
+        response.headers['Cache-Control'] = 'no-cache'
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self.lock:
+                self.stats['not_modified'] += 1
+        return response
+
+    def cached(self, scope: str = 'user'):
+        """라우트 데코레이터. scope가 'user'이면 URL의 user_id 버전을 키로 사용"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                return self.serve(scope, kwargs.get('user_id'), lambda: view(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            }
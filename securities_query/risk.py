@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+리스크 점수 서비스
+사용자의 리스크 성향(get_risk_profile)은 거래와 관심종목이 바뀔 때만 달라지므로
+입력 버전별로 계산 결과를 메모리에 보관하고, 입력이 바뀐 사용자만 다시 계산
+전체 사용자 재계산은 프로세스 풀에서 사용자 묶음 단위로 나누어 실행
+"""
+
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .versions import DataVersionTracker
+
+# 리스크 성향 계산에 쓰이는 테이블 (이 테이블에 기록되면 해당 사용자 결과를 무효화)
+RISK_INPUT_TABLES = ('trades', 'watchlists')
+
+# 보관하는 리스크 성향 결과 수 (넘으면 가장 오래 조회되지 않은 사용자부터 제거)
+MAX_RISK_ENTRIES = 50000
+
+# 프로세스 풀 워커마다 하나씩 여는 조회 엔진 (초기화 함수에서 생성)
+_worker_engine = None
+
+def _init_worker(db_path: str):
+    global _worker_engine
+    from .engine import SecuritiesQueryEngine
+    _worker_engine = SecuritiesQueryEngine(db_path, pool_size=1, init_schema=False)
+
+def _compute_chunk(user_ids: List[str]) -> List[Tuple[str, Dict[str, Any], float]]:
+    """워커에서 사용자 묶음의 리스크 성향 계산 (사용자 ID, 결과, 계산 시간 ms)"""
+    results = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        profile = _worker_engine._compute_risk_profile(user_id)
+        results.append((user_id, profile, (time.perf_counter() - started) * 1000))
+    return results
+
+class RiskScoreService:
+    """입력 버전 기반 리스크 성향 캐시
+
+    - 입력 버전: (프로세스 epoch, CSV 적재 버전, 사용자별 거래/관심종목 변경 횟수)
+      앱 행동 기록은 리스크 입력이 아니므로 버전을 바꾸지 않음
+    - 재계산 중에 거래가 들어오면 계산 시작 시점의 버전으로 저장되어 다음 조회 때 다시 계산됨
+    """
+
+    def __init__(self, engine, versions: DataVersionTracker, chunk_size: int = 500,
+                 max_entries: int = MAX_RISK_ENTRIES):
+        self.engine = engine
+        self.versions = versions
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        # 사용자 ID → 결과. 순서가 곧 LRU 순서
+        self.entries: OrderedDict = OrderedDict()
+        self.input_versions: Dict[str, int] = {}
+        self.latencies = deque(maxlen=2000)
+        self.stats = {'hits': 0, 'recomputes': 0, 'invalidations': 0, 'stale_entries_dropped': 0, 'evictions': 0}
+        self.last_bulk: Optional[Dict[str, Any]] = None
+        self.lock = threading.Lock()
+
+    def _version(self, user_id: str) -> tuple:
+        return (self.versions.epoch, self.versions.global_version, self.input_versions.get(user_id, 0))
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """리스크 성향 조회 (입력이 바뀌지 않았으면 보관된 결과 반환)"""
+        self.versions.refresh()
+        with self.lock:
+            version = self._version(user_id)
+            entry = self.entries.get(user_id)
+            if entry is not None and entry['version'] == version:
+                self.entries.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return entry['profile']
+
+        started = time.perf_counter()
+        profile = self.engine._compute_risk_profile(user_id)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._store(user_id, version, profile, elapsed_ms)
+        return profile
+
+    def _store(self, user_id: str, version: tuple, profile: Dict[str, Any], elapsed_ms: float):
+        with self.lock:
+            self.stats['recomputes'] += 1
+            self.latencies.append(elapsed_ms)
+            # 계산하는 동안 입력이 바뀌었으면 오래된 결과이므로 보관하지 않음
+            if version == self._version(user_id):
+                self.entries[user_id] = {'version': version, 'profile': profile, 'computed_at': time.time()}
+                self.entries.move_to_end(user_id)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+            else:
+                self.stats['stale_entries_dropped'] += 1
+
+    def invalidate(self, user_ids: Iterable[str]):
+        """거래/관심종목 변경 기록 (해당 사용자의 입력 버전 증가)"""
+        with self.lock:
+            for user_id in user_ids:
+                self.input_versions[user_id] = self.input_versions.get(user_id, 0) + 1
+                if self.entries.pop(user_id, None) is not None:
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        """전체 데이터 교체 시 (CSV 적재) 보관된 결과 삭제"""
+        with self.lock:
+            self.stats['invalidations'] += len(self.entries)
+            self.entries.clear()
+            self.input_versions.clear()
+
+    def recompute_all(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """전체 사용자 리스크 성향 재계산 (workers > 1이면 프로세스 풀 사용)
+
+        Flask 요청 스레드에서 호출되므로 워커는 spawn으로 시작함 (여러 스레드가 도는 프로세스를 fork하면
+        다른 스레드가 잡고 있던 잠금이 자식에서 풀리지 않은 채 복사될 수 있음).
+        사용자 수가 max_entries보다 많으면 마지막으로 계산한 max_entries명만 보관됨
+        """
+        workers = workers or os.cpu_count() or 1
+        with self.engine.db.read() as conn:
+            user_ids = [row[0] for row in conn.execute('SELECT user_id FROM users ORDER BY user_id')]
+        with self.lock:
+            versions = {user_id: self._version(user_id) for user_id in user_ids}
+        chunks = [user_ids[i:i + self.chunk_size] for i in range(0, len(user_ids), self.chunk_size)]
+
+        started = time.perf_counter()
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(self.engine.db_path,)) as pool:
+                for results in pool.map(_compute_chunk, chunks):
+                    for user_id, profile, elapsed_ms in results:
+                        self._store(user_id, versions[user_id], profile, elapsed_ms)
+        else:
+            for chunk in chunks:
+                for user_id in chunk:
+                    begun = time.perf_counter()
+                    profile = self.engine._compute_risk_profile(user_id)
+                    self._store(user_id, versions[user_id], profile, (time.perf_counter() - begun) * 1000)
+        elapsed = time.perf_counter() - started
+
+        self.last_bulk = {
+            'users': len(user_ids),
+            'workers': workers if len(chunks) > 1 else 1,
+            'chunks': len(chunks),
+            'seconds': round(elapsed, 3),
+            'users_per_second': round(len(user_ids) / elapsed, 1) if elapsed > 0 else None
+        }
+        return self.last_bulk
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            lookups = self.stats['hits'] + self.stats['recomputes']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+                'recompute_ms': {
+                    'p50': round(statistics.median(latencies), 3) if latencies else None,
+                    'p95': round(latencies[int(len(latencies) * 0.95) - 1], 3) if len(latencies) >= 20 else None,
+                    'max': round(latencies[-1], 3) if latencies else None,
+                    'samples': len(latencies)
+                },
+                'last_bulk': self.last_bulk
+            }
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+리스크 점수 서비스 벤치마크
+- 전체 사용자 재계산: 워커 수별 처리량 (프로세스 풀)
+- 조회 혼합 부하: 일부 사용자에게 거래가 들어오는 동안 리스크 성향 조회의 적중률,
+  재계산 지연 시간, 무효화 횟수
+
+실행: python -m securities_query.risk_benchmark --users 5000 --workers 1 2 4 --lookups 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from .benchmark import build_database
+from .engine import SecuritiesQueryEngine
+
+def main():
+    parser = argparse.ArgumentParser(description='리스크 점수 서비스 벤치마크')
+    parser.add_argument('--users', type=int, default=5000, help='합성 사용자 수')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help='전체 재계산 워커 수 (여러 값)')
+    parser.add_argument('--lookups', type=int, default=20000, help='혼합 부하 조회 수')
+    parser.add_argument('--write-ratio', type=float, default=0.02, help='조회 대비 거래 기록 비율')
+    args = parser.parse_args()
+
+    print("=== 리스크 점수 서비스 벤치마크 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'risk.db')
+        user_ids = build_database(db_path, args.users)
+        engine = SecuritiesQueryEngine(db_path)
+
+        print(f"전체 재계산 ({args.users:,}명, CPU {os.cpu_count()}개)")
+        for workers in args.workers:
+            engine.risk_scores.clear()
+            result = engine.recompute_risk_profiles(workers)
+            print(f"   workers={workers}: {result['seconds']:.2f}초, {result['users_per_second']:,.0f}명/초")
+
+        rng = random.Random(5)
+        latencies = []
+        stats_before = engine.risk_scores.get_stats()
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            user_id = rng.choice(user_ids)
+            if rng.random() < args.write_ratio:
+                engine.ingest_trades([{'user_id': user_id, 'market': 'US', 'stock_symbol': 'NVDA',
+                                       'trade_amount': rng.randint(100000, 5000000),
+                                       'profit_loss': rng.randint(-300000, 300000)}])
+            begun = time.perf_counter()
+            engine.get_risk_profile(user_id)
+            latencies.append((time.perf_counter() - begun) * 1000)
+        elapsed = time.perf_counter() - started
+        stats = engine.risk_scores.get_stats()
+        latencies.sort()
+
+        print(f"\n혼합 부하: 조회 {args.lookups:,}건, 거래 기록 비율 {args.write_ratio:.0%} ({elapsed:.2f}초)")
+        print(f"   조회 지연 p50 {statistics.median(latencies) * 1000:.1f}us, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}us, max {latencies[-1]:.2f}ms")
+        print(f"   적중 {stats['hits'] - stats_before['hits']:,}건, "
+              f"재계산 {stats['recomputes'] - stats_before['recomputes']:,}건, "
+              f"무효화 {stats['invalidations'] - stats_before['invalidations']:,}건")
+        print(f"   재계산 지연 (ms): {json.dumps(stats['recompute_ms'])}")
+        engine.close()
+    print("\n=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+앱 행동 사전 집계 벤치마크
+한 사용자의 하루 행동 수를 늘려 가며(이력 길이 증가) 사용 요약/행동 패턴 조회 시간을
+원본 app_behaviors를 직접 GROUP BY 하던 이전 SQL과 사전 집계 SQL로 비교하고 결과가 같은지 확인
+이어서 거래-앱 사용 상관 쿼리를 (거래 × 행동) LEFT JOIN 방식과 날짜별 선집계 후 결합 방식으로 비교
+(이력이 길어질 때 선집계 방식이 선형으로 늘어나는지 확인하는 회귀 벤치마크)
+
+실행: python -m securities_query.rollup_benchmark --days 30 --per-day 10 100 1000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from .engine import SQL, SecuritiesQueryEngine, _start_date
+
+# 사전 집계 도입 전, 원본 행을 매번 GROUP BY 하던 SQL (비교용)
+RAW_SQL = {
+    'usage_by_action': '''
+        SELECT action_type, COUNT(*) AS count, AVG(duration_minutes) AS avg_duration,
+               SUM(duration_minutes) AS total_duration
+        FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        GROUP BY action_type
+    ''',
+    'hourly_pattern': '''
+        SELECT CAST(strftime('%H', timestamp) AS INTEGER) AS hour, COUNT(*) AS action_count,
+               AVG(duration_minutes) AS avg_duration
+        FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        GROUP BY strftime('%H', timestamp)
+        ORDER BY hour
+    ''',
+    'weekly_pattern': '''
+        SELECT strftime('%w', date) AS weekday, COUNT(*) AS action_count, AVG(duration_minutes) AS avg_duration
+        FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        GROUP BY strftime('%w', date)
+        ORDER BY weekday
+    ''',
+    'action_details': '''
+        SELECT action_type, action_detail, COUNT(*) AS count, AVG(duration_minutes) AS avg_duration,
+               MAX(duration_minutes) AS max_duration
+        FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        GROUP BY action_type, action_detail
+        ORDER BY count DESC
+    ''',
+    'daily_usage': '''
+        SELECT date, COUNT(*) AS daily_actions, SUM(duration_minutes) AS daily_duration
+        FROM app_behaviors
+        WHERE user_id = ? AND date >= ?
+        GROUP BY date
+        ORDER BY date
+    '''
+}
+
+# 날짜별 선집계 도입 전 상관 쿼리: 같은 날의 거래 수 × 행동 수만큼 행이 생긴 뒤 GROUP BY
+RAW_CORRELATION_SQL = '''
+    SELECT t.trade_date, COUNT(a.user_id) AS app_actions, SUM(a.duration_minutes) AS app_duration
+    FROM trades t
+    LEFT JOIN app_behaviors a ON t.user_id = a.user_id AND t.trade_date = a.date
+    WHERE t.user_id = ? AND t.trade_date >= ?
+    GROUP BY t.trade_date
+    ORDER BY t.trade_date
+'''
+
+ACTIONS = [('app_visit', '앱_방문'), ('stock_detail_view', '삼성전자_상세보기'), ('stock_detail_view', 'NVDA_상세보기'),
+           ('news_exploration', '경제_뉴스'), ('community_exploration', '종목토론_커뮤니티'), ('chart_analysis', '')]
+
+def normalize(rows) -> List[tuple]:
+    return sorted(tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows)
+
+def seed_user(engine: SecuritiesQueryEngine, user_id: str, days: int, per_day: int, seed: int):
+    """최근 days일 동안 하루 per_day건의 행동을 기록 (기록 경로를 그대로 사용해 집계도 증분 반영)"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    for day in range(days):
+        behaviors = []
+        for _ in range(per_day):
+            at = (now - timedelta(days=day)).replace(hour=rng.randint(0, 23), minute=rng.randint(0, 59))
+            action_type, action_detail = rng.choice(ACTIONS)
+            behaviors.append({'user_id': user_id, 'date': at.strftime('%Y-%m-%d'), 'timestamp': at.isoformat(),
+                              'action_type': action_type, 'action_detail': action_detail,
+                              'duration_minutes': rng.randint(1, 30)})
+        engine.ingest_app_behaviors(behaviors)
+
+def seed_trades(engine: SecuritiesQueryEngine, user_id: str, days: int, per_day: int):
+    """최근 days일 동안 하루 per_day건의 거래 기록"""
+    now = datetime.now()
+    for day in range(days):
+        at = now - timedelta(days=day)
+        engine.ingest_trades([{'user_id': user_id, 'trade_date': at.strftime('%Y-%m-%d'), 'timestamp': at.isoformat(),
+                               'trade_type': 'buy', 'market': 'KR', 'stock_symbol': '005930', 'quantity': 1,
+                               'price': 70000.0, 'trade_amount': 70000.0, 'commission': 10.5, 'profit_loss': 0.0}
+                              for _ in range(per_day)])
+
+def correlation_matches(engine: SecuritiesQueryEngine, params: tuple) -> bool:
+    """선집계 결과 × 그날 거래 수 == 이전 쿼리의 (중복 곱해진) 결과인지 확인"""
+    with engine.db.read() as conn:
+        raw = {row[0]: (row[1], row[2]) for row in conn.execute(RAW_CORRELATION_SQL, params)}
+        new = {row[0]: (row[2] * row[1], row[3] * row[1] if row[3] is not None else None)
+               for row in conn.execute(SQL['trading_app_correlation'], params)}
+    return raw == new
+
+def time_queries(engine: SecuritiesQueryEngine, queries: Dict[str, str], params: tuple, repeat: int) -> float:
+    """쿼리 묶음 한 번 실행 시간(ms) 중앙값"""
+    durations = []
+    with engine.db.read() as conn:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for sql in queries.values():
+                conn.execute(sql, params).fetchall()
+            durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+def main():
+    parser = argparse.ArgumentParser(description='앱 행동 사전 집계 벤치마크')
+    parser.add_argument('--days', type=int, default=30, help='조회 기간(일)과 기록할 일수')
+    parser.add_argument('--per-day', type=int, nargs='*', default=[10, 100, 1000], help='하루 행동 수 (여러 값)')
+    parser.add_argument('--repeat', type=int, default=20, help='반복 횟수')
+    args = parser.parse_args()
+
+    print("=== 앱 행동 사전 집계 벤치마크 ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = SecuritiesQueryEngine(os.path.join(tmp, 'rollup.db'))
+        engine.cache.enabled = False
+        print(f"{'events':>9} {'rollup rows':>12} {'raw SQL (ms)':>13} {'rollup (ms)':>12} {'speedup':>8} {'same':>5}")
+        for i, per_day in enumerate(args.per_day):
+            user_id = f"user_{per_day}_per_day"
+            started = time.perf_counter()
+            seed_user(engine, user_id, args.days, per_day, seed=i)
+            ingest_ms = (time.perf_counter() - started) * 1000 / args.days
+            params = (user_id, _start_date(args.days))
+            raw_ms = time_queries(engine, RAW_SQL, params, args.repeat)
+            rollup_ms = time_queries(engine, {name: SQL[name] for name in RAW_SQL}, params, args.repeat)
+            with engine.db.read() as conn:
+                same = all(normalize(conn.execute(RAW_SQL[name], params)) == normalize(conn.execute(SQL[name], params))
+                           for name in RAW_SQL)
+                rollup_rows = conn.execute('SELECT COUNT(*) FROM behavior_hourly_rollup WHERE user_id = ?',
+                                           (user_id,)).fetchone()[0]
+            print(f"{args.days * per_day:>9,} {rollup_rows:>12,} {raw_ms:>13.2f} {rollup_ms:>12.2f} "
+                  f"{raw_ms / rollup_ms:>7.1f}x {str(same):>5}   (하루치 기록 {ingest_ms:.2f}ms)")
+
+        print(f"\n거래-앱 사용 상관 쿼리 (하루 거래 수 = 하루 행동 수 / 20)")
+        print(f"{'events':>9} {'trades':>7} {'join rows':>10} {'LEFT JOIN (ms)':>15} {'pre-agg (ms)':>13} "
+              f"{'pre-agg us/event':>17} {'same':>5}")
+        for per_day in args.per_day:
+            user_id = f"user_{per_day}_per_day"
+            trades_per_day = max(1, per_day // 20)
+            seed_trades(engine, user_id, args.days, trades_per_day)
+            params = (user_id, _start_date(args.days))
+            raw_ms = time_queries(engine, {'raw': RAW_CORRELATION_SQL}, params, max(1, args.repeat // 4))
+            new_ms = time_queries(engine, {'new': SQL['trading_app_correlation']}, params, args.repeat)
+            events = args.days * (per_day + trades_per_day)
+            print(f"{args.days * per_day:>9,} {args.days * trades_per_day:>7,} {args.days * per_day * trades_per_day:>10,} "
+                  f"{raw_ms:>15.2f} {new_ms:>13.2f} {new_ms * 1000 / events:>17.3f} "
+                  f"{str(correlation_matches(engine, params)):>5}")
+        engine.close()
+    print("\n=== 벤치마크 완료 ===")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+앱 행동(app_behaviors) 사전 집계
+- behavior_hourly_rollup: (사용자, 날짜, 시간, 행동 유형, 행동 상세)별 횟수/사용 시간
+- behavior_daily_rollup: (사용자, 날짜, 행동 유형)별 횟수/사용 시간
+CSV 적재 시 전체를 다시 만들고, 행동 기록 시에는 새로 추가된 행(rowid 범위)만 같은 트랜잭션에서 더함
+사용 요약/행동 패턴 조회는 원본 행 대신 이 집계를 읽으므로 이력 길이와 무관하게
+사용자당 최대 (기간 일수 × 24 × 행동 종류) 행만 읽음
+"""
+
+import sqlite3
+from typing import Dict
+
+ROLLUP_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS behavior_hourly_rollup (
+        user_id TEXT,
+        date TEXT,
+        hour INTEGER,
+        action_type TEXT,
+        action_detail TEXT,
+        action_count INTEGER,
+        duration_count INTEGER,
+        total_duration NUMERIC,
+        max_duration NUMERIC,
+        PRIMARY KEY (user_id, date, hour, action_type, action_detail)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS behavior_daily_rollup (
+        user_id TEXT,
+        date TEXT,
+        action_type TEXT,
+        action_count INTEGER,
+        duration_count INTEGER,
+        total_duration NUMERIC,
+        PRIMARY KEY (user_id, date, action_type)
+    )
+    '''
+]
+
+# 기본 키 컬럼이 NULL이면 충돌 감지가 되지 않으므로 NULL은 빈 문자열(시간은 -1)로 저장
+# (INSERT ... SELECT에 UPSERT를 붙일 때는 파싱 모호성 때문에 WHERE 절이 필요)
+_APPLY_HOURLY = '''
+    INSERT INTO behavior_hourly_rollup (user_id, date, hour, action_type, action_detail,
+                                        action_count, duration_count, total_duration, max_duration)
+    SELECT user_id, COALESCE(date, ''), COALESCE(CAST(strftime('%H', timestamp) AS INTEGER), -1),
+           COALESCE(action_type, ''), COALESCE(action_detail, ''),
+           COUNT(*), COUNT(duration_minutes), COALESCE(SUM(duration_minutes), 0), MAX(duration_minutes)
+    FROM app_behaviors
+    WHERE rowid > ?
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (user_id, date, hour, action_type, action_detail) DO UPDATE SET
+        action_count = action_count + excluded.action_count,
+        duration_count = duration_count + excluded.duration_count,
+        total_duration = total_duration + excluded.total_duration,
+        max_duration = MAX(COALESCE(max_duration, excluded.max_duration), COALESCE(excluded.max_duration, max_duration))
+'''
+
+_APPLY_DAILY = '''
+    INSERT INTO behavior_daily_rollup (user_id, date, action_type, action_count, duration_count, total_duration)
+    SELECT user_id, COALESCE(date, ''), COALESCE(action_type, ''),
+           COUNT(*), COUNT(duration_minutes), COALESCE(SUM(duration_minutes), 0)
+    FROM app_behaviors
+    WHERE rowid > ?
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, date, action_type) DO UPDATE SET
+        action_count = action_count + excluded.action_count,
+        duration_count = duration_count + excluded.duration_count,
+        total_duration = total_duration + excluded.total_duration
+'''
+
+# 전체 재구성 시 모든 rowid를 포함하도록 하는 하한
+_ALL_ROWS = -(2 ** 63)
+
+class BehaviorRollups:
+    """앱 행동 시간/일 단위 집계 테이블 관리"""
+
+    def ensure_tables(self, conn: sqlite3.Connection):
+        for statement in ROLLUP_SCHEMA:
+            conn.execute(statement)
+
+    def last_rowid(self, conn: sqlite3.Connection) -> int:
+        """현재 app_behaviors의 마지막 rowid (기록 전에 읽어 두고 apply_since에 전달)"""
+        return conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM app_behaviors').fetchone()[0]
+
+    def apply_since(self, conn: sqlite3.Connection, after_rowid: int):
+        """after_rowid 이후에 추가된 행을 집계에 더함 (쓰기 트랜잭션 안에서 호출)"""
+        conn.execute(_APPLY_HOURLY, (after_rowid,))
+        conn.execute(_APPLY_DAILY, (after_rowid,))
+
+    def rebuild(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """원본 행 전체로 집계를 다시 만듦 (CSV 적재 이후)"""
+        self.ensure_tables(conn)
+        conn.execute('DELETE FROM behavior_hourly_rollup')
+        conn.execute('DELETE FROM behavior_daily_rollup')
+        self.apply_since(conn, _ALL_ROWS)
+        return self.get_counts(conn)
+
+    def is_empty(self, conn: sqlite3.Connection) -> bool:
+        return conn.execute('SELECT 1 FROM behavior_daily_rollup LIMIT 1').fetchone() is None
+
+    def get_counts(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        return {
+            'hourly_rows': conn.execute('SELECT COUNT(*) FROM behavior_hourly_rollup').fetchone()[0],
+            'daily_rows': conn.execute('SELECT COUNT(*) FROM behavior_daily_rollup').fetchone()[0]
+        }
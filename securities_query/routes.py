@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+공통 Flask 라우트 - 세 증권서비스 API 앱이 같은 엔드포인트를 등록하도록 Blueprint로 제공
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+
+from .engine import DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE, SecuritiesQueryEngine
+from .response_cache import ResponseCache
+from .serialization import FastJSONProvider, ResponseCompressor, to_columnar
+
+def create_securities_blueprint(engine: SecuritiesQueryEngine, csv_files: Optional[Dict[str, str]] = None,
+                                mbti_analyzer=None, response_cache: Optional[ResponseCache] = None,
+                                fast_json: bool = True, compress_min_size: Optional[int] = 1024) -> Blueprint:
+    """조회 엔진을 사용하는 /api/* 라우트 Blueprint 생성
+
+    csv_files: /api/load-data가 적재할 테이블별 CSV 경로
+    mbti_analyzer: 주어지면 MBTI 추천/설문 라우트도 함께 등록 (InvestmentMBTIAnalyzer)
+    response_cache: 조회 라우트 응답 캐시 (없으면 엔진의 데이터 버전으로 새로 생성)
+    fast_json: 앱의 JSON 제공자를 FastJSONProvider로 교체
+    compress_min_size: 이 크기(바이트) 이상의 JSON 응답을 압축 (None이면 압축 안 함)
+
+    목록 라우트는 ?format=columnar 로 {"columns": [...], "rows": [...]} 형태 응답을 지원합니다.
+    사용자/거래/행동 목록은 ?cursor= (첫 페이지는 빈 값)로 키셋 페이지를,
+    ?format=ndjson 으로 한 줄에 한 행씩 스트리밍 응답을 지원합니다.
+    """
+    bp = Blueprint('securities', __name__)
+    cache = response_cache or ResponseCache(engine.versions)
+    compressor = ResponseCompressor(compress_min_size) if compress_min_size is not None else None
+    bp.response_cache = cache
+    bp.compressor = compressor
+
+    @bp.record_once
+    def configure_app(state):
+        if fast_json:
+            state.app.json = FastJSONProvider(state.app)
+        if compressor is not None:
+            state.app.after_request(compressor)
+
+    def _rows(records):
+        """목록 응답 형태 선택 (기본: 객체 목록, ?format=columnar: 컬럼/행 형태)"""
+        return to_columnar(records) if request.args.get('format') == 'columnar' else records
+
+    def _wants_stream() -> bool:
+        return request.args.get('format') == 'ndjson'
+
+    def _wants_page() -> bool:
+        return 'cursor' in request.args
+
+    def _page_args():
+        """커서 페이지 인자 (limit, cursor). 빈 커서는 첫 페이지"""
+        return request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), request.args.get('cursor') or None
+
+    def _page_response(page):
+        return jsonify({'success': True, 'data': _rows(page['rows']), 'next_cursor': page['next_cursor']})
+
+    def _ndjson(rows):
+        """행 이터레이터를 NDJSON으로 스트리밍 (응답 캐시/압축 대상이 아님)"""
+        dumps = current_app.json.dumps
+
+        def generate():
+            lines = []
+            for row in rows:
+                lines.append(dumps(row))
+                if len(lines) >= STREAM_BATCH_SIZE:
+                    yield '\n'.join(lines) + '\n'
+                    lines = []
+            if lines:
+                yield '\n'.join(lines) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @bp.route('/api/users', methods=['GET'])
+    @cache.cached('static')
+    def get_users():
+        """사용자 목록 조회"""
+        try:
+            if _wants_stream():
+                return _ndjson(engine.iter_users())
+            if _wants_page():
+                return _page_response(engine.list_users_page(*_page_args()))
+            limit = request.args.get('limit', 100, type=int)
+            offset = request.args.get('offset', 0, type=int)
+            return jsonify({'success': True, 'data': _rows(engine.list_users(limit, offset))})
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>', methods=['GET'])
+    @cache.cached('user')
+    def get_user(user_id):
+        """사용자 기본 정보 조회"""
+        try:
+            user_info = engine.get_user_info(user_id)
+            if user_info:
+                return jsonify({'success': True, 'data': user_info})
+            else:
+                return jsonify({'success': False, 'message': 'User not found'}), 404
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/behaviors', methods=['GET'])
+    @cache.cached('user')
+    def get_user_behaviors(user_id):
+        """사용자 앱 행동 데이터 조회"""
+        try:
+            days = request.args.get('days', type=int)
+            if _wants_stream():
+                return _ndjson(engine.iter_user_app_behaviors(user_id, days))
+            if _wants_page():
+                return _page_response(engine.get_user_app_behaviors_page(user_id, days, *_page_args()))
+            return jsonify({'success': True, 'data': _rows(engine.get_user_app_behaviors(user_id, days))})
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/trades', methods=['GET'])
+    @cache.cached('user')
+    def get_user_trades(user_id):
+        """사용자 거래 데이터 조회"""
+        try:
+            days = request.args.get('days', type=int)
+            if _wants_stream():
+                return _ndjson(engine.iter_user_trades(user_id, days))
+            if _wants_page():
+                return _page_response(engine.get_user_trades_page(user_id, days, *_page_args()))
+            return jsonify({'success': True, 'data': _rows(engine.get_user_trades(user_id, days))})
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/watchlist', methods=['GET'])
+    @cache.cached('user')
+    def get_user_watchlist(user_id):
+        """사용자 관심종목 조회"""
+        try:
+            return jsonify({'success': True, 'data': _rows(engine.get_user_watchlist(user_id))})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/balance', methods=['GET'])
+    @cache.cached('user')
+    def get_user_balance(user_id):
+        """사용자 계좌 잔고 조회"""
+        try:
+            days = request.args.get('days', type=int)
+            return jsonify({'success': True, 'data': _rows(engine.get_user_balance(user_id, days))})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/trading-summary', methods=['GET'])
+    @cache.cached('user')
+    def get_trading_summary(user_id):
+        """사용자 거래 요약 정보"""
+        try:
+            return jsonify({'success': True, 'data': engine.get_trading_summary(user_id)})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/usage-summary', methods=['GET'])
+    @cache.cached('user')
+    def get_usage_summary(user_id):
+        """사용자 앱 사용 요약 정보"""
+        try:
+            days = request.args.get('days', type=int)
+            return jsonify({'success': True, 'data': engine.get_app_usage_summary(user_id, days)})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/investment-profile', methods=['GET'])
+    @cache.cached('user')
+    def get_investment_profile(user_id):
+        """사용자 투자 성향 종합 분석"""
+        try:
+            profile = engine.get_investment_profile(user_id)
+            if 'error' in profile:
+                return jsonify({'success': False, 'message': profile['error']}), 404
+            return jsonify({'success': True, 'data': profile})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/risk-profile', methods=['GET'])
+    @cache.cached('user')
+    def get_risk_profile(user_id):
+        """사용자 리스크 성향 분석"""
+        try:
+            return jsonify({'success': True, 'data': engine.get_risk_profile(user_id)})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/behavior-pattern', methods=['GET'])
+    @cache.cached('user')
+    def get_behavior_pattern(user_id):
+        """사용자 행동 패턴 분석"""
+        try:
+            days = request.args.get('days', type=int)
+            return jsonify({'success': True, 'data': engine.get_behavior_pattern(user_id, days)})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    def _records_from_request(user_id):
+        """요청 본문의 기록 목록 (단일 객체 또는 {"records": [...]})에 user_id 지정"""
+        data = request.get_json(silent=True) or {}
+        records = data.get('records', [data]) if isinstance(data, dict) else data
+        return [{**record, 'user_id': user_id} for record in records]
+
+    @bp.route('/api/users/<user_id>/trades', methods=['POST'])
+    def add_user_trades(user_id):
+        """사용자 거래 기록 추가 (해당 사용자의 캐시 무효화)"""
+        try:
+            inserted = engine.ingest_trades(_records_from_request(user_id))
+            return jsonify({'success': True, 'data': {'inserted': inserted}}), 201
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/behaviors', methods=['POST'])
+    def add_user_behaviors(user_id):
+        """사용자 앱 행동 기록 추가 (해당 사용자의 캐시 무효화)"""
+        try:
+            inserted = engine.ingest_app_behaviors(_records_from_request(user_id))
+            return jsonify({'success': True, 'data': {'inserted': inserted}}), 201
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/watchlist', methods=['POST'])
+    def add_user_watchlist(user_id):
+        """사용자 관심종목 추가 (해당 사용자의 캐시와 리스크 점수 무효화)"""
+        try:
+            inserted = engine.ingest_watchlist(_records_from_request(user_id))
+            return jsonify({'success': True, 'data': {'inserted': inserted}}), 201
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/risk-scores/recompute', methods=['POST'])
+    def recompute_risk_scores():
+        """전체 사용자 리스크 성향 재계산 (요청 본문 {"workers": N}, 기본값은 CPU 수)"""
+        try:
+            data = request.get_json(silent=True) or {}
+            return jsonify({'success': True, 'data': engine.recompute_risk_profiles(data.get('workers'))})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/risk-scores/stats', methods=['GET'])
+    def get_risk_score_stats():
+        """리스크 점수 캐시 적중/무효화 횟수와 재계산 지연 시간"""
+        return jsonify({'success': True, 'data': engine.risk_scores.get_stats()})
+
+    @bp.route('/api/stats', methods=['GET'])
+    @cache.cached('data')
+    def get_database_stats():
+        """데이터베이스 통계 정보"""
+        try:
+            return jsonify({'success': True, 'data': engine.get_table_stats()})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/cohorts/<dimension>', methods=['GET'])
+    @cache.cached('data')
+    def get_cohort_analytics(dimension):
+        """코호트(grade/age_group/mbti)별 손익 백분위수, 거래 빈도, 시장 비중, 사용 강도"""
+        try:
+            return jsonify({'success': True, 'data': engine.get_cohort_analytics(dimension)})
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/cohorts/refresh', methods=['POST'])
+    def refresh_cohorts():
+        """코호트 집계 전체 재구성 (배치 MBTI 계산 이후 호출)"""
+        try:
+            return jsonify({'success': True, 'data': {'users': engine.refresh_cohort_rollups()}})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/load-data', methods=['POST'])
+    def load_data():
+        """CSV 데이터를 데이터베이스에 로드"""
+        try:
+            loaded = engine.load_csv_to_db(csv_files or {})
+            return jsonify({'success': True, 'message': 'Data loaded successfully', 'data': loaded})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/health', methods=['GET'])
+    def health_check():
+        """헬스 체크"""
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.now().isoformat(),
+            'database_path': engine.db_path,
+            'database_exists': os.path.exists(engine.db_path),
+            'database_connected': engine.db is not None,
+            **engine.get_stats(),
+            'response_cache': cache.get_stats(),
+            'serialization': {
+                'json_backend': FastJSONProvider.backend() if fast_json else 'json',
+                'compression': compressor.get_stats() if compressor is not None else None
+            }
+        })
+
+    if mbti_analyzer is not None:
+        _register_mbti_routes(bp, engine, mbti_analyzer, cache)
+
+    return bp
+
+def _register_mbti_routes(bp: Blueprint, engine: SecuritiesQueryEngine, mbti_analyzer, cache: ResponseCache):
+    """투자 MBTI 추천/설문 라우트"""
+
+    @bp.route('/api/users/<user_id>/mbti-recommendation', methods=['GET'])
+    @cache.cached('user')
+    def get_mbti_recommendation(user_id):
+        """사용자 데이터 기반 MBTI 자동 추천"""
+        try:
+            analysis_result = mbti_analyzer.analyze_user_data(user_id, engine)
+            if "error" in analysis_result:
+                return jsonify({'success': False, 'message': analysis_result['error']}), 400
+            recommendation = mbti_analyzer.recommend_mbti_type(analysis_result)
+            return jsonify({'success': True, 'data': recommendation})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/users/<user_id>/mbti-analysis', methods=['GET'])
+    @cache.cached('user')
+    def get_mbti_analysis(user_id):
+        """사용자 데이터 상세 분석 결과"""
+        try:
+            analysis_result = mbti_analyzer.analyze_user_data(user_id, engine)
+            if "error" in analysis_result:
+                return jsonify({'success': False, 'message': analysis_result['error']}), 400
+            return jsonify({'success': True, 'data': analysis_result})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/mbti/questionnaire', methods=['GET'])
+    @cache.cached('static')
+    def get_mbti_questionnaire():
+        """MBTI 설문지 조회"""
+        try:
+            return jsonify({'success': True, 'data': mbti_analyzer.get_mbti_questionnaire()})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/mbti/calculate', methods=['POST'])
+    def calculate_mbti_from_questionnaire():
+        """설문지 답변 기반 MBTI 계산"""
+        try:
+            data = request.get_json()
+            answers = data.get('answers', [])
+            if not answers or len(answers) != 5:
+                return jsonify({'success': False, 'message': '5개 문항에 대한 답변이 필요합니다.'}), 400
+            result = mbti_analyzer.calculate_questionnaire_result(answers)
+            return jsonify({'success': True, 'data': result})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
+
+    @bp.route('/api/mbti/types', methods=['GET'])
+    @cache.cached('static')
+    def get_mbti_types():
+        """모든 MBTI 유형 정보 조회"""
+        try:
+            return jsonify({'success': True, 'data': mbti_analyzer.mbti_types})
+        except Exception as e:
+            return jsonify({'success': False, 'message': str(e)}), 500
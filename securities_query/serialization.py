@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+응답 직렬화/압축
+- FastJSONProvider: orjson이 설치되어 있으면 사용하고, 없으면 표준 json을 압축 구분자로 사용
+- ResponseCompressor: 일정 크기 이상의 JSON 응답을 Accept-Encoding에 따라 br/gzip으로 압축
+- to_columnar: 목록 응답을 {"columns": [...], "rows": [[...]]} 형태로 변환
+"""
+
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON 제공자 (한글을 \\uXXXX로 이스케이프하지 않고, 키 정렬 없이 직렬화)"""
+
+    ensure_ascii = False
+    sort_keys = False
+    compact = True
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """응답 본문용 바이트 직렬화 (orjson은 문자열 변환 없이 바로 바이트 반환)"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+        return self.dumps(obj).encode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+    @staticmethod
+    def backend() -> str:
+        return 'orjson' if orjson is not None else 'json'
+
+def to_columnar(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """같은 키를 가진 딕셔너리 목록을 컬럼 이름 + 값 행렬로 변환"""
+    if not records:
+        return {'columns': [], 'rows': []}
+    columns = list(records[0].keys())
+    return {'columns': columns, 'rows': [[record.get(column) for column in columns] for record in records]}
+
+class ResponseCompressor:
+    """after_request 훅으로 JSON 응답을 압축 (br 우선, 없으면 gzip)
+
+    압축 후에는 ETag를 약한 ETag로 바꿔 인코딩과 무관하게 조건부 요청이 맞도록 하고,
+    같은 ETag의 압축 결과는 메모해 두어 캐시된 응답을 매번 다시 압축하지 않습니다.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5, memo_size: int = 512):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.stats = {'compressed': 0, 'memo_hits': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self.lock = threading.Lock()
+
+    def choose_encoding(self, accept_encodings) -> Optional[str]:
+        if brotli is not None and accept_encodings['br']:
+            return 'br'
+        if accept_encodings['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response):
+        if (request.method != 'GET' or response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.accept_encodings)
+        body = response.get_data()
+        if encoding is None or len(body) < self.min_size:
+            return response
+
+        etag, _ = response.get_etag()
+        memo_key = (etag, encoding) if etag else None
+        with self.lock:
+            compressed = self.memo.get(memo_key) if memo_key else None
+            if compressed is not None:
+                self.memo.move_to_end(memo_key)
+                self.stats['memo_hits'] += 1
+        if compressed is None:
+            compressed = self.compress(body, encoding)
+            if memo_key:
+                with self.lock:
+                    self.memo[memo_key] = compressed
+                    while len(self.memo) > self.memo_size:
+                        self.memo.popitem(last=False)
+
+        with self.lock:
+            self.stats['compressed'] += 1
+            self.stats['bytes_in'] += len(body)
+            self.stats['bytes_out'] += len(compressed)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            ratio = self.stats['bytes_out'] / self.stats['bytes_in'] if self.stats['bytes_in'] else 0.0
+            return {
+                **self.stats,
+                'ratio': round(ratio, 4),
+                'min_size': self.min_size,
+                'encodings': ['br', 'gzip'] if brotli is not None else ['gzip']
+            }
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+데이터 버전 추적 - 사용자별 쓰기가 일어날 때마다 버전을 올려 캐시 키를 무효화
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+class DataVersionTracker:
+    """캐시 키에 포함할 데이터 버전
+
+    - user: 해당 사용자의 거래/행동이 기록되면 바뀜
+    - data: 누구든 쓰기가 일어나면 바뀜 (테이블 통계 등 전체 집계용)
+    - static: CSV 전체 적재 때만 바뀜 (사용자 목록, MBTI 유형표 등)
+    epoch는 프로세스마다 달라서 재시작 전 버전과 섞이지 않습니다.
+    watch()로 외부 쓰기 감지 함수를 등록하면 다른 프로세스(멀티 워커 서버의 다른 워커, 배치 스크립트)가
+    DB에 커밋한 것을 조회 때 감지해 전체 버전을 올립니다 (어느 사용자인지 모르므로 전체 무효화).
+    """
+
+    SCOPES = ('user', 'data', 'static')
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.global_version = 0
+        self.write_version = 0
+        self.user_versions: Dict[str, int] = {}
+        self.global_modified = time.time()
+        self.write_modified = self.global_modified
+        self.user_modified: Dict[str, float] = {}
+        self.external_changes = 0
+        self._probe: Optional[Callable[[], Optional[int]]] = None
+        self._probe_value: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def watch(self, probe: Callable[[], Optional[int]]):
+        """외부 쓰기 감지 함수 등록 (값이 바뀌면 외부 쓰기로 보고, None이면 이번에는 확인하지 않음)"""
+        self._probe_value = probe()
+        self._probe = probe
+
+    def refresh(self):
+        """등록된 감지 함수로 다른 프로세스의 쓰기를 확인해 있으면 전체 버전 증가"""
+        if self._probe is None:
+            return
+        value = self._probe()
+        if value is None or value == self._probe_value:
+            return
+        now = time.time()
+        with self.lock:
+            if value == self._probe_value:
+                return
+            self._probe_value = value
+            self.external_changes += 1
+            self.global_version += 1
+            self.write_version += 1
+            self.user_versions.clear()
+            self.user_modified.clear()
+            self.global_modified = self.write_modified = now
+
+    def bump_user(self, user_id: str):
+        """사용자 데이터 변경 기록"""
+        now = time.time()
+        with self.lock:
+            self.user_versions[user_id] = self.user_versions.get(user_id, 0) + 1
+            self.user_modified[user_id] = now
+            self.write_version += 1
+            self.write_modified = now
+
+    def bump_data(self):
+        """특정 사용자와 무관한 집계 데이터 변경 기록 (코호트 집계 재구성 등)"""
+        now = time.time()
+        with self.lock:
+            self.write_version += 1
+            self.write_modified = now
+
+    def bump_all(self):
+        """전체 데이터 교체 기록 (CSV 적재)"""
+        now = time.time()
+        with self.lock:
+            self.global_version += 1
+            self.write_version += 1
+            self.user_versions.clear()
+            self.user_modified.clear()
+            self.global_modified = self.write_modified = now
+
+    def key(self, scope: str, user_id: Optional[str] = None) -> tuple:
+        """캐시 키에 덧붙일 버전 튜플"""
+        self.refresh()
+        with self.lock:
+            if scope == 'user':
+                return (self.epoch, self.global_version, self.user_versions.get(user_id, 0))
+            if scope == 'data':
+                return (self.epoch, self.global_version, self.write_version)
+            return (self.epoch, self.global_version)
+
+    def last_modified(self, scope: str, user_id: Optional[str] = None) -> float:
+        """Last-Modified 헤더에 쓸 마지막 변경 시각 (epoch 초)"""
+        with self.lock:
+            if scope == 'user':
+                return max(self.global_modified, self.user_modified.get(user_id, 0.0))
+            if scope == 'data':
+                return self.write_modified
+            return self.global_modified
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'epoch': self.epoch,
+                'global_version': self.global_version,
+                'write_version': self.write_version,
+                'users_with_writes': len(self.user_versions),
+                'external_changes': self.external_changes
+            }
@@ -0,0 +1,22 @@
+"""
+Flask 앱 공통 실행 프로필 패키지
+mypage, user/api, hackathon_2025_project/03_api_services의 실행 스크립트가 함께 사용
+"""
+
+from .prefork import PreforkServer
+from .profiles import (SERVER_GRACEFUL_TIMEOUT, SERVER_KEEPALIVE, SERVER_MODE, SERVER_MODES, SERVER_THREADS,
+                       SERVER_WORKERS, add_serving_arguments, parse_serving_args, run_app, serving_argv)
+
+__all__ = [
+    'PreforkServer',
+    'SERVER_GRACEFUL_TIMEOUT',
+    'SERVER_KEEPALIVE',
+    'SERVER_MODE',
+    'SERVER_MODES',
+    'SERVER_THREADS',
+    'SERVER_WORKERS',
+    'add_serving_arguments',
+    'parse_serving_args',
+    'run_app',
+    'serving_argv'
+]
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+실행 프로필 부하 테스트 (로컬 HTTP 부하 생성기)
+
+앱 스크립트를 개발 모드와 운영 모드로 각각 띄우고, 주요 라우트마다 같은 요청 목록을
+keep-alive 연결 여러 개로 보내 초당 처리량(RPS)과 p50/p99 지연 시간을 비교합니다.
+요청 목록은 --seed로 고정되고 DB는 임시 디렉터리에 새로 만들므로 다시 실행해도 같은 부하입니다.
+마지막으로 SIGTERM을 보내 처리 중인 요청을 마치고 종료하는지(종료 코드, 걸린 시간) 확인합니다.
+
+실행: python -m serving.loadtest --app mypage --modes development production --workers 4 --concurrency 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MBTI_ANSWERS = 10
+
+def mypage_routes(rng, user_ids):
+    agents = ['standard', 'growth', 'dividend', 'index', 'value', 'quant', 'esg']
+    messages = ['오늘 리스크 관리는 어떻게 하나요?', '섹터 로테이션이 궁금해요', '배당주 추천해줘', '뉴스 요약 부탁해']
+    return [
+        ('POST /api/chat', lambda: ('POST', '/api/chat', {'message': rng.choice(messages), 'agent_id': rng.choice(agents)})),
+        ('POST /api/report', lambda: ('POST', '/api/report', {'agent_id': rng.choice(agents)})),
+        ('POST /api/mbti', lambda: ('POST', '/api/mbti', {'answers': [rng.randint(0, 2) for _ in range(MBTI_ANSWERS)]})),
+        ('POST /api/practice', lambda: ('POST', '/api/practice', {
+            'agent_id': rng.choice(agents), 'decision': rng.choice(['buy', 'hold', 'sell']),
+            'symbol': rng.choice(['005930', 'NVDA', 'AAPL']), 'user_id': f'user_{rng.randint(1, 200)}'})),
+        ('GET /api/practice/leaderboard', lambda: ('GET', '/api/practice/leaderboard', None)),
+        ('GET /api/memos', lambda: ('GET', f'/api/memos?agent_id={rng.choice(agents)}', None))
+    ]
+
+def securities_routes(rng, user_ids):
+    def user_route(path):
+        return lambda: ('GET', path.format(user_id=rng.choice(user_ids)), None)
+    return [
+        ('GET /api/users/{id}', user_route('/api/users/{user_id}')),
+        ('GET /api/users/{id}/trades', user_route('/api/users/{user_id}/trades')),
+        ('GET /api/users/{id}/trading-summary', user_route('/api/users/{user_id}/trading-summary')),
+        ('GET /api/users/{id}/investment-profile', user_route('/api/users/{user_id}/investment-profile')),
+        ('GET /api/users/{id}/risk-profile', user_route('/api/users/{user_id}/risk-profile')),
+        ('GET /api/stats', lambda: ('GET', '/api/stats', None))
+    ]
+
+def prepare_mypage(tmp, users):
+    return {'MYPAGE_DB_PATH': os.path.join(tmp, 'mypage.db')}, None
+
+def prepare_securities(tmp, users):
+    from securities_query.benchmark import build_database
+    db_path = os.path.join(tmp, 'securities.db')
+    build_database(db_path, users)
+    return {'SECURITIES_DB_PATH': db_path}, db_path
+
+# 앱 이름 → (스크립트, 준비 함수, 라우트 목록, 준비 확인 경로)
+APPS = {
+    'mypage': ('mypage/app.py', prepare_mypage, mypage_routes, '/api/agents'),
+    'user': ('user/api/securities_data_api.py', prepare_securities, securities_routes, '/api/health'),
+    'hackathon': ('hackathon_2025_project/03_api_services/securities_data_api_web.py', prepare_securities,
+                  securities_routes, '/api/health')
+}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_ready(port, path, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버가 시작하지 못했습니다 (종료 코드 {process.returncode})')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', path)
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError('서버 준비 시간이 초과되었습니다')
+
+def start_server(script, mode, port, env, cwd, args):
+    command = [sys.executable, os.path.join(ROOT, script), '--mode', mode, '--host', '127.0.0.1',
+               '--port', str(port), '--workers', str(args.workers), '--threads', str(args.threads),
+               '--keepalive', f'{args.keepalive:g}', '--server', args.server]
+    log = open(os.path.join(cwd, f'server-{mode}.log'), 'w')
+    # 개발 모드의 리로더 자식 프로세스까지 한 번에 종료하도록 새 세션으로 실행
+    process = subprocess.Popen(command, cwd=cwd, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT,
+                               start_new_session=True)
+    process.log = log
+    return process
+
+def stop_server(process, timeout=30.0):
+    """SIGTERM을 보내고 종료까지 걸린 시간과 종료 코드 반환 (timeout이 지나면 강제 종료)"""
+    started = time.perf_counter()
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        code = process.wait()
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.log.close()
+    return time.perf_counter() - started, code
+
+def run_route(port, requests, concurrency):
+    """요청 목록을 concurrency개 keep-alive 연결로 나눠 보내고 (소요 시간, 지연 목록, 오류 수) 반환"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    chunks = [requests[i::concurrency] for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def client(chunk):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed = [], 0
+        barrier.wait()
+        for method, path, body in chunk:
+            payload = json.dumps(body).encode() if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload is not None else {}
+            begun = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local.append((time.perf_counter() - begun) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(chunk,)) for chunk in chunks]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), errors[0]
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * (len(values) - 1) + 0.5))]
+
+def main():
+    parser = argparse.ArgumentParser(description='실행 프로필 부하 테스트')
+    parser.add_argument('--app', choices=sorted(APPS), default='mypage', help='부하를 줄 앱')
+    parser.add_argument('--modes', nargs='*', choices=['development', 'production'],
+                        default=['development', 'production'], help='비교할 실행 모드')
+    parser.add_argument('--workers', type=int, default=4, help='운영 모드 워커 수')
+    parser.add_argument('--threads', type=int, default=8, help='운영 모드 워커당 스레드 수')
+    parser.add_argument('--keepalive', type=float, default=5.0, help='keep-alive 유휴 시간(초)')
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'builtin'], default='auto', help='운영 모드 서버')
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 연결 수')
+    parser.add_argument('--requests', type=int, default=2000, help='라우트별 요청 수')
+    parser.add_argument('--warmup', type=int, default=200, help='라우트별 예열 요청 수 (집계 제외)')
+    parser.add_argument('--users', type=int, default=300, help='증권 앱 합성 사용자 수')
+    parser.add_argument('--seed', type=int, default=7, help='요청 목록 난수 시드')
+    args = parser.parse_args()
+
+    script, prepare, make_routes, ready_path = APPS[args.app]
+    print("=== 실행 프로필 부하 테스트 ===\n")
+    print(f"앱: {args.app} ({script}), CPU {os.cpu_count()}개, 동시 연결 {args.concurrency}개, "
+          f"라우트별 {args.requests:,}건 (예열 {args.warmup}건)")
+    print(f"운영 모드: 워커 {args.workers}개 × 스레드 {args.threads}개, keep-alive {args.keepalive:g}초\n")
+
+    summary = {}
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            env, db_path = prepare(tmp, args.users)
+            port = free_port()
+            process = start_server(script, mode, port, env, tmp, args)
+            try:
+                wait_ready(port, ready_path, process)
+                user_ids = ['default']
+                if db_path is not None:
+                    with sqlite3.connect(db_path) as conn:
+                        user_ids = [row[0] for row in conn.execute('SELECT user_id FROM users ORDER BY user_id LIMIT 500')]
+
+                print(f"[{mode}]")
+                print(f"   {'route':<40} {'rps':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+                total_requests, total_seconds = 0, 0.0
+                for name, make_request in make_routes(random.Random(args.seed), user_ids):
+                    requests = [make_request() for _ in range(args.warmup + args.requests)]
+                    run_route(port, requests[:args.warmup], args.concurrency)
+                    elapsed, latencies, errors = run_route(port, requests[args.warmup:], args.concurrency)
+                    rps = len(latencies) / elapsed
+                    total_requests += len(latencies)
+                    total_seconds += elapsed
+                    summary.setdefault(name, {})[mode] = rps
+                    print(f"   {name:<40} {rps:>9,.0f} {percentile(latencies, 0.5):>9.2f} "
+                          f"{percentile(latencies, 0.99):>9.2f} {errors:>7}")
+                print(f"   {'전체':<40} {total_requests / total_seconds:>9,.0f}")
+            finally:
+                seconds, code = stop_server(process)
+                print(f"   SIGTERM 후 종료: {seconds:.2f}초, 종료 코드 {code}\n")
+
+    if len(args.modes) == 2:
+        print("운영/개발 처리량 비율")
+        for name, rps in summary.items():
+            if len(rps) == 2:
+                print(f"   {name:<40} {rps['production'] / rps['development']:.2f}x")
+    print("\n=== 부하 테스트 완료 ===")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+사전 로드 후 fork하는 멀티 워커 × 멀티 스레드 WSGI 서버 (gunicorn이 없을 때 사용)
+
+- 마스터: 앱과 서비스를 한 번 로드하고 리스닝 소켓을 연 뒤 워커를 fork, 죽은 워커는 다시 띄움
+- 워커: 같은 리스닝 소켓에서 연결을 받아 스레드로 처리 (HTTP/1.1 keep-alive)
+- 종료: SIGTERM/SIGINT를 받으면 새 연결을 받지 않고 처리 중인 요청을 마친 뒤 종료,
+  graceful_timeout이 지나도 남은 워커는 강제 종료
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import ThreadedWSGIServer, WSGIRequestHandler
+
+# 워커가 시작 직후 죽었을 때 다시 띄우기 전 대기 시간(초)
+RESPAWN_BACKOFF = 1.0
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """HTTP/1.1 keep-alive 요청 처리기 (timeout = keep-alive 유휴 시간)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        # 종료 중이면 지금 요청까지만 처리하고 연결을 닫음
+        if self.server.stopping:
+            self.close_connection = True
+
+    def log_request(self, code='-', size='-'):
+        # 운영 모드에서는 요청마다 접근 로그를 남기지 않음
+        pass
+
+    def log_error(self, format, *args):
+        # keep-alive 유휴 시간이 지나 연결을 닫는 것은 오류가 아님
+        if not format.startswith('Request timed out'):
+            super().log_error(format, *args)
+
+class WorkerServer(ThreadedWSGIServer):
+    """워커 프로세스의 스레드 서버
+
+    동시에 처리하는 연결은 threads개로 제한하며, 종료 시 처리 중인 요청 스레드를 기다림
+    (keep-alive 연결은 유휴 시간 동안 스레드 하나를 차지)
+    """
+
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, host, port, app, fd, threads, keepalive):
+        handler = type('WorkerRequestHandler', (KeepAliveRequestHandler,), {'timeout': keepalive})
+        super().__init__(host, port, app, handler=handler, fd=fd)
+        self.stopping = False
+        self._slots = threading.BoundedSemaphore(threads)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+    def stop(self):
+        """새 연결 수락을 멈추고 serve_forever를 끝냄 (신호 처리기에서 호출)"""
+        if not self.stopping:
+            self.stopping = True
+            threading.Thread(target=self.shutdown, name='shutdown', daemon=True).start()
+
+class PreforkServer:
+    """마스터 + fork된 워커 프로세스로 WSGI 앱 실행"""
+
+    def __init__(self, app, host, port, workers, threads, keepalive, graceful_timeout, backlog=2048,
+                 before_fork=None, after_fork=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.keepalive = keepalive
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.before_fork = before_fork
+        self.after_fork = after_fork
+        self._children = {}
+        self._stopping = False
+        self._deadline = None
+        self._socket = None
+
+    def _listen(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def serve_forever(self):
+        self._socket = self._listen()
+        if not hasattr(os, 'fork'):
+            # fork가 없는 환경(Windows)에서는 한 프로세스의 스레드 서버로 실행
+            print("fork를 지원하지 않는 환경이라 단일 프로세스로 실행합니다.")
+            self._serve_worker()
+            return
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        # 사전 로드한 객체를 GC 대상에서 빼서 워커들이 copy-on-write 페이지를 계속 공유하도록 함
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn()
+        print(f"워커 {self.workers}개 × 스레드 {self.threads}개로 http://{self.host}:{self.port} 에서 실행 중 "
+              f"(마스터 pid {os.getpid()})")
+        self._supervise()
+        self._socket.close()
+        print("서버가 정상 종료되었습니다.")
+
+    def _spawn(self):
+        if self.before_fork is not None:
+            self.before_fork()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            self._children = {}
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                self._serve_worker()
+            except BaseException as e:
+                print(f"워커 {os.getpid()} 오류: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                # atexit 처리기(기록 대기열 비우기 등)를 실행한 뒤 종료
+                sys.exit(code)
+        self._children[pid] = time.monotonic()
+
+    def _serve_worker(self):
+        if self.after_fork is not None:
+            self.after_fork()
+        server = WorkerServer(self.host, self.port, self.app, self._socket.fileno(), self.threads, self.keepalive)
+
+        def stop(signum, frame):
+            server.stop()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+        server.serve_forever()
+
+    def _handle_stop(self, signum, frame):
+        if self._stopping:
+            return
+        self._stopping = True
+        self._deadline = time.monotonic() + self.graceful_timeout
+        print(f"\n종료 신호를 받았습니다. 처리 중인 요청을 마치고 종료합니다 (최대 {self.graceful_timeout:g}초)...")
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _supervise(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if self._stopping and time.monotonic() > self._deadline:
+                    for child in list(self._children):
+                        self._signal(child, signal.SIGKILL)
+                time.sleep(0.1)
+                continue
+
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            print(f"워커 {pid}가 종료되어 다시 시작합니다 (상태 {status}).", file=sys.stderr)
+            if time.monotonic() - started < RESPAWN_BACKOFF:
+                time.sleep(RESPAWN_BACKOFF)
+            if not self._stopping:
+                self._spawn()
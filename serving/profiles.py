@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Flask 앱 실행 프로필 (개발 / 운영)
+
+- development: 기존과 같은 app.run(debug=True) (리로더, 디버거, 단일 프로세스)
+- production: 앱과 서비스를 마스터에서 미리 로드한 뒤 워커를 fork하는 멀티 워커 × 멀티 스레드 서버
+  gunicorn이 설치되어 있으면 gthread 워커로, 없으면 내장 prefork 서버(werkzeug)로 실행
+
+명령행 인자(--mode, --workers, --threads, --keepalive, --graceful-timeout)가 없으면
+환경 변수 SERVER_MODE, SERVER_WORKERS, SERVER_THREADS, SERVER_KEEPALIVE, SERVER_GRACEFUL_TIMEOUT 값을 사용합니다.
+"""
+
+import argparse
+import os
+
+from .prefork import PreforkServer
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+SERVER_MODES = ('development', 'production')
+SERVER_MODE = os.environ.get('SERVER_MODE', 'development')
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', str(min(2 * (os.cpu_count() or 1) + 1, 8))))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '8'))
+SERVER_KEEPALIVE = float(os.environ.get('SERVER_KEEPALIVE', '5'))
+SERVER_GRACEFUL_TIMEOUT = float(os.environ.get('SERVER_GRACEFUL_TIMEOUT', '30'))
+SERVER_BACKLOG = 2048
+
+def add_serving_arguments(parser, port, host='0.0.0.0'):
+    """실행 프로필 인자를 argparse 파서에 추가"""
+    group = parser.add_argument_group('서버 실행 프로필')
+    group.add_argument('--mode', choices=SERVER_MODES, default=SERVER_MODE,
+                       help='development: 디버그 서버, production: 멀티 워커 서버 (기본: SERVER_MODE)')
+    group.add_argument('--host', default=host, help='바인딩 주소')
+    group.add_argument('--port', type=int, default=port, help='포트')
+    group.add_argument('--workers', type=int, default=SERVER_WORKERS, help='워커 프로세스 수 (운영 모드)')
+    group.add_argument('--threads', type=int, default=SERVER_THREADS, help='워커당 스레드 수 (운영 모드)')
+    group.add_argument('--keepalive', type=float, default=SERVER_KEEPALIVE, help='keep-alive 유휴 시간(초)')
+    group.add_argument('--graceful-timeout', type=float, default=SERVER_GRACEFUL_TIMEOUT,
+                       help='종료 신호 후 처리 중인 요청을 기다리는 최대 시간(초)')
+    group.add_argument('--server', choices=('auto', 'gunicorn', 'builtin'), default='auto',
+                       help='운영 모드 서버 (auto: gunicorn이 있으면 gunicorn)')
+    return parser
+
+def parse_serving_args(port, host='0.0.0.0', argv=None):
+    """실행 프로필 인자 해석 (앱 스크립트의 다른 인자는 무시)"""
+    parser = add_serving_arguments(argparse.ArgumentParser(add_help=False), port, host)
+    options, _ = parser.parse_known_args(argv)
+    if options.workers < 1 or options.threads < 1:
+        parser.error('--workers와 --threads는 1 이상이어야 합니다.')
+    return options
+
+def serving_argv(options):
+    """하위 프로세스로 앱 스크립트를 실행할 때 넘길 실행 프로필 인자"""
+    return ['--mode', options.mode, '--workers', str(options.workers), '--threads', str(options.threads),
+            '--keepalive', f'{options.keepalive:g}', '--graceful-timeout', f'{options.graceful_timeout:g}',
+            '--server', options.server]
+
+if BaseApplication is not None:
+    class GunicornApplication(BaseApplication):
+        """이미 로드한 Flask 앱을 gunicorn으로 실행 (preload_app: 마스터에서 로드 후 fork)"""
+
+        def __init__(self, app, settings):
+            self.application = app
+            self.settings = settings
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+def run_app(app, port, host='0.0.0.0', argv=None, before_fork=None, after_fork=None):
+    """실행 프로필에 따라 Flask 앱 실행
+
+    before_fork: 워커를 fork하기 전 마스터에서 호출 (DB 연결 닫기 등, fork 후 연결을 공유하지 않도록)
+    after_fork: 각 워커 프로세스가 요청을 받기 전에 호출
+    """
+    options = parse_serving_args(port, host, argv)
+    if options.mode == 'development':
+        app.run(debug=True, host=options.host, port=options.port, threaded=True)
+        return
+
+    use_gunicorn = options.server == 'gunicorn' or (options.server == 'auto' and BaseApplication is not None)
+    if use_gunicorn:
+        if BaseApplication is None:
+            raise RuntimeError('gunicorn이 설치되어 있지 않습니다. pip install gunicorn 또는 --server builtin')
+        print(f"gunicorn (gthread) 워커 {options.workers}개 × 스레드 {options.threads}개로 실행합니다.")
+        GunicornApplication(app, {
+            'bind': f'{options.host}:{options.port}',
+            'workers': options.workers,
+            'threads': options.threads,
+            'worker_class': 'gthread',
+            'keepalive': int(options.keepalive),
+            'graceful_timeout': int(options.graceful_timeout),
+            'backlog': SERVER_BACKLOG,
+            'preload_app': True,
+            'pre_fork': lambda server, worker: before_fork() if before_fork else None,
+            'post_fork': lambda server, worker: after_fork() if after_fork else None
+        }).run()
+        return
+
+    PreforkServer(app, options.host, options.port, options.workers, options.threads, options.keepalive,
+                  options.graceful_timeout, backlog=SERVER_BACKLOG,
+                  before_fork=before_fork, after_fork=after_fork).serve_forever()
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 User 증권서비스 API 서버 실행 스크립트
+실행 프로필 인자(예: --mode production --workers 4)는 API 서버에 그대로 전달
 """
 
 import os
@@ -20,7 +21,7 @@ def main():
         # user 폴더로 이동 후 API 서버 실행
         user_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         api_script = os.path.join(user_dir, 'api', 'securities_data_api.py')
-        subprocess.run([sys.executable, api_script], cwd=user_dir, check=True)
+        subprocess.run([sys.executable, api_script, *sys.argv[1:]], cwd=user_dir, check=True)
     except KeyboardInterrupt:
         print("\n⏹️  서버가 중지되었습니다.")
     except Exception as e: